@@ -0,0 +1,331 @@
+"""
+Adventure: One Command for the Whole Game
+Alberta CSE 1120: Structured Programming 2
+
+Phase 1 and Phase 2 are separate scripts, so playing a character you just
+made means running two programs (and starting Python twice). This script
+runs everything from one place with SUBCOMMANDS:
+
+    python adventure.py create --save hero.json   # make a character
+    python adventure.py fight                     # make one, then fight
+    python adventure.py fight --load hero.json --monster Troll --fights 3
+    python adventure.py campaign --count 100000 --set potion_price=40
+    python adventure.py simulate --fights 100000 --policy potion_at:0.4
+    python adventure.py bench --quick
+
+The character made by create_character() is passed straight to
+combat_loop() in the same program.
+
+Starting fast: this file imports only argparse and sys at the top. Each
+command imports the modules it needs INSIDE its function, so
+`--help` never loads NumPy or the combat code, and `fight` never loads
+NumPy either. (python -X importtime adventure.py --help shows what is
+loaded.)
+
+Learning Objectives:
+- Subcommands with argparse
+- Importing inside a function (lazy imports) and why it is faster
+- Passing data from one part of a program to the next
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import argparse
+import sys
+
+
+# ============================================================================
+# OPTION HELPERS
+# ============================================================================
+
+def parse_policy(text):
+    """
+    Read a policy option such as "always_attack" or "potion_at:0.4".
+
+    Args:
+        text (str): Policy name, then ":" and its threshold if it has one
+
+    Returns:
+        tuple: (name, *arguments), like tournament.py's policy specs
+    """
+    from tournament import POLICY_BUILDERS
+
+    name, _, argument = text.partition(":")
+    if name not in POLICY_BUILDERS:
+        raise argparse.ArgumentTypeError(
+            f"unknown policy {name!r}; choose from "
+            f"{', '.join(POLICY_BUILDERS)}")
+    if name == "always_attack":
+        return (name,)
+    try:
+        return (name, float(argument or 0.4))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad threshold {argument!r}")
+
+
+def parse_setting(text):
+    """
+    Read an economy setting such as "potion_price=40".
+
+    Args:
+        text (str): name=whole number
+
+    Returns:
+        tuple: (name, value)
+    """
+    name, _, value = text.partition("=")
+    try:
+        return name, int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"expected name=number, got {text!r}")
+
+
+def get_monster_factory(name):
+    """
+    Monster maker for the --monster option.
+
+    Args:
+        name (str, optional): Monster name from monsters.json
+
+    Returns:
+        function: Called as factory(rng), returns a monster dictionary
+    """
+    if name is None:
+        from phase2_combat_system import create_random_monster
+        return create_random_monster
+
+    from monster_registry import DEFAULT_REGISTRY
+    if name not in DEFAULT_REGISTRY.by_name:
+        raise SystemExit(f"Unknown monster {name!r}; choose from "
+                         f"{', '.join(DEFAULT_REGISTRY.by_name)}")
+    return lambda rng: DEFAULT_REGISTRY.create(name)
+
+
+# ============================================================================
+# COMMANDS
+# ============================================================================
+
+def command_create(args):
+    """Make a character with the Phase 1 questions, and save it."""
+    import random
+
+    from phase1_character_creation import create_character
+
+    player = create_character(random.Random(args.seed))
+    if args.save:
+        from character_store import save_characters
+        save_characters(args.save, [player])
+        print(f"\nSaved {player['name']} to {args.save}")
+    return 0
+
+
+def command_fight(args):
+    """Fight with a new, loaded or test character."""
+    import random
+
+    from game_metrics import NO_METRICS, Metrics
+    from phase2_combat_system import combat_loop
+
+    rng = random.Random(args.seed)
+    if args.load:
+        from character_store import load_characters
+        player = load_characters(args.load)[args.index]
+    elif args.test_player:
+        from phase2_combat_system import create_test_player
+        player = create_test_player()
+    else:
+        from phase1_character_creation import create_character
+        player = create_character(rng)
+    player.setdefault("health_potions", args.potions)
+
+    choose_action = None
+    if args.policy:
+        from tournament import make_policy
+        policy = make_policy(args.policy)
+        choose_action = lambda player, monster: policy(
+            player["health"], player["max_health"],
+            player.get("health_potions", 0), monster["health"])
+
+    metrics = Metrics() if args.metrics else NO_METRICS
+
+    make_monster = get_monster_factory(args.monster)
+    for _ in range(args.fights):
+        monster = make_monster(rng)
+        if args.screen:
+            from combat_screen import play_fight
+            play_fight(player, monster, choose_action, rng)
+        else:
+            combat_loop(player, monster, choose_action, rng, metrics=metrics)
+        if player["health"] <= 0:
+            break
+
+    print(f"\n{player['name']}: {player['health']}/{player['max_health']} HP, "
+          f"{player.get('gold', 0)} gold, "
+          f"{player.get('experience', 0)} experience")
+    if args.metrics:
+        metrics.write(args.metrics)
+    if args.save:
+        from character_store import save_characters
+        save_characters(args.save, [player])
+    return 0
+
+
+def command_campaign(args):
+    """Play one campaign, or simulate many and show the survival curve."""
+    from campaign import make_economy
+
+    try:
+        economy = make_economy(dict(args.set))
+    except ValueError as error:
+        raise SystemExit(error)
+
+    if args.show:
+        import random
+
+        from campaign import play_campaign
+        from tournament import make_policy
+
+        result = play_campaign(policy=make_policy(args.policy),
+                               economy=economy,
+                               rng=random.Random(args.seed))
+        print(f"\nCampaign over: {result}")
+        return 0
+
+    import time
+
+    from campaign import display_survival, simulate_campaigns
+    from tournament import make_vectorized_policy
+
+    start = time.perf_counter()
+    results = simulate_campaigns(args.count,
+                                 policy=make_vectorized_policy(args.policy),
+                                 economy=economy, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    display_survival(results, f"{args.count:,} CAMPAIGNS in {elapsed:.2f}s")
+    return 0
+
+
+def command_simulate(args):
+    """Run headless fights and show win rates per monster."""
+    import random
+
+    import combat_simulator
+    from tournament import make_policy
+
+    kwargs = {}
+    if args.monster:
+        kwargs["monster_factory"] = get_monster_factory(args.monster)
+    results = combat_simulator.run_simulation(
+        args.fights, make_policy(args.policy),
+        rng=random.Random(args.seed), **kwargs)
+    combat_simulator.display_results(results, f"{args.fights:,} FIGHTS")
+    return 0
+
+
+def command_bench(args):
+    """Run the benchmark suite (options are passed on to it)."""
+    import combat_benchmark
+    return combat_benchmark.main(args.options)
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+def build_parser():
+    """
+    Describe every subcommand and its options.
+
+    Returns:
+        argparse.ArgumentParser: The parser
+    """
+    parser = argparse.ArgumentParser(
+        prog="adventure", description="Python Adventure")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create = commands.add_parser("create", help="make a character")
+    create.add_argument("--save", metavar="PATH",
+                        help="save it (.json, or the binary format)")
+    create.add_argument("--seed", type=int)
+    create.set_defaults(run=command_create)
+
+    fight = commands.add_parser("fight", help="fight monsters")
+    source = fight.add_mutually_exclusive_group()
+    source.add_argument("--load", metavar="PATH",
+                        help="use a saved character instead of making one")
+    source.add_argument("--test-player", action="store_true",
+                        help="use the Phase 2 test player")
+    fight.add_argument("--index", type=int, default=0,
+                       help="which character in the --load file")
+    fight.add_argument("--monster", help="monster name (default: random)")
+    fight.add_argument("--fights", type=int, default=1)
+    fight.add_argument("--potions", type=int, default=3,
+                       help="potions for a character that has none")
+    fight.add_argument("--policy", type=parse_policy,
+                       help="play automatically, e.g. potion_at:0.4")
+    fight.add_argument("--screen", action="store_true",
+                       help="use the full-screen combat display")
+    fight.add_argument("--metrics", metavar="PATH",
+                       help="write timing metrics (.json or Prometheus)")
+    fight.add_argument("--save", metavar="PATH",
+                       help="save the character afterwards")
+    fight.add_argument("--seed", type=int)
+    fight.set_defaults(run=command_fight)
+
+    campaign = commands.add_parser("campaign",
+                                   help="fight until the hero falls")
+    campaign.add_argument("--count", type=int, default=10_000,
+                          help="campaigns to simulate")
+    campaign.add_argument("--show", action="store_true",
+                          help="play one campaign with every message")
+    campaign.add_argument("--policy", type=parse_policy,
+                          default=("potion_at", 0.4))
+    campaign.add_argument("--set", type=parse_setting, action="append",
+                          default=[], metavar="RULE=VALUE",
+                          help="change an economy rule (see campaign.py)")
+    campaign.add_argument("--seed", type=int)
+    campaign.set_defaults(run=command_campaign)
+
+    simulate = commands.add_parser("simulate", help="headless fights")
+    simulate.add_argument("--fights", type=int, default=10_000)
+    simulate.add_argument("--policy", type=parse_policy,
+                          default=("always_attack",))
+    simulate.add_argument("--monster", help="monster name (default: random)")
+    simulate.add_argument("--seed", type=int)
+    simulate.set_defaults(run=command_simulate)
+
+    # Every option after "bench" goes to combat_benchmark.py (see main())
+    bench = commands.add_parser("bench", help="run the benchmark suite",
+                                add_help=False)
+    bench.set_defaults(run=command_bench)
+    return parser
+
+
+def main(argv=None):
+    """
+    Command-line entry point.
+
+    Args:
+        argv (list, optional): Arguments (default: sys.argv)
+
+    Returns:
+        int: Exit status
+    """
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "bench":
+        args.options = extra
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    try:
+        return args.run(args)
+    except (KeyboardInterrupt, EOFError):
+        print("\nFarewell, adventurer!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,448 @@
+"""
+Build Optimizer: Which Way to Spend the Attribute Points?
+Alberta CSE 1120: Structured Programming 2
+
+allocate_attribute_points() lets the player split TOTAL_POINTS points
+between health and mana - 21 possible BUILDS. Which one is best? This
+module tries every build many times against create_random_monster()
+encounters and ranks them, with a 95% CONFIDENCE INTERVAL for each score
+(the range the true score is very likely in, given how many tries were
+played). There are two MEASURES:
+
+- "campaign": how many encounters a hero lasts in a campaign (see
+  campaign.py). This is the default - single fights are too easy to
+  tell the builds apart.
+- "fights": the win rate over single fights.
+
+Three things keep it quick:
+
+1. PARALLEL - builds are evaluated by a pool of worker processes (like
+   tournament.py).
+2. CACHING - every evaluation is saved under a key made from the stats
+   the fight actually uses (COMBAT_KEYS), not from the rules that made
+   them. Change POINTS_TO_MANA_RATIO and every build has the same
+   health as before, so nothing is played again; change
+   POINTS_TO_HEALTH_RATIO and only the builds whose health changed are
+   played. The cache can be kept in a JSON file between runs.
+3. COMMON RANDOM NUMBERS - every build is played with the same seeds,
+   so differences between builds come from the builds, not luck.
+
+Note: the Phase 2 combat rules do not use mana yet, so more health
+always wins. Add "mana" to COMBAT_KEYS once a mana-using action exists.
+
+Learning Objectives:
+- Trying every option and ranking the results
+- Confidence intervals for a win rate (the Wilson interval)
+- Caching results under a key that describes the work
+- Running independent jobs in parallel
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import json
+import math
+import multiprocessing
+import os
+import random
+
+from campaign import ECONOMY, simulate_campaigns
+from combat_simulator import run_simulation
+from phase1_character_creation import (
+    BASE_HEALTH,
+    BASE_MANA,
+    MAX_GOLD,
+    MIN_GOLD,
+    POINTS_TO_HEALTH_RATIO,
+    POINTS_TO_MANA_RATIO,
+    TOTAL_POINTS,
+)
+from phase2_combat_system import (
+    BASE_DAMAGE,
+    CRITICAL_CHANCE,
+    CRITICAL_MULTIPLIER,
+    DAMAGE_VARIANCE,
+    FLEE_CHANCE,
+    MONSTER_TYPES,
+    MONSTER_WEIGHTS,
+    POTION_HEAL_AMOUNT,
+    create_random_monster,
+)
+from tournament import make_policy, make_vectorized_policy
+
+# The Phase 1 rules. Pass a dictionary with some of these keys to try
+# other rules, e.g. optimize({"points_to_health_ratio": 6})
+RULES = {
+    "total_points": TOTAL_POINTS,
+    "base_health": BASE_HEALTH,
+    "base_mana": BASE_MANA,
+    "points_to_health_ratio": POINTS_TO_HEALTH_RATIO,
+    "points_to_mana_ratio": POINTS_TO_MANA_RATIO,
+}
+
+# Player stats that fights and campaigns read - the only ones in the
+# cache key
+COMBAT_KEYS = ("health", "max_health", "health_potions", "gold")
+
+# Middle of generate_starting_gold()'s range
+STARTING_GOLD = (MIN_GOLD + MAX_GOLD) // 2
+
+MEASURES = ("campaign", "fights")
+
+Z_95 = 1.959964     # Standard normal value for a 95% interval
+
+
+# ============================================================================
+# BUILDS
+# ============================================================================
+
+def make_rules(rules=None):
+    """
+    Fill in any rules that are not given with the Phase 1 values.
+
+    Args:
+        rules (dict, optional): Rules to change
+
+    Returns:
+        dict: A complete set of rules
+    """
+    complete = dict(RULES)
+    if rules:
+        unknown = set(rules) - set(RULES)
+        if unknown:
+            raise ValueError(f"Unknown rule(s): {', '.join(sorted(unknown))}")
+        complete.update(rules)
+    return complete
+
+
+def list_builds(rules, potions=3):
+    """
+    Every way to split the points, as player dictionaries.
+
+    Args:
+        rules (dict): Complete rules (see make_rules())
+        potions (int): Health potions each build starts with
+
+    Returns:
+        list: Players like create_character() makes, plus
+            "health_points" and "mana_points"
+    """
+    builds = []
+    for health_points in range(rules["total_points"] + 1):
+        mana_points = rules["total_points"] - health_points
+        health = (rules["base_health"]
+                  + health_points * rules["points_to_health_ratio"])
+        mana = rules["base_mana"] + mana_points * rules["points_to_mana_ratio"]
+        builds.append({
+            "name": f"{health_points}H/{mana_points}M",
+            "health_points": health_points,
+            "mana_points": mana_points,
+            "health": health,
+            "max_health": health,
+            "mana": mana,
+            "max_mana": mana,
+            "gold": STARTING_GOLD,
+            "health_potions": potions,
+        })
+    return builds
+
+
+def rules_fingerprint():
+    """
+    Description of every game rule a fight or campaign depends on, so
+    cached results are not reused after a rule changes: the Phase 2
+    combat constants, the campaign ECONOMY, and the
+    create_random_monster() encounters.
+
+    Returns:
+        str: The rules as JSON
+    """
+    combat = {
+        "base_damage": BASE_DAMAGE,
+        "damage_variance": DAMAGE_VARIANCE,
+        "critical_chance": CRITICAL_CHANCE,
+        "critical_multiplier": CRITICAL_MULTIPLIER,
+        "potion_heal_amount": POTION_HEAL_AMOUNT,
+        "flee_chance": FLEE_CHANCE,
+    }
+    monsters = [create() for create in MONSTER_TYPES]
+    return json.dumps([combat, ECONOMY, monsters, MONSTER_WEIGHTS],
+                      sort_keys=True)
+
+
+def evaluation_key(build, policy_spec, measure, trials, seed, fingerprint):
+    """
+    Cache key for one evaluation: everything that changes the result.
+
+    Args:
+        build (dict): Player from list_builds()
+        policy_spec (tuple): e.g. ("potion_at", 0.4)
+        measure (str): "campaign" or "fights"
+        trials (int): Campaigns or fights played
+        seed (int): Base seed
+        fingerprint (str): Output of rules_fingerprint(), worked out
+            once per run
+
+    Returns:
+        str: The key
+    """
+    stats = {key: build[key] for key in COMBAT_KEYS}
+    return json.dumps([stats, list(policy_spec), measure, trials, seed,
+                       fingerprint], sort_keys=True)
+
+
+# ============================================================================
+# EVALUATING ONE BUILD
+# ============================================================================
+
+def evaluate(task):
+    """
+    Try one build. Called inside a worker process.
+    The seed does not depend on the build: common random numbers.
+
+    Args:
+        task (tuple): (key, build, policy_spec, measure, trials, seed)
+
+    Returns:
+        tuple: (key, totals) - totals has "trials" plus, for campaigns,
+            encounters and encounters_squared (sums over campaigns), or
+            for fights, wins, losses, fled, turns and damage_taken
+    """
+    key, build, policy_spec, measure, trials, seed = task
+
+    if measure == "campaign":
+        results = simulate_campaigns(trials, build,
+                                     make_vectorized_policy(policy_spec),
+                                     seed=seed)
+        encounters = results["encounters"]
+        return key, {"trials": trials,
+                     "encounters": int(encounters.sum()),
+                     "encounters_squared": int((encounters ** 2).sum())}
+
+    results = run_simulation(trials, make_policy(policy_spec), build,
+                             create_random_monster, random.Random(seed))
+    totals = {"trials": trials, "wins": 0, "losses": 0, "fled": 0,
+              "turns": 0, "damage_taken": 0}
+    for stats in results.values():
+        totals["wins"] += stats["wins"]
+        totals["losses"] += stats["losses"]
+        totals["fled"] += stats["fled"]
+        totals["turns"] += stats["total_turns"]
+        totals["damage_taken"] += stats["total_damage_taken"]
+    return key, totals
+
+
+def wilson_interval(successes, trials, z=Z_95):
+    """
+    Confidence interval for a success rate (the Wilson score interval,
+    which behaves well even near 0% and 100%).
+    Teaches: Turning a formula into code
+
+    Args:
+        successes (int): e.g. wins
+        trials (int): e.g. fights
+        z (float): Normal value for the confidence level
+
+    Returns:
+        tuple: (low, high)
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    rate = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (rate + z * z / (2 * trials)) / denominator
+    spread = (z * math.sqrt(rate * (1 - rate) / trials
+                            + z * z / (4 * trials * trials)) / denominator)
+    return max(0.0, centre - spread), min(1.0, centre + spread)
+
+
+def score(totals, measure):
+    """
+    A build's score and its 95% confidence interval.
+
+    Args:
+        totals (dict): From evaluate()
+        measure (str): "campaign" or "fights"
+
+    Returns:
+        tuple: (score, low, high) - average encounters reached, or the
+            win rate
+    """
+    trials = totals["trials"]
+    if measure == "fights":
+        low, high = wilson_interval(totals["wins"], trials)
+        return totals["wins"] / trials, low, high
+
+    # Mean with a normal-approximation interval: mean +- z * sd / sqrt(n)
+    mean = totals["encounters"] / trials
+    variance = max(0.0, totals["encounters_squared"] / trials - mean * mean)
+    spread = Z_95 * math.sqrt(variance / trials)
+    return mean, mean - spread, mean + spread
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class EvaluationCache:
+    """
+    Evaluation results by key, optionally kept in a JSON file.
+
+    Args:
+        path (str, optional): File to load from and save to
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.results = {}
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                self.results = json.load(file)
+
+    def get(self, key):
+        """
+        Look up a result, counting hits and misses.
+
+        Returns:
+            dict: Totals, or None if the key is not cached
+        """
+        totals = self.results.get(key)
+        if totals is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return totals
+
+    def put(self, key, totals):
+        """Remember a result."""
+        self.results[key] = totals
+
+    def save(self):
+        """Write the cache file (if there is one)."""
+        if self.path:
+            with open(self.path, "w", encoding="utf-8") as file:
+                json.dump(self.results, file)
+
+
+# ============================================================================
+# OPTIMIZING
+# ============================================================================
+
+def optimize(rules=None, policy_spec=("potion_at", 0.4), measure="campaign",
+             trials=20_000, potions=3, seed=0, workers=None, cache=None):
+    """
+    Evaluate every build and rank them.
+
+    Args:
+        rules (dict, optional): Rules to change (see RULES)
+        policy_spec (tuple): Policy, as in tournament.py
+        measure (str): "campaign" or "fights" (see MEASURES)
+        trials (int): Campaigns or fights per build
+        potions (int): Potions each build starts with
+        seed (int): Base seed (the same for every build)
+        workers (int, optional): Worker processes (default: all CPU
+            cores). Use 1 to run everything in this process.
+        cache (EvaluationCache, optional): Results to reuse and add to
+
+    Returns:
+        list: One row per build, best first - the build's dictionary
+            plus measure, score, low, high (the 95% interval) and cached
+            (True if nothing had to be played)
+    """
+    if measure not in MEASURES:
+        raise ValueError(f"Unknown measure {measure!r}; choose from "
+                         f"{', '.join(MEASURES)}")
+    if cache is None:
+        cache = EvaluationCache()
+    builds = list_builds(make_rules(rules), potions)
+
+    # Only play the builds whose key is not cached. Builds with the same
+    # key (same combat stats) share one evaluation.
+    fingerprint = rules_fingerprint()
+    keys = [evaluation_key(build, policy_spec, measure, trials, seed,
+                           fingerprint)
+            for build in builds]
+    found = {key: cache.get(key) for key in keys}
+    tasks = {key: (key, build, tuple(policy_spec), measure, trials, seed)
+             for key, build in zip(keys, builds) if found[key] is None}
+
+    def collect(finished):
+        for key, totals in finished:
+            cache.put(key, totals)
+
+    if workers == 1 or len(tasks) <= 1:
+        collect(map(evaluate, tasks.values()))
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            collect(pool.imap_unordered(evaluate, tasks.values()))
+    if tasks:
+        cache.save()
+
+    rows = []
+    for key, build in zip(keys, builds):
+        value, low, high = score(cache.results[key], measure)
+        rows.append(dict(build, measure=measure, score=value, low=low,
+                         high=high, cached=key not in tasks))
+
+    # Best score first; between equal scores, the surer one
+    rows.sort(key=lambda row: (-row["score"], -row["low"]))
+    return rows
+
+
+def display_ranking(rows, title="BUILD RANKING", top=None):
+    """
+    Print the ranked builds.
+
+    Args:
+        rows (list): Output of optimize()
+        title (str): Heading
+        top (int, optional): Only show this many
+    """
+    print("\n" + "=" * 60)
+    print(title)
+    print("=" * 60)
+    if rows and rows[0]["measure"] == "fights":
+        label, show = "Win rate", lambda value: f"{value:.1%}"
+    else:
+        label, show = "Encounters", lambda value: f"{value:.2f}"
+    print(f"{'#':>2}  {'Build':<8}{'HP':>5}{'MP':>5}{label:>12}"
+          f"{'95% interval':>22}")
+    print("-" * 60)
+    for rank, row in enumerate(rows[:top], start=1):
+        interval = f"{show(row['low'])} - {show(row['high'])}"
+        print(f"{rank:>2}  {row['name']:<8}{row['health']:>5}"
+              f"{row['mana']:>5}{show(row['score']):>12}{interval:>22}")
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    cache = EvaluationCache(os.path.join(tempfile.mkdtemp(),
+                                         "build_cache.json"))
+
+    for title, rules in (("PHASE 1 RULES", None),
+                         ("POINTS_TO_MANA_RATIO = 4",
+                          {"points_to_mana_ratio": 4}),
+                         ("POINTS_TO_HEALTH_RATIO = 10",
+                          {"points_to_health_ratio": 10})):
+        hits, misses = cache.hits, cache.misses
+        start = time.perf_counter()
+        rows = optimize(rules, cache=cache)
+        elapsed = time.perf_counter() - start
+        display_ranking(rows, f"{title}: {elapsed:.2f}s, "
+                              f"{cache.hits - hits} cached, "
+                              f"{cache.misses - misses} played", top=5)
+
+    # Single fights: every build wins nearly all of them, which is why
+    # "campaign" is the default measure
+    rows = optimize(measure="fights", policy_spec=("always_attack",),
+                    trials=2_000, cache=cache)
+    display_ranking(rows, "SINGLE FIGHTS, ALWAYS ATTACKING", top=5)
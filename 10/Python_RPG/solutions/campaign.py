@@ -0,0 +1,548 @@
+"""
+Campaigns: Fight After Fight Until the Hero Falls
+Alberta CSE 1120: Structured Programming 2
+
+combat_loop() plays ONE fight. A campaign keeps going: the hero meets a
+random monster (create_random_monster()), and after every fight that is
+not lost the PROGRESSION rules run:
+
+1. LEVEL UP - every ECONOMY["experience_per_level"] experience is a new
+   level, worth ECONOMY["health_per_level"] extra max health and a full
+   heal.
+2. REST - the hero gets back ECONOMY["rest_heal"] health.
+3. SHOP - gold buys potions at ECONOMY["potion_price"] each, up to
+   ECONOMY["max_potions"] in the pack.
+
+The monsters get tougher as the campaign goes on: in encounter n their
+health and damage are (n - 1) * ECONOMY["monster_growth"] percent above
+normal.
+
+The campaign ends when the hero dies (or after
+ECONOMY["max_encounters"] encounters). The numbers are only a starting
+point: every function takes an `economy` dictionary, so the rules can be
+tuned by running thousands of campaigns with different settings.
+
+There are two engines with the same rules:
+
+- play_campaign() plays one campaign with CombatMachine (combat_state.py),
+  showing every message if you like.
+- simulate_campaigns() plays many campaigns at once with NumPy arrays, the
+  way combat_vectorized.py plays many fights. Each pass through its loop
+  is one turn of the current encounter of EVERY campaign still alive.
+
+The results are summed up as a SURVIVAL CURVE: the fraction of heroes
+still alive after each number of encounters.
+
+Requires NumPy (pip install numpy) for simulate_campaigns().
+
+Learning Objectives:
+- Chaining fights into a longer game loop
+- Tunable rules kept in one dictionary
+- Simulating many games at once with arrays
+- Survival curves
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import random
+
+import numpy as np
+
+import combat_vectorized
+from combat_state import LOSS, WIN, CombatMachine, display_events
+from combat_vectorized import (
+    ATTACK,
+    DEFEND,
+    FLEE,
+    POTION,
+    roll_monster_damage_batch,
+    roll_player_damage_batch,
+)
+from game_io import CONSOLE
+from phase2_combat_system import (
+    FLEE_CHANCE,
+    MONSTER_TYPES,
+    MONSTER_WEIGHTS,
+    POTION_HEAL_AMOUNT,
+    create_random_monster,
+    create_test_player,
+)
+
+# The progression rules. Pass a dictionary with some of these keys to
+# change them, e.g. simulate_campaigns(..., economy={"potion_price": 40})
+ECONOMY = {
+    "experience_per_level": 100,    # Experience needed for each level
+    "health_per_level": 10,         # Max health gained per level
+    "rest_heal": 20,                # Health regained between fights
+    "potion_price": 25,             # Gold per potion
+    "max_potions": 5,               # Most potions the hero will carry
+    "monster_growth": 5,            # % stronger monsters per encounter
+    "max_encounters": 200,          # A campaign stops here even if alive
+}
+
+
+def make_economy(economy=None):
+    """
+    Fill in any rules that are not given with the ECONOMY defaults.
+
+    Args:
+        economy (dict, optional): Rules to change
+
+    Returns:
+        dict: A complete set of rules
+    """
+    rules = dict(ECONOMY)
+    if economy:
+        unknown = set(economy) - set(ECONOMY)
+        if unknown:
+            raise ValueError(f"Unknown economy rule(s): "
+                             f"{', '.join(sorted(unknown))}")
+        rules.update(economy)
+    return rules
+
+
+def level_for(experience, economy):
+    """
+    Level reached with a given amount of experience (level 1 at 0).
+
+    Args:
+        experience (int or np.ndarray): Experience points
+        economy (dict): Complete rules (see make_economy())
+
+    Returns:
+        int or np.ndarray: Level
+    """
+    return 1 + experience // economy["experience_per_level"]
+
+
+def monster_scale(encounter, economy):
+    """
+    Percent of normal strength for monsters in one encounter.
+
+    Args:
+        encounter (int or np.ndarray): Encounter number (1 is the first)
+        economy (dict): Complete rules (see make_economy())
+
+    Returns:
+        int or np.ndarray: 100 for the first encounter, then growing
+    """
+    return 100 + (encounter - 1) * economy["monster_growth"]
+
+
+# ============================================================================
+# ONE CAMPAIGN
+# ============================================================================
+
+def strengthen_monster(monster, encounter, economy):
+    """
+    Scale a monster's health and damage for a later encounter.
+
+    Args:
+        monster (dict): Monster data (changed in place)
+        encounter (int): Encounter number (1 is the first)
+        economy (dict): Complete rules (see make_economy())
+    """
+    scale = monster_scale(encounter, economy)
+    for key in ("max_health", "min_damage", "max_damage"):
+        monster[key] = monster[key] * scale // 100
+    monster["health"] = monster["max_health"]
+
+
+def between_fights(player, economy, io=CONSOLE):
+    """
+    Level up, rest and shop after a fight the hero survived.
+    Teaches: Applying several rules in order
+
+    Args:
+        player (dict): Player data (changed in place; uses a "level" key)
+        economy (dict): Complete rules (see make_economy())
+        io (optional): Input/output object (see game_io.py)
+    """
+    # ----- Level up -----
+    level = level_for(player.get("experience", 0), economy)
+    gained = level - player.get("level", 1)
+    if gained > 0:
+        player["level"] = level
+        player["max_health"] += gained * economy["health_per_level"]
+        player["health"] = player["max_health"]
+        io.print(f"\n⭐ LEVEL UP! {player['name']} is now level {level} "
+                 f"({player['max_health']} max HP)")
+
+    # ----- Rest -----
+    healed = min(economy["rest_heal"], player["max_health"] - player["health"])
+    player["health"] += healed
+    if healed:
+        io.print(f"You rest and recover {healed} HP "
+                 f"({player['health']}/{player['max_health']})")
+
+    # ----- Shop -----
+    price = economy["potion_price"]
+    potions = player.get("health_potions", 0)
+    bought = min(economy["max_potions"] - potions,
+                 player.get("gold", 0) // price)
+    if bought > 0:
+        player["gold"] -= bought * price
+        player["health_potions"] = potions + bought
+        io.print(f"You buy {bought} potion(s) for {bought * price} gold "
+                 f"({player['gold']} gold left)")
+
+
+def play_campaign(player=None, policy=None, economy=None, rng=random,
+                  io=CONSOLE):
+    """
+    Play one campaign with CombatMachine until the hero dies.
+
+    Args:
+        player (dict, optional): Hero (changed in place). Uses
+            create_test_player()
+        policy (function, optional): combat_simulator.py policy. Defaults
+            to always attacking
+        economy (dict, optional): Rules to change (see ECONOMY)
+        rng (optional): Random number generator
+        io (optional): Input/output object (see game_io.py)
+
+    Returns:
+        dict: encounters (fights started), wins, fled, died (True/False),
+            level, gold and experience
+    """
+    if player is None:
+        player = create_test_player()
+    economy = make_economy(economy)
+    player.setdefault("level", 1)
+
+    encounters = wins = fled = 0
+    died = False
+    while encounters < economy["max_encounters"]:
+        encounters += 1
+        monster = create_random_monster(rng)
+        strengthen_monster(monster, encounters, economy)
+        io.print(f"\n===== Encounter {encounters}: {monster['name']} =====")
+
+        machine = CombatMachine(player, monster)
+        while not machine.finished:
+            if policy is None:
+                action = "1"
+            else:
+                action = policy(player["health"], player["max_health"],
+                                player.get("health_potions", 0),
+                                monster["health"])
+            display_events(machine, machine.step(action, rng), io)
+
+        if machine.status == LOSS:
+            died = True
+            break
+        if machine.status == WIN:
+            wins += 1
+        else:
+            fled += 1
+        between_fights(player, economy, io)
+
+    return {
+        "encounters": encounters,
+        "wins": wins,
+        "fled": fled,
+        "died": died,
+        "level": player["level"],
+        "gold": player.get("gold", 0),
+        "experience": player.get("experience", 0),
+    }
+
+
+# ============================================================================
+# MANY CAMPAIGNS AT ONCE
+# ============================================================================
+
+def monster_columns():
+    """
+    The random-encounter monsters as arrays, one entry per MONSTER_TYPES
+    creator, so a whole batch of encounters is picked with one call.
+
+    Returns:
+        dict: Arrays "health", "min_damage", "max_damage", "gold_low",
+            "gold_high", "experience", plus "weights" (MONSTER_WEIGHTS)
+    """
+    monsters = [create() for create in MONSTER_TYPES]
+    column = lambda values: np.array(values, dtype=np.int64)
+    return {
+        "health": column([m["health"] for m in monsters]),
+        "min_damage": column([m["min_damage"] for m in monsters]),
+        "max_damage": column([m["max_damage"] for m in monsters]),
+        "gold_low": column([m["gold_reward"][0] for m in monsters]),
+        "gold_high": column([m["gold_reward"][1] for m in monsters]),
+        "experience": column([m["experience"] for m in monsters]),
+        "weights": np.array(MONSTER_WEIGHTS) / sum(MONSTER_WEIGHTS),
+    }
+
+
+def simulate_campaigns(count, player=None,
+                       policy=combat_vectorized.always_attack, economy=None,
+                       seed=None):
+    """
+    Play `count` campaigns at once, with the same rules as play_campaign().
+    Every campaign is always in some encounter: when its fight ends the
+    progression rules run and a new monster appears straight away, so
+    the arrays stay full until heroes start dying.
+    Teaches: Arrays, boolean masks, keeping many game loops in step
+
+    Args:
+        count (int): Number of campaigns
+        player (dict, optional): Hero to copy. Uses create_test_player()
+        policy (function): Vectorized policy (see combat_vectorized.py)
+        economy (dict, optional): Rules to change (see ECONOMY)
+        seed (int, optional): Seed for a reproducible run
+
+    Returns:
+        dict: One entry per campaign - "encounters" (the encounter the
+            hero died in, or max_encounters), "died" mask, "wins", "fled",
+            "level", "gold" and "experience" arrays, and "economy"
+    """
+    if player is None:
+        player = create_test_player()
+    economy = make_economy(economy)
+    rng = np.random.default_rng(seed)
+    monsters = monster_columns()
+
+    def full(value):
+        return np.full(count, value, dtype=np.int64)
+
+    health = full(player["health"])
+    max_health = full(player["max_health"])
+    potions = full(player.get("health_potions", 0))
+    gold = full(player.get("gold", 0))
+    experience = full(player.get("experience", 0))
+    level = level_for(experience, economy)
+    encounters = full(1)
+    wins = full(0)
+    fled_count = full(0)
+    died = np.zeros(count, dtype=bool)
+
+    # The monster each campaign is fighting now
+    kind = rng.choice(len(monsters["weights"]), size=count,
+                      p=monsters["weights"])
+    monster_health = monsters["health"][kind]
+    min_damage = monsters["min_damage"][kind]
+    max_damage = monsters["max_damage"][kind]
+
+    active = np.arange(count)
+    while len(active) > 0:
+        k = len(active)
+        ph = health[active]
+        mh = monster_health[active]
+        pots = potions[active]
+        mh_kind = kind[active]
+        top = max_health[active]
+
+        # ===== PLAYER TURN =====
+        action = policy(ph, top, pots, mh)
+
+        damage, _ = roll_player_damage_batch(rng, k)
+        mh = mh - np.where(action == ATTACK, damage, 0)
+        defending = action == DEFEND
+
+        drinking = (action == POTION) & (pots > 0)
+        ph = ph + np.where(drinking, np.minimum(POTION_HEAL_AMOUNT, top - ph),
+                           0)
+        pots = pots - drinking
+
+        fled = (action == FLEE) & (rng.random(k) < FLEE_CHANCE)
+        won = (mh <= 0) & ~fled
+
+        # ===== MONSTER TURN =====
+        attacked = ~fled & ~won
+        hit = roll_monster_damage_batch(rng, min_damage[active],
+                                        max_damage[active], defending)
+        ph = ph - np.where(attacked, hit, 0)
+        lost = attacked & (ph <= 0)
+
+        health[active] = ph
+        monster_health[active] = mh
+        potions[active] = pots
+
+        # ===== FIGHTS THAT ENDED =====
+        died[active[lost]] = True
+
+        if won.any():
+            winners = active[won]
+            winner_kind = mh_kind[won]
+            wins[winners] += 1
+            gold[winners] += rng.integers(monsters["gold_low"][winner_kind],
+                                          monsters["gold_high"][winner_kind]
+                                          + 1)
+            experience[winners] += monsters["experience"][winner_kind]
+        fled_count[active[fled]] += 1
+
+        # Survivors of this encounter go on to the next one
+        done = active[won | fled]
+        done = done[encounters[done] < economy["max_encounters"]]
+        if len(done):
+            # Level up (a full heal)
+            new_level = level_for(experience[done], economy)
+            gained = new_level - level[done]
+            level[done] = new_level
+            max_health[done] += gained * economy["health_per_level"]
+            health[done] = np.where(gained > 0, max_health[done],
+                                    health[done])
+
+            # Rest
+            health[done] = np.minimum(health[done] + economy["rest_heal"],
+                                      max_health[done])
+
+            # Shop
+            bought = np.minimum(economy["max_potions"] - potions[done],
+                                gold[done] // economy["potion_price"])
+            bought = np.maximum(bought, 0)
+            gold[done] -= bought * economy["potion_price"]
+            potions[done] += bought
+
+            # Next monster, a little stronger than the last
+            encounters[done] += 1
+            new_kind = rng.choice(len(monsters["weights"]), size=len(done),
+                                  p=monsters["weights"])
+            scale = monster_scale(encounters[done], economy)
+            kind[done] = new_kind
+            monster_health[done] = monsters["health"][new_kind] * scale // 100
+            min_damage[done] = (monsters["min_damage"][new_kind] * scale
+                                // 100)
+            max_damage[done] = (monsters["max_damage"][new_kind] * scale
+                                // 100)
+
+        # Keep campaigns still fighting, plus those that just started a
+        # new encounter
+        going = np.zeros(count, dtype=bool)
+        going[active[~(won | fled | lost)]] = True
+        going[done] = True
+        active = np.flatnonzero(going)
+
+    return {
+        "encounters": encounters,
+        "died": died,
+        "wins": wins,
+        "fled": fled_count,
+        "level": level,
+        "gold": gold,
+        "experience": experience,
+        "economy": economy,
+    }
+
+
+# ============================================================================
+# SURVIVAL CURVES
+# ============================================================================
+
+def survival_curve(results):
+    """
+    Fraction of heroes still alive after each number of encounters.
+    Teaches: np.bincount and np.cumsum to count up events
+
+    Args:
+        results (dict): Output of simulate_campaigns()
+
+    Returns:
+        np.ndarray: curve[n] = fraction alive after n encounters
+            (curve[0] is always 1.0)
+    """
+    limit = results["economy"]["max_encounters"]
+    deaths = np.bincount(results["encounters"][results["died"]],
+                         minlength=limit + 1)
+    return 1 - np.cumsum(deaths) / len(results["died"])
+
+
+def summarize_campaigns(results):
+    """
+    Headline numbers for a batch of campaigns.
+
+    Args:
+        results (dict): Output of simulate_campaigns()
+
+    Returns:
+        dict: campaigns, median_encounters, mean_encounters,
+            survived_all (fraction alive at max_encounters), mean_level
+            and max_level
+    """
+    curve = survival_curve(results)
+    # The median is the first encounter count where half have died
+    below_half = np.flatnonzero(curve <= 0.5)
+    return {
+        "campaigns": len(results["died"]),
+        "median_encounters": (int(below_half[0]) if len(below_half)
+                              else None),
+        "mean_encounters": float(results["encounters"].mean()),
+        "survived_all": float(curve[-1]),
+        "mean_level": float(results["level"].mean()),
+        "max_level": int(results["level"].max()),
+    }
+
+
+def display_survival(results, title="SURVIVAL CURVE", marks=(5, 10, 15,
+                                                              20, 25, 30)):
+    """
+    Print the survival curve at a few encounter counts, with bars.
+
+    Args:
+        results (dict): Output of simulate_campaigns()
+        title (str): Heading
+        marks (tuple): Encounter counts to show
+    """
+    curve = survival_curve(results)
+    summary = summarize_campaigns(results)
+
+    print("\n" + "=" * 60)
+    print(title)
+    print("=" * 60)
+    for mark in marks:
+        if mark < len(curve):
+            alive = curve[mark]
+            print(f"  after {mark:>3} encounters: {alive:6.1%} "
+                  f"{'#' * round(alive * 40)}")
+    median = summary["median_encounters"]
+    print(f"Median campaign: "
+          f"{median if median is not None else 'over ' + str(len(curve) - 1)}"
+          f" encounters, average level reached {summary['mean_level']:.1f} "
+          f"(best {summary['max_level']})")
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    import combat_simulator
+    from game_io import NullIO
+
+    print("=" * 60)
+    print("CAMPAIGN SIMULATOR")
+    print("=" * 60)
+
+    # One campaign, told in full (first few encounters only)
+    play_campaign(policy=combat_simulator.potion_at(0.4),
+                  economy={"max_encounters": 3}, rng=random.Random(1))
+
+    # The two engines should agree
+    runs = 2_000
+    rng = random.Random(2)
+    scalar = [play_campaign(policy=combat_simulator.potion_at(0.4),
+                            rng=rng, io=NullIO())["encounters"]
+              for _ in range(runs)]
+    vectorized = simulate_campaigns(
+        runs, policy=combat_vectorized.potion_at(0.4), seed=2)
+    print(f"\nAverage campaign length over {runs:,} campaigns: "
+          f"play_campaign {sum(scalar) / runs:.2f}, "
+          f"simulate_campaigns {vectorized['encounters'].mean():.2f}")
+
+    # Speed and survival curves for a few economies
+    count = 100_000
+    for name, economy in (("Default rules", None),
+                          ("Cheap potions", {"potion_price": 10}),
+                          ("No resting", {"rest_heal": 0})):
+        start = time.perf_counter()
+        results = simulate_campaigns(
+            count, policy=combat_vectorized.potion_at(0.4), economy=economy,
+            seed=3)
+        elapsed = time.perf_counter() - start
+        display_survival(results, f"{name.upper()}: {count:,} campaigns in "
+                                  f"{elapsed:.2f}s "
+                                  f"({count / elapsed:,.0f}/sec)")
@@ -0,0 +1,234 @@
+"""
+Character Batch: Making Many Characters Without Asking Questions
+Alberta CSE 1120: Structured Programming 2
+
+create_character() asks the player for a name and how to spend the
+attribute points, so it makes one character at a time. Simulations and
+load tests need thousands - or millions - of characters. This module makes
+them in bulk with the SAME rules as Phase 1:
+
+- TOTAL_POINTS points split between health and mana
+- health = BASE_HEALTH + points * POINTS_TO_HEALTH_RATIO
+- mana = BASE_MANA + points * POINTS_TO_MANA_RATIO
+- starting gold from MIN_GOLD to MAX_GOLD, like generate_starting_gold()
+
+How the points are split is chosen by an ALLOCATION: a list of weights,
+one for each possible number of health points (0 to TOTAL_POINTS). Every
+column is made with one NumPy call, so a million characters take well
+under a second as arrays ("columns"), or a little longer as dictionaries.
+
+Learning Objectives:
+- Weighted random choices
+- Building whole columns of data at once with NumPy
+- Turning columns back into rows (dictionaries) with zip()
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+from math import comb
+
+import numpy as np
+
+from phase1_character_creation import (
+    BASE_HEALTH,
+    BASE_MANA,
+    MAX_GOLD,
+    MIN_GOLD,
+    POINTS_TO_HEALTH_RATIO,
+    POINTS_TO_MANA_RATIO,
+    TOTAL_POINTS,
+)
+
+# Names handed out when none are given
+HERO_NAMES = ("Aria", "Borin", "Cael", "Dara", "Eldon", "Fen", "Gwyn",
+              "Hale", "Iris", "Jorn", "Kira", "Lorn", "Mira", "Nox",
+              "Orla", "Pike")
+
+# Columns in every batch (the same keys create_character() uses, plus
+# the ones combat adds)
+COLUMNS = ("health", "max_health", "mana", "max_mana", "gold",
+           "experience", "health_potions")
+
+
+# ============================================================================
+# ALLOCATIONS
+# ============================================================================
+# weights[i] = how likely it is that i points go to health (the rest go
+# to mana). The weights do not have to add up to 1.
+
+def binomial_weights(chance):
+    """
+    Weights for spending each point on health with the same chance.
+    Teaches: math.comb, the binomial distribution
+
+    Args:
+        chance (float): Chance that any one point goes to health
+
+    Returns:
+        list: TOTAL_POINTS + 1 weights
+    """
+    return [comb(TOTAL_POINTS, k) * chance ** k
+            * (1 - chance) ** (TOTAL_POINTS - k)
+            for k in range(TOTAL_POINTS + 1)]
+
+
+ALLOCATIONS = {
+    "uniform": [1] * (TOTAL_POINTS + 1),        # Every split equally likely
+    "balanced": binomial_weights(0.5),          # Mostly near 10/10
+    "warrior": binomial_weights(0.8),           # Mostly health
+    "mage": binomial_weights(0.2),              # Mostly mana
+    "all_health": [0] * TOTAL_POINTS + [1],
+    "all_mana": [1] + [0] * TOTAL_POINTS,
+}
+
+
+def allocation_probabilities(allocation):
+    """
+    Turn an allocation into probabilities that add up to 1.
+
+    Args:
+        allocation (str or list): A name from ALLOCATIONS, or
+            TOTAL_POINTS + 1 weights
+
+    Returns:
+        numpy.ndarray: Probability of each number of health points
+    """
+    if isinstance(allocation, str):
+        if allocation not in ALLOCATIONS:
+            raise ValueError(f"Unknown allocation {allocation!r}; choose "
+                             f"from {', '.join(ALLOCATIONS)}")
+        allocation = ALLOCATIONS[allocation]
+
+    weights = np.asarray(allocation, dtype=float)
+    if weights.shape != (TOTAL_POINTS + 1,):
+        raise ValueError(f"An allocation needs {TOTAL_POINTS + 1} weights "
+                         f"(0 to {TOTAL_POINTS} health points)")
+    if (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError("Allocation weights must be positive")
+    return weights / weights.sum()
+
+
+# ============================================================================
+# GENERATING CHARACTERS
+# ============================================================================
+
+def generate_columns(count, allocation="uniform", names=HERO_NAMES,
+                     health_potions=0, seed=None):
+    """
+    Make `count` characters as columns (one NumPy array per stat).
+    Teaches: Whole-array arithmetic instead of a loop
+
+    Args:
+        count (int): Number of characters
+        allocation (str or list): How points are split (see ALLOCATIONS)
+        names (sequence): Names to pick from at random
+        health_potions (int): Potions each character starts with
+        seed (int, optional): Seed for a repeatable batch
+
+    Returns:
+        dict: "names" (the distinct names), "name_id" (index into names
+            for every character) and one int32 array per COLUMNS entry
+    """
+    rng = np.random.default_rng(seed)
+    names = tuple(names)
+    if not names:
+        raise ValueError("At least one name is needed")
+
+    health_points = rng.choice(TOTAL_POINTS + 1, size=count,
+                               p=allocation_probabilities(allocation))
+    health = BASE_HEALTH + health_points * POINTS_TO_HEALTH_RATIO
+    mana = BASE_MANA + (TOTAL_POINTS - health_points) * POINTS_TO_MANA_RATIO
+
+    name_type = np.uint16 if len(names) <= 1 << 16 else np.uint32
+    return {
+        "names": names,
+        "name_id": rng.integers(0, len(names), size=count, dtype=name_type),
+        "health": health.astype(np.int32),
+        "max_health": health.astype(np.int32),
+        "mana": mana.astype(np.int32),
+        "max_mana": mana.astype(np.int32),
+        "gold": rng.integers(MIN_GOLD, MAX_GOLD + 1, size=count,
+                             dtype=np.int32),
+        "experience": np.zeros(count, dtype=np.int32),
+        "health_potions": np.full(count, health_potions, dtype=np.int32),
+    }
+
+
+def columns_to_dicts(columns):
+    """
+    Turn columns from generate_columns() into character dictionaries.
+
+    Args:
+        columns (dict): Output of generate_columns()
+
+    Returns:
+        list: Dictionaries like the one create_character() returns
+    """
+    names = columns["names"]
+    # tolist() turns each column into plain Python ints in one step
+    name_list = [names[i] for i in columns["name_id"].tolist()]
+    return [{"name": name, "health": health, "max_health": max_health,
+             "mana": mana, "max_mana": max_mana, "gold": gold,
+             "experience": experience, "health_potions": potions}
+            for name, health, max_health, mana, max_mana, gold, experience,
+            potions in zip(name_list,
+                           *(columns[key].tolist() for key in COLUMNS))]
+
+
+def generate_characters(count, allocation="uniform", names=HERO_NAMES,
+                        health_potions=0, seed=None, columnar=False):
+    """
+    Make `count` characters with Phase 1's rules, without any questions.
+
+    Args:
+        count (int): Number of characters
+        allocation (str or list): How points are split (see ALLOCATIONS)
+        names (sequence): Names to pick from at random
+        health_potions (int): Potions each character starts with
+        seed (int, optional): Seed for a repeatable batch
+        columnar (bool): Return columns instead of dictionaries
+
+    Returns:
+        list or dict: Character dictionaries, or the columns from
+            generate_columns()
+    """
+    columns = generate_columns(count, allocation, names, health_potions,
+                               seed)
+    if columnar:
+        return columns
+    return columns_to_dicts(columns)
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from combat_simulator import display_results, potion_at, run_simulation
+
+    print("=" * 60)
+    print("BATCH CHARACTER GENERATION")
+    print("=" * 60)
+
+    for columnar in (True, False):
+        start = time.perf_counter()
+        batch = generate_characters(1_000_000, "balanced", seed=1,
+                                    columnar=columnar)
+        label = "columns" if columnar else "dicts"
+        print(f"1,000,000 characters as {label}: "
+              f"{time.perf_counter() - start:.2f}s")
+
+    print(f"\nFirst character: {batch[0]}")
+
+    # Feed one character of each build to the simulator
+    for allocation in ("warrior", "mage"):
+        hero = generate_characters(1, allocation, health_potions=3, seed=2)[0]
+        results = run_simulation(20_000, potion_at(0.4), hero,
+                                 rng=random.Random(3))
+        display_results(results, f"{allocation.upper()}: {hero['name']} "
+                                 f"({hero['health']} HP)")
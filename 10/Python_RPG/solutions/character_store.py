@@ -0,0 +1,356 @@
+"""
+Character Store: Saving and Loading Characters
+Alberta CSE 1120: Structured Programming 2
+
+create_character() returns a dictionary that disappears when the program
+ends. This module saves characters to a file and loads them back, in two
+formats:
+
+- JSON (.json): easy to read and edit by hand, but every number is text
+  that has to be parsed again when loading
+- Binary (.chr, anything else): every character is a FIXED-SIZE record of
+  packed numbers (made with the struct module), and all the names are
+  stored once each in a "string table" at the end of the file
+
+Because every record is the same size, character number i always starts
+at byte HEADER.size + i * RECORD.size. CharacterFile uses that with mmap:
+the operating system maps the file into memory and only the pages that
+are actually touched are read, so looking up one character in a file of
+millions is instant and nothing is parsed ahead of time.
+
+Binary file layout:
+
+    header   | magic "RPGC", version, record size, count, string table start
+    records  | count x RECORD (name offset, name length, then the numbers)
+    strings  | the names, UTF-8, each distinct name stored once
+
+Learning Objectives:
+- Reading and writing files in binary mode
+- Packing numbers into bytes with struct
+- Fixed-size records and computing positions with arithmetic
+- Memory-mapped files (mmap)
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import json
+import mmap
+import struct
+
+MAGIC = b"RPGC"
+VERSION = 1
+
+# Header: magic, version, record size, character count, string table offset
+HEADER = struct.Struct("<4sHHQQ")
+
+# Numbers saved for every character, in record order. health can drop
+# below zero in a fight, so the current values are signed ("i").
+NUMBER_FIELDS = ("health", "max_health", "mana", "max_mana", "gold",
+                 "experience", "health_potions")
+
+# name offset, name length, then NUMBER_FIELDS ("<" = no padding)
+RECORD = struct.Struct("<IHiIiIIIH")
+
+
+# ============================================================================
+# BINARY FORMAT
+# ============================================================================
+
+def pack_characters(characters):
+    """
+    Turn characters into the bytes of a binary character file.
+    Teaches: struct.pack_into, building a string table with a dictionary
+
+    Args:
+        characters (iterable): Character dictionaries (as made by
+            create_character(); missing experience/potions count as 0)
+
+    Returns:
+        bytearray: The whole file
+    """
+    characters = list(characters)
+    records = bytearray(RECORD.size * len(characters))
+    strings = bytearray()
+    name_offsets = {}       # name -> (offset, length) in the string table
+
+    position = 0
+    for character in characters:
+        name = character["name"]
+        if name not in name_offsets:
+            encoded = name.encode("utf-8")
+            name_offsets[name] = (len(strings), len(encoded))
+            strings += encoded
+        offset, length = name_offsets[name]
+
+        RECORD.pack_into(records, position, offset, length,
+                         character["health"], character["max_health"],
+                         character["mana"], character["max_mana"],
+                         character["gold"], character.get("experience", 0),
+                         character.get("health_potions", 0))
+        position += RECORD.size
+
+    header = HEADER.pack(MAGIC, VERSION, RECORD.size, len(characters),
+                         HEADER.size + len(records))
+    return bytearray(header) + records + strings
+
+
+def read_header(data):
+    """
+    Check and unpack the header of a binary character file.
+
+    Args:
+        data (bytes-like): File contents (or an mmap of the file)
+
+    Returns:
+        tuple: (count, string table offset)
+
+    Raises:
+        ValueError: If the data is not a character file this module reads
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("File is too short to be a character file")
+    magic, version, record_size, count, strings_at = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a character file (bad magic number)")
+    if version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"Unsupported character file version {version}")
+    if (strings_at != HEADER.size + count * RECORD.size
+            or strings_at > len(data)):
+        raise ValueError("Character file is truncated or damaged")
+    return count, strings_at
+
+
+def unpack_record(data, fields, strings_at):
+    """
+    Build a character dictionary from one unpacked record.
+
+    Args:
+        data (bytes-like): File contents
+        fields (tuple): Output of RECORD.unpack_from()
+        strings_at (int): Start of the string table
+
+    Returns:
+        dict: Character data
+    """
+    start = strings_at + fields[0]
+    character = {"name": str(data[start:start + fields[1]], "utf-8")}
+    character.update(zip(NUMBER_FIELDS, fields[2:]))
+    return character
+
+
+def unpack_characters(data):
+    """
+    Read every character from the bytes of a binary character file.
+    Teaches: struct.iter_unpack to read many records in one loop
+
+    Args:
+        data (bytes-like): File contents
+
+    Returns:
+        list: Character dictionaries
+    """
+    count, strings_at = read_header(data)
+    view = memoryview(data)
+    records = list(RECORD.iter_unpack(view[HEADER.size:strings_at]))
+
+    # Decode each distinct name once (every copy of a name shares an offset)
+    names = {}
+    for offset, length, *_ in records:
+        if offset not in names:
+            start = strings_at + offset
+            names[offset] = str(view[start:start + length], "utf-8")
+
+    # Spelling out the keys makes each dictionary in one quick step
+    return [{"name": names[offset], "health": health,
+             "max_health": max_health, "mana": mana, "max_mana": max_mana,
+             "gold": gold, "experience": experience,
+             "health_potions": potions}
+            for (offset, _, health, max_health, mana, max_mana, gold,
+                 experience, potions) in records]
+
+
+# ============================================================================
+# RANDOM ACCESS WITH MMAP
+# ============================================================================
+
+class CharacterFile:
+    """
+    A binary character file opened for random access by character ID
+    (0, 1, 2, ... in the order they were saved). Use it in a with block
+    so the file is closed afterwards.
+
+    Args:
+        path (str): Binary character file
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+            self.count, self.strings_at = read_header(self.data)
+        except (ValueError, OSError):
+            self.file.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Release the mapping and close the file.
+
+        Raises:
+            BufferError: If an array from columns() still points into the
+                mapping (the file is closed anyway)
+        """
+        try:
+            self.data.close()
+        finally:
+            self.file.close()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, character_id):
+        """
+        Load one character without reading the others.
+
+        Args:
+            character_id (int): Position in the file (negative counts
+                from the end, like a list)
+
+        Returns:
+            dict: Character data
+        """
+        if character_id < 0:
+            character_id += self.count
+        if not 0 <= character_id < self.count:
+            raise IndexError(f"No character with ID {character_id}")
+        fields = RECORD.unpack_from(self.data,
+                                    HEADER.size + character_id * RECORD.size)
+        return unpack_record(self.data, fields, self.strings_at)
+
+    def __iter__(self):
+        for character_id in range(self.count):
+            yield self[character_id]
+
+    def columns(self):
+        """
+        View all records as a NumPy structured array WITHOUT copying them
+        (needs NumPy). The name columns hold string table positions.
+        The array reads straight from the file, so it must be released
+        (del, or keep only a .copy()) before the file is closed - the
+        mapping cannot be closed while an array still points into it.
+
+        Returns:
+            numpy.ndarray: One row per character
+        """
+        import numpy as np
+
+        dtype = np.dtype([("name_offset", "<u4"), ("name_length", "<u2"),
+                          ("health", "<i4"), ("max_health", "<u4"),
+                          ("mana", "<i4"), ("max_mana", "<u4"),
+                          ("gold", "<u4"), ("experience", "<u4"),
+                          ("health_potions", "<u2")])
+        return np.frombuffer(self.data, dtype=dtype, count=self.count,
+                             offset=HEADER.size)
+
+
+# ============================================================================
+# SAVING AND LOADING
+# ============================================================================
+
+def is_json_path(path):
+    """True if `path` should use the JSON format."""
+    return str(path).lower().endswith(".json")
+
+
+def save_characters(path, characters):
+    """
+    Save characters to a file: JSON if the name ends in .json, otherwise
+    the binary format.
+
+    Args:
+        path (str): File to write
+        characters (iterable): Character dictionaries
+
+    Returns:
+        int: Number of characters saved
+    """
+    characters = list(characters)
+    if is_json_path(path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(characters, file)
+    else:
+        with open(path, "wb") as file:
+            file.write(pack_characters(characters))
+    return len(characters)
+
+
+def load_characters(path):
+    """
+    Load every character saved with save_characters().
+
+    Args:
+        path (str): File to read
+
+    Returns:
+        list: Character dictionaries
+    """
+    if is_json_path(path):
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    with open(path, "rb") as file:
+        return unpack_characters(file.read())
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+
+    from character_batch import generate_characters
+
+    print("=" * 60)
+    print("CHARACTER STORE DEMO")
+    print("=" * 60)
+
+    # Characters made with Phase 1's rules (see character_batch.py)
+    roster = generate_characters(
+        200_000, names=["Aria", "Borin", "Cael", "Dara", "Eldon", "Fen"],
+        seed=1)
+
+    folder = tempfile.mkdtemp()
+    for filename in ("roster.json", "roster.chr"):
+        path = os.path.join(folder, filename)
+        start = time.perf_counter()
+        save_characters(path, roster)
+        saved = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = load_characters(path)
+        load_time = time.perf_counter() - start
+        print(f"\n{filename}: {os.path.getsize(path) / 1e6:.1f} MB, "
+              f"save {saved:.2f}s, load {load_time:.2f}s")
+        os.remove(path)
+
+    path = os.path.join(folder, "roster.chr")
+    save_characters(path, roster)
+    with CharacterFile(path) as characters:
+        print(f"\nRandom access: character #123456 of {len(characters):,} "
+              f"is {characters[123456]}")
+        table = characters.columns()
+        print(f"Average gold from the column view: "
+              f"{table['gold'].mean():.2f}")
+        del table
+    os.remove(path)
+    os.rmdir(folder)
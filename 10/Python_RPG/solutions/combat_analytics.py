@@ -0,0 +1,583 @@
+"""
+Combat Analytics: Statistics Over Endless Streams of Fights
+Alberta CSE 1120: Structured Programming 2
+
+combat_loop() prints turns and damage totals for one fight and then
+forgets them. run_simulation() keeps Counters, which grow with every new
+value they see. To watch BILLIONS of fights we need statistics whose
+memory never grows, no matter how many fights go past:
+
+- RunningStats: count, mean, variance, min and max with Welford's method
+  (one pass, no list of values, numerically stable)
+- P2Quantile: an estimate of a quantile (like the median or the 95th
+  percentile) using just five markers - the P-squared algorithm by Jain
+  and Chlamtac
+- Histogram: counts in a fixed number of bins
+
+Statistics from separate streams (e.g. worker processes) can be MERGED:
+RunningStats, Histogram, MeasureStats and CombatAnalytics all have a
+merge() method. P-squared markers cannot be combined, so after a merge a
+MeasureStats reads its quantiles from its (merged) histogram instead.
+
+The pipeline is built from GENERATORS: play_fights() produces outcomes
+one at a time, CombatAnalytics groups them by policy and monster, and
+stream_snapshots() hands back a summary every N fights. Nothing is ever
+stored in a list, so memory stays the same from the first fight to the
+billionth.
+
+Learning Objectives:
+- Generators and lazy pipelines
+- One-pass (streaming) algorithms for mean and variance
+- Estimating quantiles without sorting
+- Classes that combine (merge) results from separate runs
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import math
+import random
+from bisect import bisect_right, insort
+
+from combat_simulator import always_attack, simulate_fight
+from monster_registry import spawn_random
+from phase2_combat_system import create_test_player
+
+# Measures tracked for every fight ("damage_per_turn" is worked out from
+# the other two, just like combat_loop()'s statistics block)
+MEASURES = ("turns", "damage_dealt", "damage_taken", "damage_per_turn")
+
+# Quantiles estimated for every measure
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+# ============================================================================
+# RUNNING MEAN AND VARIANCE
+# ============================================================================
+
+class RunningStats:
+    """
+    Count, mean, variance, min and max of a stream of numbers, in constant
+    memory (Welford's algorithm).
+    """
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0               # Sum of squared distances from the mean
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        """
+        Include one value.
+        Teaches: Updating an average without keeping the values
+
+        Args:
+            value (float): New value
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """
+        Combine with statistics collected somewhere else (e.g. another
+        process), as if all the values had been added here.
+
+        Args:
+            other (RunningStats): Statistics to fold in
+        """
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self):
+        """Sample variance (0.0 with fewer than two values)."""
+        if self.count < 2:
+            return 0.0
+        return self.m2 / (self.count - 1)
+
+    @property
+    def stdev(self):
+        """Sample standard deviation."""
+        return math.sqrt(self.variance)
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: count, mean, stdev, min and max
+        """
+        if self.count == 0:
+            return {"count": 0}
+        return {"count": self.count, "mean": self.mean, "stdev": self.stdev,
+                "min": self.min, "max": self.max}
+
+
+# ============================================================================
+# QUANTILE SKETCH
+# ============================================================================
+
+class P2Quantile:
+    """
+    Streaming estimate of one quantile with five markers (the P-squared
+    algorithm). The first five values are kept exactly; after that the
+    markers are nudged towards where the quantile should be.
+
+    Args:
+        quantile (float): Between 0 and 1, e.g. 0.5 for the median
+    """
+
+    __slots__ = ("quantile", "heights", "positions", "steps", "count")
+
+    def __init__(self, quantile):
+        if not 0 < quantile < 1:
+            raise ValueError("quantile must be between 0 and 1")
+        q = quantile
+        self.quantile = q
+        self.heights = []                       # Marker values
+        self.positions = [1, 2, 3, 4, 5]        # Marker positions
+        self.steps = (0, q / 2, q, (1 + q) / 2, 1)
+        self.count = 0
+
+    def add(self, value):
+        """
+        Include one value.
+
+        Args:
+            value (float): New value
+        """
+        heights = self.heights
+        self.count += 1
+        if self.count <= 5:
+            insort(heights, value)
+            return
+
+        # Find the cell the value falls in, stretching the ends if needed
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = bisect_right(heights, value, 1, 4) - 1
+
+        positions = self.positions
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+
+        # Move the three middle markers if they have drifted too far from
+        # where they should be (1 + (count - 1) * step)
+        grown = self.count - 1
+        for i in (1, 2, 3):
+            gap = 1 + grown * self.steps[i] - positions[i]
+            if ((gap >= 1 and positions[i + 1] - positions[i] > 1)
+                    or (gap <= -1 and positions[i - 1] - positions[i] < -1)):
+                step = 1 if gap > 0 else -1
+                height = self.parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = self.linear(i, step)
+                heights[i] = height
+                positions[i] += step
+
+    def parabolic(self, i, step):
+        """Piecewise-parabolic prediction for marker i moved by step."""
+        h = self.heights
+        n = self.positions
+        return h[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (h[i] - h[i - 1]) / (n[i] - n[i - 1]))
+
+    def linear(self, i, step):
+        """Linear prediction, used when the parabola overshoots."""
+        h = self.heights
+        n = self.positions
+        return h[i] + step * (h[i + step] - h[i]) / (n[i + step] - n[i])
+
+    @property
+    def value(self):
+        """
+        The current estimate (exact while there are five values or fewer).
+
+        Returns:
+            float: Estimated quantile, or None before any values
+        """
+        heights = self.heights
+        if not heights:
+            return None
+        if len(heights) < 5:
+            return heights[min(len(heights) - 1,
+                               int(self.quantile * len(heights)))]
+        return heights[2]
+
+
+# ============================================================================
+# HISTOGRAM
+# ============================================================================
+
+class Histogram:
+    """
+    Counts of values in equal-width bins from `low` up to `high`. Values
+    outside the range are counted as under/over, so the memory used
+    never changes.
+
+    Args:
+        low (float): Start of the first bin
+        high (float): End of the last bin
+        bins (int): Number of bins
+    """
+
+    __slots__ = ("low", "high", "width", "counts", "under", "over")
+
+    def __init__(self, low, high, bins):
+        self.low = low
+        self.high = high
+        self.width = (high - low) / bins
+        self.counts = [0] * bins
+        self.under = 0
+        self.over = 0
+
+    def add(self, value):
+        """Count one value."""
+        if value < self.low:
+            self.under += 1
+        elif value >= self.high:
+            self.over += 1
+        else:
+            self.counts[int((value - self.low) / self.width)] += 1
+
+    def merge(self, other):
+        """
+        Add the counts from a histogram with the same bins.
+
+        Args:
+            other (Histogram): Histogram to fold in
+
+        Raises:
+            ValueError: If the bins are different
+        """
+        if (other.low, other.high, len(other.counts)) != (
+                self.low, self.high, len(self.counts)):
+            raise ValueError("Histograms with different bins cannot be "
+                             "merged")
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.under += other.under
+        self.over += other.over
+
+    def quantile(self, quantile):
+        """
+        Estimate a quantile from the counts, assuming the values in a bin
+        are spread evenly across it. Values under or over the range count
+        as `low` or `high`.
+        Teaches: Walking through running totals
+
+        Args:
+            quantile (float): Between 0 and 1
+
+        Returns:
+            float: Estimated quantile, or None before any values
+        """
+        total = self.under + sum(self.counts) + self.over
+        if total == 0:
+            return None
+        wanted = quantile * total
+        seen = self.under
+        if wanted <= seen:
+            return self.low
+        for i, count in enumerate(self.counts):
+            if count and wanted <= seen + count:
+                return self.low + self.width * (i + (wanted - seen) / count)
+            seen += count
+        return self.high
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: low, width, counts, under and over
+        """
+        return {"low": self.low, "width": self.width,
+                "counts": list(self.counts),
+                "under": self.under, "over": self.over}
+
+
+# Histogram ranges for each measure: (low, high, bins)
+HISTOGRAM_RANGES = {
+    "turns": (0, 40, 40),
+    "damage_dealt": (0, 200, 40),
+    "damage_taken": (0, 200, 40),
+    "damage_per_turn": (0, 30, 30),
+}
+
+
+# ============================================================================
+# GROUPED STATISTICS
+# ============================================================================
+
+class MeasureStats:
+    """
+    RunningStats, quantile estimates and a histogram for one measure.
+
+    Args:
+        measure (str): One of MEASURES
+    """
+
+    __slots__ = ("running", "quantiles", "histogram")
+
+    def __init__(self, measure):
+        self.running = RunningStats()
+        self.quantiles = [P2Quantile(q) for q in QUANTILES]
+        self.histogram = Histogram(*HISTOGRAM_RANGES[measure])
+
+    def add(self, value):
+        """Include one value everywhere."""
+        self.running.add(value)
+        if self.quantiles is not None:
+            for sketch in self.quantiles:
+                sketch.add(value)
+        self.histogram.add(value)
+
+    def merge(self, other):
+        """
+        Combine with statistics for the same measure collected somewhere
+        else. The P-squared markers cannot be combined, so from now on
+        the quantiles are estimated from the merged histogram.
+
+        Args:
+            other (MeasureStats): Statistics to fold in
+        """
+        self.running.merge(other.running)
+        self.histogram.merge(other.histogram)
+        self.quantiles = None
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: Running stats plus "p50", "p90", ... and "histogram"
+        """
+        summary = self.running.to_dict()
+        if self.quantiles is None:
+            for quantile in QUANTILES:
+                summary[f"p{quantile * 100:g}"] = self.histogram.quantile(
+                    quantile)
+        else:
+            for sketch in self.quantiles:
+                summary[f"p{sketch.quantile * 100:g}"] = sketch.value
+        summary["histogram"] = self.histogram.to_dict()
+        return summary
+
+
+class CombatAnalytics:
+    """
+    Streaming statistics for fight outcomes, grouped by (policy, monster).
+    """
+
+    def __init__(self):
+        self.groups = {}        # (policy, monster) -> group dictionary
+        self.fights = 0
+
+    def group(self, policy, monster):
+        """
+        Statistics for one policy and monster (created when first seen).
+
+        Returns:
+            dict: fights, win/loss/fled counts and one MeasureStats per
+                measure
+        """
+        key = (policy, monster)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = {
+                "fights": 0, "win": 0, "loss": 0, "fled": 0,
+                "measures": {name: MeasureStats(name) for name in MEASURES},
+            }
+        return group
+
+    def add(self, outcome):
+        """
+        Include one outcome from simulate_fight() (with a "policy" key
+        added, as play_fights() does).
+
+        Args:
+            outcome (dict): Fight outcome
+        """
+        self.fights += 1
+        group = self.group(outcome.get("policy", "?"), outcome["monster"])
+        group["fights"] += 1
+        group[outcome["result"]] += 1
+
+        measures = group["measures"]
+        turns = outcome["turns"]
+        measures["turns"].add(turns)
+        measures["damage_dealt"].add(outcome["damage_dealt"])
+        measures["damage_taken"].add(outcome["damage_taken"])
+        if turns:
+            measures["damage_per_turn"].add(outcome["damage_dealt"] / turns)
+
+    def merge(self, other):
+        """
+        Combine with analytics collected somewhere else (e.g. another
+        process), group by group.
+
+        Args:
+            other (CombatAnalytics): Analytics to fold in
+        """
+        self.fights += other.fights
+        for key, theirs in other.groups.items():
+            group = self.group(*key)
+            for count in ("fights", "win", "loss", "fled"):
+                group[count] += theirs[count]
+            for name, stats in theirs["measures"].items():
+                group["measures"][name].merge(stats)
+
+    def snapshot(self):
+        """
+        Summarize everything seen so far as plain data.
+
+        Returns:
+            dict: "fights" plus "groups": {"policy/monster": summary}
+        """
+        groups = {}
+        for (policy, monster), group in sorted(self.groups.items()):
+            fights = group["fights"]
+            groups[f"{policy}/{monster}"] = {
+                "fights": fights,
+                "win_rate": group["win"] / fights,
+                "loss_rate": group["loss"] / fights,
+                "fled_rate": group["fled"] / fights,
+                **{name: stats.to_dict()
+                   for name, stats in group["measures"].items()},
+            }
+        return {"fights": self.fights, "groups": groups}
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+def play_fights(count, policy=always_attack, player=None,
+                monster_factory=spawn_random, rng=random):
+    """
+    Generate fight outcomes one at a time.
+    Teaches: Generators - values are made only when asked for
+
+    Args:
+        count (int): Number of fights (None = never stop)
+        policy (function): Chooses the player's action each turn
+        player (dict, optional): Player to copy for every fight
+        monster_factory (function): Creates each monster, called with rng
+        rng (optional): Random number generator
+
+    Yields:
+        dict: Outcome from simulate_fight(), plus "policy"
+    """
+    if player is None:
+        player = create_test_player()
+    played = 0
+    while count is None or played < count:
+        outcome = simulate_fight(player, monster_factory(rng), policy, rng)
+        outcome["policy"] = policy.__name__
+        yield outcome
+        played += 1
+
+
+def stream_snapshots(outcomes, every=100_000, analytics=None):
+    """
+    Feed outcomes into CombatAnalytics and hand back a snapshot every
+    `every` fights (and one at the end, if the stream ends).
+
+    Args:
+        outcomes (iterable): Fight outcomes (any iterator, even endless)
+        every (int): Fights between snapshots
+        analytics (CombatAnalytics, optional): Add to existing statistics
+
+    Yields:
+        dict: CombatAnalytics.snapshot()
+    """
+    if analytics is None:
+        analytics = CombatAnalytics()
+    since_snapshot = 0
+    for outcome in outcomes:
+        analytics.add(outcome)
+        since_snapshot += 1
+        if since_snapshot == every:
+            yield analytics.snapshot()
+            since_snapshot = 0
+    if since_snapshot:
+        yield analytics.snapshot()
+
+
+def display_snapshot(snapshot, measure="turns"):
+    """
+    Print one line per group for a snapshot.
+
+    Args:
+        snapshot (dict): Output of CombatAnalytics.snapshot()
+        measure (str): Measure to show quantiles for
+    """
+    print(f"\nAfter {snapshot['fights']:,} fights ({measure}):")
+    print(f"{'Group':<28}{'Fights':>10}{'Win %':>8}{'Mean':>8}"
+          f"{'Stdev':>8}{'p50':>7}{'p90':>7}{'p99':>7}")
+    for name, group in snapshot["groups"].items():
+        stats = group[measure]
+        print(f"{name:<28}{group['fights']:>10,}"
+              f"{group['win_rate'] * 100:>7.1f}%{stats['mean']:>8.2f}"
+              f"{stats['stdev']:>8.2f}{stats['p50']:>7.1f}"
+              f"{stats['p90']:>7.1f}{stats['p99']:>7.1f}")
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import itertools
+    import time
+
+    from combat_simulator import potion_at
+
+    print("=" * 60)
+    print("STREAMING COMBAT ANALYTICS")
+    print("=" * 60)
+
+    rng = random.Random(1)
+    # Two policies, interleaved into one stream
+    outcomes = itertools.chain.from_iterable(zip(
+        play_fights(100_000, always_attack, rng=rng),
+        play_fights(100_000, potion_at(0.4), rng=rng)))
+
+    start = time.perf_counter()
+    for snapshot in stream_snapshots(outcomes, every=50_000):
+        display_snapshot(snapshot)
+    print(f"\n{snapshot['fights']:,} fights in "
+          f"{time.perf_counter() - start:.1f}s")
+
+    # Two "workers" each watch their own stream; merging gives the totals
+    workers = []
+    for seed in (2, 3):
+        analytics = CombatAnalytics()
+        for outcome in play_fights(50_000, potion_at(0.4),
+                                   rng=random.Random(seed)):
+            analytics.add(outcome)
+        workers.append(analytics)
+    merged = CombatAnalytics()
+    for analytics in workers:
+        merged.merge(analytics)
+    display_snapshot(merged.snapshot())
+    print("(quantiles of merged streams come from the histograms)")
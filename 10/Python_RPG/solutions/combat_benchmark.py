@@ -0,0 +1,385 @@
+"""
+Combat Benchmarks: Measuring Speed and Memory Over Time
+Alberta CSE 1120: Structured Programming 2
+
+Did that change to combat_loop() make things slower? This harness times a
+fixed set of workloads, records operations per second and memory use,
+appends the numbers to a JSON history file, and compares them against a
+saved baseline. Anything worse than the threshold is flagged as a
+regression (and the program exits with status 1, so scripts can notice).
+
+Run it from this folder:
+
+    python combat_benchmark.py                  # run and compare
+    python combat_benchmark.py --save-baseline  # make this run the baseline
+    python combat_benchmark.py --quick          # smaller workloads
+
+Learning Objectives:
+- Timing code with time.perf_counter()
+- Measuring memory with tracemalloc
+- Saving and loading results as JSON
+- Command-line options with argparse
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HISTORY_FILE = os.path.join(HERE, "benchmark_history.json")
+BASELINE_FILE = os.path.join(HERE, "benchmark_baseline.json")
+
+DEFAULT_THRESHOLD = 0.10    # Flag anything more than 10% worse
+
+
+# ============================================================================
+# WORKLOADS
+# ============================================================================
+# Each workload is a function that takes a size and returns
+# (run, operations). Anything done before returning is setup and is not
+# timed; run() does the work, and operations is how many "things" run()
+# does (fights, monsters, characters) so we can report a rate.
+
+def bench_encounter_creation(size):
+    """Create `size` random monsters with create_random_monster()."""
+    from phase2_combat_system import create_random_monster
+
+    def run():
+        rng = random.Random(1)
+        return [create_random_monster(rng) for _ in range(size)]
+
+    return run, size
+
+
+def bench_registry_spawn(size):
+    """Create `size` random monsters with the registry's batch spawn."""
+    from monster_registry import spawn_batch
+
+    def run():
+        return spawn_batch(size, random.Random(1))
+
+    return run, size
+
+
+def bench_scripted_fight(size):
+    """Play `size` complete combat_loop() fights with output discarded."""
+    from combatant import spawn
+    from game_io import NullIO
+    from monster_registry import DEFAULT_REGISTRY
+    from phase2_combat_system import combat_loop, create_test_player
+
+    troll = DEFAULT_REGISTRY.template("Troll")
+
+    def run():
+        rng = random.Random(1)
+        quiet = NullIO()
+        for _ in range(size):
+            combat_loop(create_test_player(), spawn(troll),
+                        choose_action=lambda player, monster: "1",
+                        rng=rng, io=quiet)
+
+    return run, size
+
+
+def bench_headless_fights(size):
+    """Run `size` headless fights through combat_simulator."""
+    from combat_simulator import potion_at, run_simulation
+
+    policy = potion_at(0.4)
+
+    def run():
+        return run_simulation(size, policy, rng=random.Random(1))
+
+    return run, size
+
+
+def bench_character_creation(size):
+    """Create `size` characters through create_character() with scripted
+    answers and output discarded."""
+    from game_io import ScriptedIO
+    from phase1_character_creation import create_character
+
+    answers = ["Hero", "yes", "1", "12", "2", "8"]
+
+    def run():
+        rng = random.Random(1)
+        script = ScriptedIO(answers * size)
+        return [create_character(rng, script) for _ in range(size)]
+
+    return run, size
+
+
+# name -> (workload, normal size, quick size)
+BENCHMARKS = {
+    "encounter_creation": (bench_encounter_creation, 200_000, 20_000),
+    "registry_spawn": (bench_registry_spawn, 200_000, 20_000),
+    "scripted_fight": (bench_scripted_fight, 2_000, 200),
+    "headless_fights_100k": (bench_headless_fights, 100_000, 10_000),
+    "character_creation": (bench_character_creation, 5_000, 500),
+}
+
+
+# ============================================================================
+# MEASURING
+# ============================================================================
+
+def measure(workload, size, repeat=3):
+    """
+    Time a workload and measure its memory.
+
+    The rate comes from the FASTEST of `repeat` runs (slower runs are
+    usually the computer doing something else). Memory is measured in a
+    separate run, because tracemalloc slows everything down.
+
+    Args:
+        workload (function): One of the bench_* functions
+        size (int): Workload size
+        repeat (int): Timed runs
+
+    Returns:
+        dict: ops_per_sec, seconds, peak_kib and blocks_per_op
+    """
+    run, operations = workload(size)
+
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    # Memory: peak traced memory during the run, and memory blocks still
+    # held per operation by whatever the run returns
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    kept = run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks_after = sys.getallocatedblocks()
+    del kept
+
+    return {
+        "ops_per_sec": operations / best,
+        "seconds": best,
+        "peak_kib": peak / 1024,
+        "blocks_per_op": max(0, blocks_after - blocks_before) / operations,
+    }
+
+
+def run_benchmarks(names=None, quick=False, repeat=3):
+    """
+    Run the chosen benchmarks.
+
+    Args:
+        names (list, optional): Benchmarks to run (default: all)
+        quick (bool): Use the small sizes
+        repeat (int): Timed runs per benchmark
+
+    Returns:
+        dict: Benchmark name -> measurements (plus the size used)
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        workload, size, quick_size = BENCHMARKS[name]
+        if quick:
+            size = quick_size
+        results[name] = measure(workload, size, repeat)
+        results[name]["size"] = size
+    return results
+
+
+# ============================================================================
+# HISTORY AND BASELINE
+# ============================================================================
+
+def load_json(path, default):
+    """
+    Read a JSON file, or return `default` if it does not exist yet.
+
+    Args:
+        path (str): File to read
+        default: Value to use when the file is missing
+
+    Returns:
+        The file's contents
+    """
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_json(path, data):
+    """
+    Write data to a JSON file.
+
+    Args:
+        path (str): File to write
+        data: Anything json can store
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2)
+
+
+def make_record(results, quick):
+    """
+    Wrap results with the time and machine they came from.
+
+    Args:
+        results (dict): Output of run_benchmarks()
+        quick (bool): Whether the small sizes were used
+
+    Returns:
+        dict: One history entry
+    """
+    return {
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "quick": quick,
+        "results": results,
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare results with a baseline run.
+    A benchmark regresses if its rate drops, or its peak memory grows, by
+    more than `threshold` (0.10 = 10%).
+
+    Args:
+        results (dict): Output of run_benchmarks()
+        baseline (dict): Baseline record's "results"
+        threshold (float): Allowed fraction of change
+
+    Returns:
+        list: (name, measure, baseline value, current value, change,
+               regressed) tuples
+    """
+    rows = []
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]
+
+        change = current["ops_per_sec"] / old["ops_per_sec"] - 1
+        rows.append((name, "ops_per_sec", old["ops_per_sec"],
+                     current["ops_per_sec"], change, change < -threshold))
+
+        if old["peak_kib"] > 0:
+            change = current["peak_kib"] / old["peak_kib"] - 1
+            rows.append((name, "peak_kib", old["peak_kib"],
+                         current["peak_kib"], change, change > threshold))
+    return rows
+
+
+def display_results(results):
+    """
+    Print a table of benchmark results.
+
+    Args:
+        results (dict): Output of run_benchmarks()
+    """
+    print("\n" + "=" * 72)
+    print("BENCHMARK RESULTS")
+    print("=" * 72)
+    print(f"{'Benchmark':<24}{'Size':>9}{'Ops/sec':>14}"
+          f"{'Peak KiB':>12}{'Blocks/op':>12}")
+    print("-" * 72)
+    for name, r in results.items():
+        print(f"{name:<24}{r['size']:>9,}{r['ops_per_sec']:>14,.0f}"
+              f"{r['peak_kib']:>12,.0f}{r['blocks_per_op']:>12.2f}")
+    print("=" * 72)
+
+
+def display_comparison(rows, threshold):
+    """
+    Print the comparison with the baseline.
+
+    Args:
+        rows (list): Output of compare()
+        threshold (float): Threshold that was used
+    """
+    print(f"\nCompared with baseline (threshold {threshold:.0%}):")
+    for name, measure_name, old, new, change, regressed in rows:
+        flag = "REGRESSION" if regressed else "ok"
+        print(f"  {name:<24}{measure_name:<13}{old:>12,.1f} -> {new:>12,.1f}"
+              f"  {change:+7.1%}  {flag}")
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+def main(argv=None):
+    """
+    Command-line entry point.
+
+    Args:
+        argv (list, optional): Arguments (default: sys.argv)
+
+    Returns:
+        int: 0 if no regressions, 1 otherwise
+    """
+    parser = argparse.ArgumentParser(description="Combat benchmark suite")
+    parser.add_argument("names", nargs="*",
+                        help="benchmarks to run (default: all): "
+                             + ", ".join(BENCHMARKS))
+    parser.add_argument("--quick", action="store_true",
+                        help="use small workloads")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timed runs per benchmark (best is kept)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="fraction of change that counts as a regression")
+    parser.add_argument("--history", default=HISTORY_FILE,
+                        help="JSON file that collects every run")
+    parser.add_argument("--baseline", default=BASELINE_FILE,
+                        help="JSON file holding the baseline run")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    results = run_benchmarks(args.names or None, args.quick, args.repeat)
+    display_results(results)
+
+    record = make_record(results, args.quick)
+    history = load_json(args.history, [])
+    history.append(record)
+    save_json(args.history, history)
+
+    if args.save_baseline:
+        save_json(args.baseline, record)
+        print(f"\nSaved baseline to {args.baseline}")
+        return 0
+
+    baseline = load_json(args.baseline, None)
+    if baseline is None:
+        print("\nNo baseline yet - run with --save-baseline to create one.")
+        return 0
+    if baseline.get("quick") != args.quick:
+        print("\nBaseline used different sizes (--quick); not comparing.")
+        return 0
+
+    rows = compare(results, baseline["results"], args.threshold)
+    display_comparison(rows, args.threshold)
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
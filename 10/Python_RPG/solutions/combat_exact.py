@@ -0,0 +1,295 @@
+"""
+Exact Combat Odds: Dynamic Programming over Fight States
+Alberta CSE 1120: Structured Programming 2
+
+Simulating a million fights only ESTIMATES the win rate. This module works
+out the exact probabilities instead. A fight is fully described by three
+numbers - (player_hp, monster_hp, potions) - so we keep a table of "how
+likely is each state after N turns" and push that table forward one turn
+at a time. Identical states reached by different dice rolls are merged,
+which is what keeps the table small.
+
+Learning Objectives:
+- Probability as numbers that add up to 1
+- Dictionaries keyed by tuples
+- Merging repeated work (dynamic programming)
+- Caching function results with functools.lru_cache
+- Read-only views of a dictionary (types.MappingProxyType)
+- Exact arithmetic with fractions.Fraction
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+from collections import defaultdict
+from fractions import Fraction
+from functools import lru_cache
+from types import MappingProxyType
+
+from combat_simulator import ATTACK, DEFEND, FLEE, POTION
+from phase2_combat_system import (
+    BASE_DAMAGE,
+    CRITICAL_CHANCE,
+    CRITICAL_MULTIPLIER,
+    DAMAGE_VARIANCE,
+    FLEE_CHANCE,
+    MONSTER_TYPES,
+    POTION_HEAL_AMOUNT,
+    create_test_player,
+    create_troll,
+)
+from tournament import make_policy
+
+
+# ============================================================================
+# SINGLE ROLL DISTRIBUTIONS
+# ============================================================================
+
+def as_probability(value, exact):
+    """
+    Convert a float chance such as 0.20 into the number type being used.
+
+    Args:
+        value (float): Probability from the combat constants
+        exact (bool): True for Fraction, False for float
+
+    Returns:
+        Fraction or float: The probability
+    """
+    if exact:
+        return Fraction(str(value))
+    return value
+
+
+def player_damage_distribution(exact=False):
+    """
+    List every damage a player attack can deal and how likely it is.
+    Follows roll_player_damage(): base ±variance, then a chance to double.
+    Teaches: Building a probability table with a loop
+
+    Args:
+        exact (bool): Use Fraction instead of float
+
+    Returns:
+        dict: damage -> probability
+    """
+    low = BASE_DAMAGE - DAMAGE_VARIANCE
+    high = BASE_DAMAGE + DAMAGE_VARIANCE
+    each = as_probability(1, exact) / (high - low + 1)
+    critical = as_probability(CRITICAL_CHANCE, exact)
+
+    table = defaultdict(int)
+    for damage in range(low, high + 1):
+        table[damage] += each * (1 - critical)
+        table[damage * CRITICAL_MULTIPLIER] += each * critical
+    return dict(table)
+
+
+def monster_damage_distribution(min_damage, max_damage, player_defending,
+                                exact=False):
+    """
+    List every damage a monster attack can deal and how likely it is.
+    Follows roll_monster_damage(): uniform range, halved when defending.
+
+    Args:
+        min_damage (int): Smallest possible hit
+        max_damage (int): Largest possible hit
+        player_defending (bool): Whether the player is defending
+        exact (bool): Use Fraction instead of float
+
+    Returns:
+        dict: damage -> probability
+    """
+    each = as_probability(1, exact) / (max_damage - min_damage + 1)
+
+    table = defaultdict(int)
+    for damage in range(min_damage, max_damage + 1):
+        if player_defending:
+            damage = damage // 2
+        table[damage] += each
+    return dict(table)
+
+
+# ============================================================================
+# WHOLE FIGHT DISTRIBUTION
+# ============================================================================
+
+@lru_cache(maxsize=256)
+def solve_matchup(player_health, max_health, potions, monster_health,
+                  min_damage, max_damage, policy_spec=("always_attack",),
+                  exact=False, max_turns=200, tolerance=1e-15):
+    """
+    Work out the exact probability of every way a fight can end.
+    Results are cached, so asking about the same matchup again is a single
+    dictionary lookup. The policy is given as a spec such as
+    ("potion_at", 0.4), not a function: two potion_at(0.4) functions are
+    different objects, so they would never find each other in the cache.
+    The result is read-only, because every caller shares the cached copy.
+    Teaches: Dynamic programming, lru_cache
+
+    The table `states` maps (player_hp, monster_hp, potions) to the chance
+    of the fight being in that state at the start of the current turn.
+    Each turn we apply the policy's action and every possible dice roll,
+    moving probability into the next turn's table or into a finished
+    outcome.
+
+    Args:
+        player_health (int): Player's starting health
+        max_health (int): Player's maximum health
+        potions (int): Health potions carried
+        monster_health (int): Monster's starting health
+        min_damage (int): Monster's smallest hit
+        max_damage (int): Monster's largest hit
+        policy_spec (tuple): Policy, as in tournament.py
+        exact (bool): Use Fraction instead of float
+        max_turns (int): Stop after this many turns
+        tolerance (float): Stop once less than this much probability is
+            still in play (float mode only)
+
+    Returns:
+        mapping: "outcomes" maps (result, turns, hp_remaining) to probability,
+              and "unresolved" is the probability still in play at the end
+              (only above zero if a fight can go on forever, e.g. a monster
+              whose halved hit is 0 against a player who always defends)
+    """
+    policy = make_policy(policy_spec)
+    attack_table = player_damage_distribution(exact)
+    hit_table = monster_damage_distribution(min_damage, max_damage, False, exact)
+    defended_table = monster_damage_distribution(min_damage, max_damage, True,
+                                                 exact)
+    flee_chance = as_probability(FLEE_CHANCE, exact)
+
+    outcomes = defaultdict(int)
+    states = {(player_health, monster_health, potions): as_probability(1, exact)}
+    turns = 0
+
+    while states and turns < max_turns:
+        turns += 1
+        next_states = defaultdict(int)
+
+        def monster_turn(chance, hp, monster_hp, pots, table):
+            # Spread `chance` over every monster hit
+            for damage, p in table.items():
+                new_hp = hp - damage
+                if new_hp <= 0:
+                    outcomes[("loss", turns, 0)] += chance * p
+                else:
+                    next_states[(new_hp, monster_hp, pots)] += chance * p
+
+        for (hp, monster_hp, pots), chance in states.items():
+            action = policy(hp, max_health, pots, monster_hp)
+
+            if action == ATTACK:
+                for damage, p in attack_table.items():
+                    left = monster_hp - damage
+                    if left <= 0:
+                        outcomes[("win", turns, hp)] += chance * p
+                    else:
+                        monster_turn(chance * p, hp, left, pots, hit_table)
+
+            elif action == DEFEND:
+                monster_turn(chance, hp, monster_hp, pots, defended_table)
+
+            elif action == POTION and pots > 0:
+                healed = hp + min(POTION_HEAL_AMOUNT, max_health - hp)
+                monster_turn(chance, healed, monster_hp, pots - 1, hit_table)
+
+            elif action == FLEE:
+                outcomes[("fled", turns, hp)] += chance * flee_chance
+                monster_turn(chance * (1 - flee_chance), hp, monster_hp, pots,
+                             hit_table)
+
+            else:
+                # Invalid action or no potion left: the turn is wasted
+                monster_turn(chance, hp, monster_hp, pots, hit_table)
+
+        states = next_states
+        if not exact and sum(states.values()) < tolerance:
+            break
+
+    return MappingProxyType({
+        "outcomes": MappingProxyType(dict(outcomes)),
+        "unresolved": sum(states.values()),
+    })
+
+
+def matchup_odds(player, monster, policy_spec=("always_attack",),
+                 exact=False):
+    """
+    Summarize the exact outcome distribution for a player and a monster.
+    Teaches: Grouping one table into several smaller tables
+
+    Args:
+        player (dict): Player character data (health, max_health,
+            health_potions)
+        monster (dict): Monster data
+        policy_spec (tuple): Policy, as in tournament.py
+        exact (bool): Use Fraction instead of float
+
+    Returns:
+        dict: "win", "loss", "fled" and "unresolved" probabilities,
+              "turns" (turns -> probability over all endings),
+              "hp_remaining" (hp -> probability, wins only),
+              "expected_turns" and a copy of the raw "outcomes" table
+    """
+    solved = solve_matchup(player["health"], player["max_health"],
+                           player.get("health_potions", 0), monster["health"],
+                           monster["min_damage"], monster["max_damage"],
+                           tuple(policy_spec), exact)
+
+    totals = {"win": 0, "loss": 0, "fled": 0}
+    turns = defaultdict(int)
+    hp_remaining = defaultdict(int)
+
+    for (result, turn, hp), p in solved["outcomes"].items():
+        totals[result] += p
+        turns[turn] += p
+        if result == "win":
+            hp_remaining[hp] += p
+
+    return {
+        "win": totals["win"],
+        "loss": totals["loss"],
+        "fled": totals["fled"],
+        "unresolved": solved["unresolved"],
+        "turns": dict(sorted(turns.items())),
+        "hp_remaining": dict(sorted(hp_remaining.items())),
+        "expected_turns": sum(t * p for t, p in turns.items()),
+        "outcomes": dict(solved["outcomes"]),
+    }
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    player = create_test_player()
+    policies = (("always_attack",), ("potion_at", 0.4))
+
+    print("\n" + "=" * 60)
+    print("EXACT MATCHUP ODDS")
+    print("=" * 60)
+    print(f"{'Monster':<10}{'Policy':<16}{'Win %':>12}{'Turns':>10}")
+    print("-" * 60)
+
+    start = time.perf_counter()
+    for creator in MONSTER_TYPES:
+        monster = creator()
+        for spec in policies:
+            odds = matchup_odds(player, monster, spec)
+            print(f"{monster['name']:<10}{make_policy(spec).__name__:<16}"
+                  f"{odds['win'] * 100:>11.5f}%{odds['expected_turns']:>10.4f}")
+    print(f"\nSolved in {time.perf_counter() - start:.3f}s")
+
+    # A new potion_at(0.4) spec is the same cache entry
+    start = time.perf_counter()
+    matchup_odds(player, create_troll(), ("potion_at", 0.4))
+    print(f"Asked again: {time.perf_counter() - start:.6f}s "
+          f"({solve_matchup.cache_info().hits} cache hits)")
+
+    odds = matchup_odds(player, create_troll(), exact=True)
+    print(f"\nExact Troll win chance (always attack):\n  {odds['win']}")
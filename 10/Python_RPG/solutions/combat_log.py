@@ -0,0 +1,605 @@
+"""
+Combat Log: Recording Fights So They Can Be Replayed
+Alberta CSE 1120: Structured Programming 2
+
+combat_loop() only prints text, so when a fight goes strangely there is no
+way to see it again. This module writes every fight played through a
+CombatMachine (see combat_state.py) to a binary LOG FILE:
+
+- where the fight started (the player's and the monster's stats)
+- every turn: the action chosen, every dice roll made, and both health
+  values afterwards
+- how the fight ended
+
+Records are only ever ADDED to the end of the file (append-only), and they
+are collected in memory and written in large batches, so logging costs a
+few microseconds per turn.
+
+Because every dice roll is in the log, a fight can be REPLAYED: a
+ReplayRandom hands the logged rolls back to CombatMachine.step() in the
+same order, which rebuilds the fight exactly - and the replayer checks
+the health values against the log as it goes.
+
+Log file layout (all numbers little-endian, see the Struct formats below):
+
+    "RPGL" + version
+    NAME   | name id, UTF-8 name    (each name is written once)
+    START  | fight id, player and monster stats
+    TURN   | fight id, action, number of rolls, health values, then the rolls
+    END    | fight id, result
+
+Learning Objectives:
+- Binary records of different kinds, told apart by a "kind" byte
+- Buffering: collecting small writes into one big one
+- Wrapping an object to watch what it does (RecordingRandom)
+- Deterministic replay
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import mmap
+import os
+import random
+import struct
+
+from combat_state import FLED, LOSS, WIN, CombatMachine
+from monster_registry import spawn_random
+from phase2_combat_system import create_test_player
+
+MAGIC = b"RPGL"
+VERSION = 2                 # Version 2: 32-bit name IDs
+FILE_HEADER = struct.Struct("<4sH")
+
+# Record kinds (the first byte of every record)
+NAME = 1
+START = 2
+TURN = 3
+END = 4
+
+# kind, name id, name length (the UTF-8 name follows)
+NAME_RECORD = struct.Struct("<BIH")
+MAX_NAME_BYTES = 0xFFFF
+
+# kind, fight id, player name id, monster name id,
+# player: health, max_health, mana, max_mana, gold, experience, potions,
+# monster: health, max_health, min_damage, max_damage, gold low/high,
+#          experience,
+# fight: turns, damage_dealt, damage_taken
+START_RECORD = struct.Struct("<BIII" "iIiIIIH" "iIIIIII" "III")
+
+# kind, fight id, action byte, number of rolls, player health,
+# monster health (the rolls follow, 8 bytes each)
+TURN_RECORD = struct.Struct("<BIBBii")
+ROLL = struct.Struct("<d")
+
+# Ready-made Structs for a TURN record followed by N rolls
+TURN_WITH_ROLLS = {}
+
+# Action strings are logged as one byte; anything else (an invalid
+# action) is logged as 0 and replayed as "", which is also invalid
+ACTION_BYTES = {action: ord(action) for action in "1234"}
+
+# kind, fight id, result code
+END_RECORD = struct.Struct("<BIB")
+
+RESULT_CODES = {WIN: 1, LOSS: 2, FLED: 3}
+RESULT_NAMES = {code: name for name, code in RESULT_CODES.items()}
+
+# Write to disk once this many bytes are waiting
+FLUSH_BYTES = 1 << 20
+
+
+# ============================================================================
+# RECORDING AND REPLAYING DICE
+# ============================================================================
+
+class RecordingRandom:
+    """
+    Wraps a generator and writes down every roll it makes.
+
+    Args:
+        rng: The generator doing the real rolling
+    """
+
+    __slots__ = ("rng", "rolls")
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.rolls = []
+
+    def randint(self, a, b):
+        value = self.rng.randint(a, b)
+        self.rolls.append(value)
+        return value
+
+    def random(self):
+        value = self.rng.random()
+        self.rolls.append(value)
+        return value
+
+
+class ReplayRandom:
+    """
+    Hands back logged rolls in order instead of rolling.
+
+    Args:
+        rolls (list): Rolls from a TURN record
+    """
+
+    __slots__ = ("rolls", "position")
+
+    def __init__(self, rolls):
+        self.rolls = rolls
+        self.position = 0
+
+    def next_roll(self):
+        """Return the next logged roll."""
+        if self.position >= len(self.rolls):
+            raise ValueError("The fight asked for more rolls than were logged")
+        value = self.rolls[self.position]
+        self.position += 1
+        return value
+
+    def randint(self, a, b):
+        return int(self.next_roll())
+
+    def random(self):
+        return self.next_roll()
+
+
+# ============================================================================
+# WRITING
+# ============================================================================
+
+class CombatLogWriter:
+    """
+    Appends fights to a log file. Use it in a with block (or call close())
+    so the last batch is written. A record left half-written at the end
+    of an existing log (e.g. after a crash) is cut off first.
+
+    Args:
+        path (str): Log file (created if needed)
+        flush_bytes (int): Write to disk once this many bytes are waiting
+    """
+
+    def __init__(self, path, flush_bytes=FLUSH_BYTES):
+        self.flush_bytes = flush_bytes
+        self.buffer = bytearray()
+        self.name_ids = {}
+        self.next_fight_id = 0
+        self.recorder = RecordingRandom(None)
+
+        # Carry on an existing log: learn its names and last fight ID
+        if (os.path.exists(path)
+                and os.path.getsize(path) >= FILE_HEADER.size):
+            end = FILE_HEADER.size
+            for record, end in read_log_positions(path):
+                if record[0] == NAME:
+                    self.name_ids[record[2]] = record[1]
+                elif record[0] == START:
+                    self.next_fight_id = max(self.next_fight_id,
+                                             record[1] + 1)
+            # Cut off a record left half-written by a crash, or the new
+            # records would be read as part of it
+            self.file = open(path, "ab")
+            self.file.truncate(end)
+        else:
+            self.file = open(path, "wb")
+            self.buffer += FILE_HEADER.pack(MAGIC, VERSION)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def name_id(self, name):
+        """
+        Number for a name, writing a NAME record the first time.
+
+        Args:
+            name (str): Player or monster name
+
+        Returns:
+            int: Name ID
+
+        Raises:
+            ValueError: If the name is longer than MAX_NAME_BYTES in UTF-8
+        """
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            encoded = name.encode("utf-8")
+            if len(encoded) > MAX_NAME_BYTES:
+                raise ValueError(f"Name is {len(encoded):,} bytes long; a "
+                                 f"log can hold at most {MAX_NAME_BYTES:,}")
+            name_id = self.name_ids[name] = len(self.name_ids)
+            self.buffer += NAME_RECORD.pack(NAME, name_id, len(encoded))
+            self.buffer += encoded
+        return name_id
+
+    def start(self, machine):
+        """
+        Log the starting state of a fight.
+
+        Args:
+            machine (CombatMachine): The fight (usually not started yet)
+
+        Returns:
+            int: Fight ID to pass to step()
+        """
+        fight_id = self.next_fight_id
+        self.next_fight_id += 1
+        player = machine.player
+        monster = machine.monster
+        self.buffer += START_RECORD.pack(
+            START, fight_id,
+            self.name_id(player["name"]), self.name_id(monster["name"]),
+            player["health"], player["max_health"],
+            player.get("mana", 0), player.get("max_mana", 0),
+            player.get("gold", 0), player.get("experience", 0),
+            player.get("health_potions", 0),
+            monster["health"], monster["max_health"],
+            monster["min_damage"], monster["max_damage"],
+            monster["gold_reward"][0], monster["gold_reward"][1],
+            monster["experience"],
+            machine.turns, machine.damage_dealt, machine.damage_taken)
+        return fight_id
+
+    def step(self, fight_id, machine, action, rng):
+        """
+        Play one turn with machine.step() and log it.
+
+        Args:
+            fight_id (int): ID from start()
+            machine (CombatMachine): The fight
+            action (str): Player action
+            rng: Random number generator
+
+        Returns:
+            list: The events from machine.step()
+        """
+        recorder = self.recorder
+        recorder.rng = rng
+        rolls = recorder.rolls = []
+        events = machine.step(action, recorder)
+
+        # One pack() call for the whole turn, rolls included
+        record = TURN_WITH_ROLLS.get(len(rolls))
+        if record is None:
+            record = TURN_WITH_ROLLS[len(rolls)] = struct.Struct(
+                TURN_RECORD.format + "d" * len(rolls))
+        self.buffer += record.pack(
+            TURN, fight_id, ACTION_BYTES.get(action, 0), len(rolls),
+            machine.player["health"], machine.monster["health"], *rolls)
+
+        if machine.finished:
+            self.buffer += END_RECORD.pack(END, fight_id,
+                                           RESULT_CODES[machine.status])
+        if len(self.buffer) >= self.flush_bytes:
+            self.flush()
+        return events
+
+    def flush(self):
+        """Write everything waiting in the buffer."""
+        if self.buffer:
+            self.file.write(self.buffer)
+            self.file.flush()
+            self.buffer = bytearray()
+
+    def close(self):
+        """Write the last batch and close the file."""
+        self.flush()
+        self.file.close()
+
+
+# ============================================================================
+# READING
+# ============================================================================
+
+def read_log(path):
+    """
+    Read every record from a log file, one at a time.
+    A record cut short at the end of the file (e.g. after a crash) is
+    skipped.
+    Teaches: Generators (yield), reading records of different sizes
+
+    Args:
+        path (str): Log file
+
+    Yields:
+        tuple: The record's fields, starting with its kind. NAME records
+            hold the decoded name; TURN records end with a list of rolls.
+    """
+    for record, _ in read_log_positions(path):
+        yield record
+
+
+def read_log_positions(path):
+    """
+    Like read_log(), but also says where each record ends, so a writer
+    knows where the last complete record stops.
+
+    Args:
+        path (str): Log file
+
+    Yields:
+        tuple: (record, end) - the record as read_log() gives it, and the
+            byte position just after it
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size < FILE_HEADER.size:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, version = FILE_HEADER.unpack_from(data)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} "
+                                 f"combat log")
+
+            position = FILE_HEADER.size
+            size = len(data)
+            while position < size:
+                kind = data[position]
+
+                if kind == NAME:
+                    if position + NAME_RECORD.size > size:
+                        return
+                    _, name_id, length = NAME_RECORD.unpack_from(data,
+                                                                 position)
+                    start = position + NAME_RECORD.size
+                    position = start + length
+                    if position > size:
+                        return
+                    yield ((NAME, name_id,
+                            data[start:position].decode("utf-8")), position)
+
+                elif kind == START:
+                    if position + START_RECORD.size > size:
+                        return
+                    record = START_RECORD.unpack_from(data, position)
+                    position += START_RECORD.size
+                    yield record, position
+
+                elif kind == TURN:
+                    if position + TURN_RECORD.size > size:
+                        return
+                    fields = TURN_RECORD.unpack_from(data, position)
+                    start = position + TURN_RECORD.size
+                    position = start + fields[3] * ROLL.size
+                    if position > size:
+                        return
+                    rolls = [value for (value,) in
+                             ROLL.iter_unpack(data[start:position])]
+                    yield fields + (rolls,), position
+
+                elif kind == END:
+                    if position + END_RECORD.size > size:
+                        return
+                    record = END_RECORD.unpack_from(data, position)
+                    position += END_RECORD.size
+                    yield record, position
+
+                else:
+                    raise ValueError(f"Unknown record kind {kind} at byte "
+                                     f"{position} of {path}")
+
+
+def machine_from_start(record, names):
+    """
+    Rebuild a fight's starting CombatMachine from its START record.
+
+    Args:
+        record (tuple): START record from read_log()
+        names (dict): Name ID -> name
+
+    Returns:
+        CombatMachine: The fight as it was when logging began
+    """
+    (_, _, player_name, monster_name,
+     health, max_health, mana, max_mana, gold, experience, potions,
+     monster_health, monster_max, min_damage, max_damage, gold_low,
+     gold_high, monster_experience,
+     turns, damage_dealt, damage_taken) = record
+
+    player = {"name": names[player_name], "health": health,
+              "max_health": max_health, "mana": mana, "max_mana": max_mana,
+              "gold": gold, "experience": experience,
+              "health_potions": potions}
+    monster = {"name": names[monster_name], "health": monster_health,
+               "max_health": monster_max, "min_damage": min_damage,
+               "max_damage": max_damage,
+               "gold_reward": (gold_low, gold_high),
+               "experience": monster_experience}
+    return CombatMachine(player, monster, turns, damage_dealt, damage_taken)
+
+
+# ============================================================================
+# REPLAYING
+# ============================================================================
+
+def replay_fights(path, fight_ids=None):
+    """
+    Replay logged fights with CombatMachine, checking every turn against
+    the log.
+
+    Args:
+        path (str): Log file
+        fight_ids (set, optional): Only replay these fights
+
+    Yields:
+        tuple: (fight_id, machine, turns) when a fight's END record is
+            reached; turns is a list of (action, events) pairs
+
+    Raises:
+        ValueError: If a replayed turn does not match the log
+    """
+    names = {}
+    fights = {}     # fight_id -> (machine, turns) for fights in progress
+
+    for record in read_log(path):
+        kind = record[0]
+
+        if kind == NAME:
+            names[record[1]] = record[2]
+
+        elif kind == START:
+            if fight_ids is None or record[1] in fight_ids:
+                fights[record[1]] = (machine_from_start(record, names), [])
+
+        elif kind == TURN:
+            fight = fights.get(record[1])
+            if fight is None:
+                continue
+            machine, turns = fight
+            _, fight_id, action, _, health, monster_health, rolls = record
+            action = chr(action) if action else ""
+
+            events = machine.step(action, ReplayRandom(rolls))
+            if (machine.player["health"] != health
+                    or machine.monster["health"] != monster_health):
+                raise ValueError(f"Fight {fight_id} turn {machine.turns} "
+                                 f"does not match the log")
+            turns.append((action, events))
+
+        elif kind == END:
+            fight = fights.pop(record[1], None)
+            if fight is None:
+                continue
+            machine, turns = fight
+            if machine.status != RESULT_NAMES[record[2]]:
+                raise ValueError(f"Fight {record[1]} ended "
+                                 f"{machine.status}, log says "
+                                 f"{RESULT_NAMES[record[2]]}")
+            yield record[1], machine, turns
+
+
+def replay_fight(path, fight_id):
+    """
+    Replay a single fight.
+
+    Args:
+        path (str): Log file
+        fight_id (int): Fight to replay
+
+    Returns:
+        tuple: (machine, turns) as yielded by replay_fights()
+
+    Raises:
+        KeyError: If the fight is not in the log (or never finished)
+    """
+    for _, machine, turns in replay_fights(path, {fight_id}):
+        return machine, turns
+    raise KeyError(f"Fight {fight_id} is not in {path}")
+
+
+# ============================================================================
+# CHECKING CRASH RECOVERY
+# ============================================================================
+
+def log_fights(path, fights, rng):
+    """
+    Play fights with the always-attack policy and append them to a log.
+
+    Args:
+        path (str): Log file
+        fights (int): Fights to play
+        rng: Random number generator
+    """
+    with CombatLogWriter(path) as log:
+        for _ in range(fights):
+            machine = CombatMachine(create_test_player(), spawn_random(rng))
+            fight_id = log.start(machine)
+            while not machine.finished:
+                log.step(fight_id, machine, "1", rng)
+
+
+def check_crash_recovery(path, fights=20, cut=5, seed=1):
+    """
+    Write a log, cut its last few bytes off as a crash would, append more
+    fights and check that every complete fight still replays.
+    Teaches: Testing what happens after a failure
+
+    Args:
+        path (str): Log file to use (overwritten)
+        fights (int): Fights to write before and after the cut
+        cut (int): Bytes to cut off the end
+        seed (int): Seed for the dice
+
+    Returns:
+        bool: True if the log replays with every fight expected: all but
+            the cut one from before, and all of the appended ones
+    """
+    rng = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+    log_fights(path, fights, rng)
+    with open(path, "r+b") as file:
+        file.truncate(os.path.getsize(path) - cut)
+
+    log_fights(path, fights, rng)
+    replayed = [fight_id for fight_id, _, _ in replay_fights(path)]
+    # The last fight before the cut lost its END record, so it never
+    # finishes; the appended fights carry on after its ID
+    expected = list(range(fights - 1)) + list(range(fights, 2 * fights))
+    return replayed == expected
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    from combat_simulator import potion_at
+    from combat_state import display_events
+
+    print("=" * 60)
+    print("COMBAT LOG DEMO")
+    print("=" * 60)
+
+    fights = 100_000
+    policy = potion_at(0.4)
+    path = os.path.join(tempfile.mkdtemp(), "combat.log")
+
+    for logging in (False, True):
+        rng = random.Random(1)
+        start = time.perf_counter()
+        log = CombatLogWriter(path) if logging else None
+        for _ in range(fights):
+            player = create_test_player()
+            machine = CombatMachine(player, spawn_random(rng))
+            fight_id = log.start(machine) if logging else None
+            while not machine.finished:
+                action = policy(player["health"], player["max_health"],
+                                player["health_potions"],
+                                machine.monster["health"])
+                if logging:
+                    log.step(fight_id, machine, action, rng)
+                else:
+                    machine.step(action, rng)
+        if logging:
+            log.close()
+        seconds = time.perf_counter() - start
+        label = "with log" if logging else "no log  "
+        print(f"{label}: {fights:,} fights in {seconds:.2f}s")
+
+    print(f"Log size: {os.path.getsize(path) / 1e6:.1f} MB")
+
+    start = time.perf_counter()
+    replayed = sum(1 for _ in replay_fights(path))
+    print(f"Replayed and checked {replayed:,} fights in "
+          f"{time.perf_counter() - start:.2f}s")
+
+    machine, turns = replay_fight(path, 4242)
+    print(f"\nFight #4242 replayed ({machine.status}):")
+    for action, events in turns:
+        print(f"\nChoose action (1-4): {action}")
+        display_events(machine, events)
+
+    recovered = check_crash_recovery(path)
+    print(f"\nAppending after a cut-off record: "
+          f"{'OK' if recovered else 'FAILED'}")
+    os.remove(path)
@@ -0,0 +1,283 @@
+"""
+Optimal Combat Policy: Value Iteration over Fight States
+Alberta CSE 1120: Structured Programming 2
+
+The four combat actions (attack, defend, potion, flee) and the dice rolls
+form a small Markov decision process. Every state (player_hp, monster_hp,
+potions) gets a VALUE - the best chance of winning from there - and the
+best action is the one whose expected next value is highest. Value
+iteration repeats that update until the values stop changing.
+
+All states live in one NumPy array indexed [player_hp, monster_hp,
+potions], so one update of every state is a handful of array operations.
+Index 0 on the hp axes stands for "that side has been defeated".
+
+A table is only right for the max_health it was solved for (a potion
+cannot heal above it) and only covers the potions it was solved for, so
+autoplay() solves a new table whenever it meets a monster, a max_health
+or a potion count it has not seen.
+
+Requires NumPy (pip install numpy).
+
+Learning Objectives:
+- Expected value: chance x payoff, summed over outcomes
+- Repeating an update until it converges
+- Three-dimensional arrays and array indexing
+- Lookup tables for instant decisions
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import numpy as np
+
+from combat_exact import monster_damage_distribution, player_damage_distribution
+from phase2_combat_system import (
+    FLEE_CHANCE,
+    POTION_HEAL_AMOUNT,
+    MONSTER_TYPES,
+    combat_loop,
+    create_test_player,
+    create_troll,
+)
+
+
+# ============================================================================
+# ACTIONS
+# ============================================================================
+
+ATTACK = 1
+DEFEND = 2
+POTION = 3
+FLEE = 4
+
+# Menu strings indexed by action number, for combat_loop() auto-play
+ACTION_KEYS = ["", "1", "2", "3", "4"]
+
+
+# ============================================================================
+# ARRAY HELPERS
+# ============================================================================
+
+def after_hits(values, hit_table):
+    """
+    Expected value after the monster hits, for every state at once.
+    A hit of `damage` moves each state from player_hp to player_hp - damage,
+    and anything at or below 0 lands in row 0 (defeated).
+    Teaches: Shifting an array with an index array
+
+    Args:
+        values (np.ndarray): Values indexed [player_hp, monster_hp, potions]
+        hit_table (dict): damage -> probability
+
+    Returns:
+        np.ndarray: Expected values after the hit
+    """
+    rows = np.arange(values.shape[0])
+    result = np.zeros_like(values)
+    for damage, chance in hit_table.items():
+        result += chance * values[np.maximum(rows - damage, 0)]
+    return result
+
+
+# ============================================================================
+# VALUE ITERATION
+# ============================================================================
+
+def solve_monster(monster, max_health=100, potions=3, flee_value=0.0,
+                  tolerance=1e-12, max_iterations=1000):
+    """
+    Find the best action for every state of a fight against one monster.
+    Teaches: Value iteration, np.maximum, np.argmax
+
+    Values are "chance of winning", so a win is worth 1 and a loss 0.
+    A successful flee is worth `flee_value` (raise it above 0 if running
+    away should count as better than dying).
+
+    Args:
+        monster (dict): Monster data
+        max_health (int): Player's maximum health
+        potions (int): Most potions the player can carry
+        flee_value (float): Value of escaping the fight
+        tolerance (float): Stop when no value changes by more than this
+        max_iterations (int): Safety limit on sweeps
+
+    Returns:
+        dict: "monster" name, "values" and "actions" arrays indexed
+              [player_hp, monster_hp, potions], "iterations" used, and
+              the "max_health" and "potions" it was solved for
+    """
+    monster_health = monster["max_health"]
+    shape = (max_health + 1, monster_health + 1, potions + 1)
+
+    attack_table = player_damage_distribution()
+    hit_table = monster_damage_distribution(
+        monster["min_damage"], monster["max_damage"], False)
+    defended_table = monster_damage_distribution(
+        monster["min_damage"], monster["max_damage"], True)
+
+    columns = np.arange(monster_health + 1)
+    healed_rows = np.minimum(np.arange(max_health + 1) + POTION_HEAL_AMOUNT,
+                             max_health)
+
+    values = np.zeros(shape)
+    values[:, 0, :] = 1.0       # Monster defeated: a win
+    values[0, :, :] = 0.0       # Player defeated: a loss
+
+    choices = np.empty((4,) + shape)
+
+    for iteration in range(1, max_iterations + 1):
+        hit = after_hits(values, hit_table)
+        hit[:, 0, :] = 1.0      # A dead monster never gets its turn
+
+        # Attack: roll damage, then (if the monster lives) take a hit
+        attack = np.zeros(shape)
+        for damage, chance in attack_table.items():
+            attack += chance * hit[:, np.maximum(columns - damage, 0), :]
+        choices[0] = attack
+
+        # Defend: take a halved hit
+        choices[1] = after_hits(values, defended_table)
+
+        # Potion: heal, spend a potion, then take a hit
+        choices[2] = -np.inf
+        choices[2][:, :, 1:] = hit[healed_rows][:, :, :-1]
+
+        # Flee: escape, or take a free hit
+        choices[3] = FLEE_CHANCE * flee_value + (1 - FLEE_CHANCE) * hit
+
+        new_values = choices.max(axis=0)
+        new_values[:, 0, :] = 1.0
+        new_values[0, :, :] = 0.0
+
+        change = np.abs(new_values - values).max()
+        values = new_values
+        if change < tolerance:
+            break
+
+    actions = (choices.argmax(axis=0) + 1).astype(np.int8)
+
+    return {
+        "monster": monster["name"],
+        "values": values,
+        "actions": actions,
+        "iterations": iteration,
+        "max_health": max_health,
+        "potions": potions,
+    }
+
+
+def solve_all(max_health=100, potions=3, flee_value=0.0):
+    """
+    Solve the fight against every monster in MONSTER_TYPES.
+
+    Args:
+        max_health (int): Player's maximum health
+        potions (int): Most potions the player can carry
+        flee_value (float): Value of escaping a fight
+
+    Returns:
+        dict: Monster name -> solution from solve_monster()
+    """
+    solutions = {}
+    for creator in MONSTER_TYPES:
+        solution = solve_monster(creator(), max_health, potions, flee_value)
+        solutions[solution["monster"]] = solution
+    return solutions
+
+
+# ============================================================================
+# USING THE TABLE
+# ============================================================================
+
+def table_policy(solution):
+    """
+    Turn a solution into a combat_simulator policy.
+
+    Args:
+        solution (dict): Result of solve_monster()
+
+    Returns:
+        function: policy(player_health, max_health, potions, monster_health)
+            - raises ValueError for a state the table was not solved for
+    """
+    actions = solution["actions"]
+    solved_health = solution["max_health"]
+    solved_potions = solution["potions"]
+
+    def policy(player_health, max_health, potions, monster_health):
+        if max_health != solved_health or potions > solved_potions:
+            raise ValueError(
+                f"Table for {solution['monster']} was solved for "
+                f"max_health {solved_health} and {solved_potions} potions, "
+                f"not {max_health} and {potions}; use solve_monster() or "
+                f"autoplay()")
+        return ACTION_KEYS[actions[player_health, monster_health, potions]]
+
+    policy.__name__ = f"optimal_{solution['monster'].lower()}"
+    return policy
+
+
+def autoplay(flee_value=0.0):
+    """
+    Build a choose_action function for combat_loop() that looks up the best
+    move for whichever monster is being fought.
+
+    A table is solved the first time it is needed: for a monster not seen
+    before, for a new max_health (e.g. after levelling up), or for more
+    potions than the table covers. After that every turn is a lookup.
+    Teaches: Dictionary lookup + array lookup = constant time per turn
+
+    Args:
+        flee_value (float): Value of escaping a fight
+
+    Returns:
+        function: choose_action(player, monster) -> "1"-"4"
+    """
+    # Solutions by (monster stats, player max_health). A table solved for
+    # more potions also covers fewer, so potions are not part of the key.
+    tables = {}
+
+    def choose_action(player, monster):
+        potions = player.get("health_potions", 0)
+        key = (monster["name"], monster["max_health"], monster["min_damage"],
+               monster["max_damage"], player["max_health"])
+        solution = tables.get(key)
+        if solution is None or solution["potions"] < potions:
+            solution = tables[key] = solve_monster(
+                monster, player["max_health"], potions, flee_value)
+        return ACTION_KEYS[solution["actions"][player["health"],
+                                               monster["health"], potions]]
+
+    return choose_action
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    player = create_test_player()
+
+    start = time.perf_counter()
+    solutions = solve_all(player["max_health"], player["health_potions"])
+    elapsed = time.perf_counter() - start
+
+    print("\n" + "=" * 60)
+    print("OPTIMAL POLICY")
+    print("=" * 60)
+    for name, solution in solutions.items():
+        monster_health = solution["actions"].shape[1] - 1
+        best = solution["values"][player["health"], monster_health,
+                                  player["health_potions"]]
+        print(f"{name:<10}best win chance {best * 100:8.4f}%  "
+              f"({solution['iterations']} sweeps)")
+    print(f"\nSolved all monsters in {elapsed:.3f}s")
+
+    # A Phase 1 character can have up to 180 HP: autoplay() solves a table
+    # for whatever player it meets
+    player.update(health=180, max_health=180, health_potions=5)
+    combat_loop(player, create_troll(), choose_action=autoplay())
@@ -0,0 +1,432 @@
+"""
+Combat Screen: Drawing Each Turn as One Frame
+Alberta CSE 1120: Structured Programming 2
+
+combat_loop() prints a turn a line at a time: the status, the "=" rules,
+the menu and every message are separate print() calls, and the screen
+scrolls. On a slow terminal (or over SSH) every one of those writes costs
+time, and most of them repeat text that is already on the screen.
+
+This module draws combat like a game screen instead:
+
+- The screen is a FRAME: a list of lines that always have the same
+  layout (header, status, message log, menu, prompt).
+- The parts that never change during a fight (the rules, the header, the
+  menu) are built once and reused.
+- A TerminalRenderer remembers the last frame it drew. For the next frame
+  it only sends the lines that changed, and in each changed line only the
+  part after the first difference, using ANSI escape codes to move the
+  cursor there. Usually that is just a few HP numbers and the new
+  messages.
+- The whole update goes to the terminal as ONE write and ONE flush.
+
+The rules come from CombatMachine (combat_state.py) and the messages from
+display_events(), so a fight plays exactly like combat_loop().
+
+Learning Objectives:
+- ANSI escape codes (cursor movement, clearing)
+- Finding what changed between two lists of strings
+- Caching text that never changes
+- Measuring output (bytes and writes)
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import builtins
+import random
+import sys
+from functools import lru_cache
+
+from combat_state import LOSS, WIN, CombatMachine, display_events
+from phase2_combat_system import create_random_monster
+
+# ANSI escape codes
+CLEAR_SCREEN = "\x1b[2J"
+ERASE_TO_END = "\x1b[K"         # Erase from the cursor to the end of the line
+
+# Screen layout
+WIDTH = 60
+LOG_LINES = 10                  # Message lines on screen
+BAR_WIDTH = 20                  # Characters in a health bar
+
+RULE = "=" * WIDTH
+THIN_RULE = "-" * WIDTH
+MENU = ("1. Attack   2. Defend   3. Use Potion   4. Try to Flee",)
+PROMPT = "Choose action (1-4): "
+
+
+@lru_cache(maxsize=None)
+def move_to(row, column=1):
+    """
+    Escape code that moves the cursor (rows and columns start at 1).
+
+    Args:
+        row (int): Screen row
+        column (int): Screen column
+
+    Returns:
+        str: The escape code (the column can be left out when it is 1)
+    """
+    if column == 1:
+        return f"\x1b[{row}H"
+    return f"\x1b[{row};{column}H"
+
+
+# ============================================================================
+# RENDERER
+# ============================================================================
+
+class TerminalRenderer:
+    """
+    Draws frames (lists of lines) on an ANSI terminal, sending only what
+    changed since the last frame.
+
+    Args:
+        stream (optional): Where to write (default: sys.stdout)
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.shown = None           # Lines on screen now (None = unknown)
+        self.cursor = None
+        self.frames = 0
+        self.writes = 0
+        self.bytes = 0
+
+    def invalidate(self, row=None):
+        """
+        Forget what is on screen, so it is drawn again in full.
+
+        Args:
+            row (int, optional): Forget only this row (numbered from 1),
+                e.g. the prompt row after the player typed an answer
+        """
+        if row is None:
+            self.shown = None
+            self.cursor = None
+        elif self.shown is not None and row <= len(self.shown):
+            self.shown[row - 1] = None
+
+    def changes(self, lines):
+        """
+        Escape codes and text that turn the shown frame into `lines`.
+        Teaches: Comparing two lists element by element
+
+        Args:
+            lines (list): The new frame
+
+        Returns:
+            list: Pieces of output
+        """
+        if self.shown is None:
+            pieces = [CLEAR_SCREEN, move_to(1)]
+            for line in lines:
+                pieces.append(line)
+                pieces.append(ERASE_TO_END + "\r\n")
+            return pieces
+
+        pieces = []
+        shown = self.shown
+        for row, line in enumerate(lines, start=1):
+            old = shown[row - 1] if row <= len(shown) else ""
+            if line == old:
+                continue
+
+            # Emoji are two columns wide, so cursor columns only match
+            # string positions in plain ASCII lines
+            if old is None or not (line.isascii() and old.isascii()):
+                pieces.append(move_to(row))
+                pieces.append(line)
+                pieces.append(ERASE_TO_END)
+                continue
+
+            # Skip the start of the line that is already right
+            start = 0
+            limit = min(len(line), len(old))
+            while start < limit and line[start] == old[start]:
+                start += 1
+
+            if len(line) == len(old):
+                # Same length: skip the end that is already right too, and
+                # there is nothing left over to erase
+                end = len(line)
+                while line[end - 1] == old[end - 1]:
+                    end -= 1
+                pieces.append(move_to(row, start + 1))
+                pieces.append(line[start:end])
+            else:
+                pieces.append(move_to(row, start + 1))
+                pieces.append(line[start:])
+                pieces.append(ERASE_TO_END)
+
+        # Blank any rows left over from a longer frame
+        for row in range(len(lines) + 1, len(shown) + 1):
+            pieces.append(move_to(row) + ERASE_TO_END)
+        return pieces
+
+    def render(self, lines, cursor=None):
+        """
+        Draw a frame with a single write (or none, if nothing changed).
+
+        Args:
+            lines (list): Lines of the frame, top to bottom
+            cursor (tuple, optional): (row, column) to leave the cursor at
+        """
+        pieces = self.changes(lines)
+        if cursor is not None and (pieces or cursor != self.cursor):
+            pieces.append(move_to(*cursor))
+        self.shown = list(lines)
+        self.cursor = cursor
+        self.frames += 1
+        if not pieces:
+            return
+        text = "".join(pieces)
+
+        stream = self.stream or sys.stdout
+        stream.write(text)
+        stream.flush()
+        self.writes += 1
+        self.bytes += len(text.encode("utf-8"))
+
+
+# ============================================================================
+# THE COMBAT SCREEN
+# ============================================================================
+
+class MessageLog:
+    """
+    The messages of the latest turn. It has print() like the I/O objects
+    in game_io.py, so display_events() can write to it.
+
+    The log is cleared each turn instead of scrolling: scrolling would
+    move every line, and the renderer would have to redraw them all.
+
+    Args:
+        size (int): Messages to keep
+    """
+
+    def __init__(self, size=LOG_LINES):
+        self.size = size
+        self.lines = []
+
+    def print(self, *values, sep=" ", end="\n"):
+        """Add a message (blank lines are dropped - the log has no room)."""
+        text = sep.join(map(str, values))
+        self.lines.extend(line for line in text.split("\n") if line)
+        del self.lines[:-self.size]
+
+    def clear(self):
+        """Start a new turn's messages."""
+        self.lines = []
+
+
+def health_bar(current, maximum, width=BAR_WIDTH):
+    """
+    A bar like [########----] for a health value.
+
+    Args:
+        current (int): Current value
+        maximum (int): Largest value
+        width (int): Characters inside the brackets
+
+    Returns:
+        str: The bar
+    """
+    filled = max(0, min(width, current * width // max(maximum, 1)))
+    return "[" + "#" * filled + "-" * (width - filled) + "]"
+
+
+@lru_cache(maxsize=64)
+def header_lines(player_name, monster_name):
+    """
+    The top of the screen, made once per matchup.
+
+    Returns:
+        tuple: Lines
+    """
+    return (RULE, f"COMBAT: {player_name} vs {monster_name}".center(WIDTH),
+            RULE)
+
+
+class CombatScreen:
+    """
+    One fight shown as a fixed-layout frame.
+
+    Args:
+        machine (CombatMachine): The fight
+        renderer (TerminalRenderer): Where to draw it
+    """
+
+    def __init__(self, machine, renderer):
+        self.machine = machine
+        self.renderer = renderer
+        self.log = MessageLog()
+        monster = machine.monster
+        self.log.print(f"A wild {monster['name']} appears!")
+
+    def status_lines(self):
+        """The lines that change every turn: both fighters' health."""
+        player = self.machine.player
+        monster = self.machine.monster
+        return (
+            f"{player['name'][:14]:<14} HP {player['health']:>4}/"
+            f"{player['max_health']:<4} "
+            f"{health_bar(player['health'], player['max_health'])} "
+            f"Potions {player.get('health_potions', 0)}",
+            f"{monster['name'][:14]:<14} HP {monster['health']:>4}/"
+            f"{monster['max_health']:<4} "
+            f"{health_bar(monster['health'], monster['max_health'])}",
+        )
+
+    def frame(self, prompt=PROMPT):
+        """
+        Build the whole screen.
+
+        Args:
+            prompt (str): Text on the last line
+
+        Returns:
+            list: Lines of the frame
+        """
+        machine = self.machine
+        log = self.log.lines
+        lines = list(header_lines(machine.player["name"],
+                                  machine.monster["name"]))
+        lines.extend(self.status_lines())
+        lines.append(THIN_RULE)
+        lines.extend(log)
+        lines.extend([""] * (self.log.size - len(log)))
+        lines.append(THIN_RULE)
+        lines.extend(MENU)
+        lines.append(prompt)
+        return lines
+
+    def draw(self, prompt=PROMPT):
+        """Draw the screen with the cursor after the prompt."""
+        lines = self.frame(prompt)
+        self.renderer.render(lines, (len(lines), len(prompt) + 1))
+
+    def step(self, action, rng=random):
+        """
+        Play one turn and put its messages in the log.
+
+        Args:
+            action (str): "1"-"4"
+            rng (optional): Random number generator
+        """
+        self.log.clear()
+        display_events(self.machine, self.machine.step(action, rng),
+                       self.log)
+
+
+def play_fight(player, monster=None, choose_action=None, rng=random,
+               renderer=None, read=builtins.input):
+    """
+    Play a fight on the combat screen.
+
+    Args:
+        player (dict): Player character data
+        monster (dict, optional): Monster to fight. Creates random if None.
+        choose_action (function, optional): Auto-play, called as
+            choose_action(player, monster) like in combat_loop()
+        rng (optional): Random number generator
+        renderer (TerminalRenderer, optional): Where to draw
+        read (function): Reads the player's answer (default: input())
+
+    Returns:
+        bool: True if player won, False if player lost or fled (like
+            combat_loop())
+    """
+    if monster is None:
+        monster = create_random_monster(rng)
+    if renderer is None:
+        renderer = TerminalRenderer()
+
+    machine = CombatMachine(player, monster)
+    screen = CombatScreen(machine, renderer)
+    while not machine.finished:
+        screen.draw()
+        if choose_action is None:
+            action = read().strip()
+            # The typed answer is on screen now - redraw that row next time
+            renderer.invalidate(len(screen.frame()))
+        else:
+            action = choose_action(player, monster)
+        screen.step(action, rng)
+
+    endings = {WIN: "VICTORY!", LOSS: "GAME OVER"}
+    lines = screen.frame(endings.get(machine.status, "You got away."))
+    renderer.render(lines, (len(lines) + 1, 1))     # Cursor below the screen
+    return machine.status == WIN
+
+
+# ============================================================================
+# MEASURING OUTPUT
+# ============================================================================
+
+class CountingStream:
+    """
+    A stream that only counts what is written to it (for comparing how
+    much output different displays produce).
+    """
+
+    def __init__(self):
+        self.writes = 0
+        self.flushes = 0
+        self.bytes = 0
+
+    def write(self, text):
+        self.writes += 1
+        self.bytes += len(text.encode("utf-8"))
+        return len(text)
+
+    def flush(self):
+        self.flushes += 1
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    from contextlib import redirect_stdout
+
+    from phase2_combat_system import (
+        combat_loop,
+        create_orc,
+        create_test_player,
+    )
+
+    def attack(player, monster):
+        return "1"
+
+    fights = 200
+
+    # combat_loop() with print(): count what it writes
+    plain = CountingStream()
+    with redirect_stdout(plain):
+        rng = random.Random(1)
+        for _ in range(fights):
+            combat_loop(create_test_player(), create_orc(), attack, rng)
+
+    # The same fights on the combat screen
+    screen = CountingStream()
+    renderer = TerminalRenderer(screen)
+    rng = random.Random(1)
+    for _ in range(fights):
+        play_fight(create_test_player(), create_orc(), attack, rng, renderer)
+
+    print("=" * 60)
+    print(f"OUTPUT FOR {fights} FIGHTS")
+    print("=" * 60)
+    print(f"{'':<16}{'writes':>12}{'bytes':>14}")
+    for name, stream in (("print()", plain), ("combat screen", screen)):
+        print(f"{name:<16}{stream.writes:>12,}{stream.bytes:>14,}")
+    print(f"Frames drawn: {renderer.frames:,}, "
+          f"{screen.bytes / renderer.frames:.0f} bytes per frame")
+
+    if sys.stdout.isatty():
+        builtins.input("\nPress Enter to play a fight on the combat screen...")
+        play_fight(create_test_player())
@@ -0,0 +1,375 @@
+"""
+Combat Simulator: Headless Batch Fights
+Alberta CSE 1120: Structured Programming 2
+
+This module runs the Phase 2 combat rules without a terminal so that
+monster balance can be measured by running thousands of fights instead
+of playing them one at a time.
+
+Learning Objectives:
+- Reusing functions from another module (import)
+- Functions as values (passing a policy into a function)
+- Functions that build and return other functions
+- Counting results with dictionaries and collections.Counter
+- Separating game rules from input/output
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import random
+from collections import Counter
+
+from combatant import Combatant
+from damage_tables import monster_damage_table, player_attack_table
+from monster_registry import spawn_random
+from phase2_combat_system import (
+    POTION_HEAL_AMOUNT,
+    create_test_player,
+    roll_flee,
+)
+
+
+# ============================================================================
+# ACTIONS AND POLICIES
+# ============================================================================
+# A "policy" is a function that picks an action for the player, exactly
+# like a human typing 1-4 at the combat_loop() prompt. It is called as
+#
+#     policy(player_health, max_health, potions, monster_health)
+#
+# and returns one of the action strings below. Plain numbers are passed in
+# (not dictionaries) so that the simulator's inner loop stays fast.
+
+ATTACK = "1"
+DEFEND = "2"
+POTION = "3"
+FLEE = "4"
+
+
+def always_attack(player_health, max_health, potions, monster_health):
+    """
+    Policy that attacks every turn.
+    Teaches: The simplest possible strategy
+
+    Returns:
+        str: Always ATTACK
+    """
+    return ATTACK
+
+
+def defend_below(threshold):
+    """
+    Build a policy that defends when health drops below a fraction of max.
+    Teaches: Functions that return functions (closures)
+
+    Args:
+        threshold (float): Fraction of max health, e.g. 0.3 for 30%
+
+    Returns:
+        function: A policy function
+    """
+    def policy(player_health, max_health, potions, monster_health):
+        if player_health < max_health * threshold:
+            return DEFEND
+        return ATTACK
+
+    policy.__name__ = f"defend_below_{int(threshold * 100)}"
+    return policy
+
+
+def potion_at(threshold):
+    """
+    Build a policy that drinks a potion when health drops below a fraction
+    of max (and still has potions), otherwise attacks.
+    Teaches: Closures, combining conditions with 'and'
+
+    Args:
+        threshold (float): Fraction of max health, e.g. 0.4 for 40%
+
+    Returns:
+        function: A policy function
+    """
+    def policy(player_health, max_health, potions, monster_health):
+        if potions > 0 and player_health < max_health * threshold:
+            return POTION
+        return ATTACK
+
+    policy.__name__ = f"potion_at_{int(threshold * 100)}"
+    return policy
+
+
+# ============================================================================
+# SINGLE FIGHT
+# ============================================================================
+
+def simulate_fight(player, monster, policy=always_attack, rng=random):
+    """
+    Play one fight with the same rules as combat_loop(), but with no
+    input() or print(). The player and monster dictionaries are NOT changed.
+    Teaches: Game loops with local variables, early return
+
+    Args:
+        player (dict): Player character data
+        monster (dict): Monster data
+        policy (function): Chooses the player's action each turn
+        rng (optional): Random number generator (see game_random.py)
+
+    Returns:
+        dict: Outcome with keys monster, result ("win", "loss" or "fled"),
+              turns, damage_dealt, damage_taken, gold and experience
+    """
+    # Copy the numbers we need into local variables (fast to read/update)
+    player_health = player["health"]
+    max_health = player["max_health"]
+    potions = player.get("health_potions", 0)
+
+    # Read the monster's fixed stats once. A Combatant keeps them as
+    # attributes of its shared template, which is quicker than monster[...]
+    if isinstance(monster, Combatant):
+        template = monster.template
+        monster_health = monster.health
+        name = template.name
+        min_damage = template.min_damage
+        max_damage = template.max_damage
+        gold_reward = template.gold_reward
+        monster_experience = template.experience
+    else:
+        monster_health = monster["health"]
+        name = monster["name"]
+        min_damage = monster["min_damage"]
+        max_damage = monster["max_damage"]
+        gold_reward = monster["gold_reward"]
+        monster_experience = monster["experience"]
+
+    # The damage tables the Phase 2 dice functions roll from, found once
+    # per fight instead of once per roll
+    roll_attack = player_attack_table().sample
+    normal_table = monster_damage_table(min_damage, max_damage, False)
+    defending_table = monster_damage_table(min_damage, max_damage, True)
+
+    total_damage_dealt = 0
+    total_damage_taken = 0
+    turns = 0
+    result = None
+
+    while monster_health > 0 and player_health > 0:
+        turns += 1
+        defending_this_turn = False
+
+        # ===== PLAYER TURN =====
+        action = policy(player_health, max_health, potions, monster_health)
+
+        if action == ATTACK:
+            damage, was_critical = roll_attack(rng)
+            monster_health -= damage
+            total_damage_dealt += damage
+        elif action == DEFEND:
+            defending_this_turn = True
+        elif action == POTION:
+            if potions > 0:
+                # Same rule as potion_heal_amount(): never above max health
+                player_health += min(POTION_HEAL_AMOUNT,
+                                     max_health - player_health)
+                potions -= 1
+        elif action == FLEE:
+            if roll_flee(rng):
+                result = "fled"
+                break
+
+        if monster_health <= 0:
+            break
+
+        # ===== MONSTER TURN =====
+        table = defending_table if defending_this_turn else normal_table
+        damage_taken = table.sample(rng)
+        player_health -= damage_taken
+        total_damage_taken += damage_taken
+
+    # ===== COMBAT ENDED =====
+    gold = 0
+    experience = 0
+    if result is None:
+        if player_health <= 0:
+            result = "loss"
+        else:
+            result = "win"
+            gold = rng.randint(*gold_reward)
+            experience = monster_experience
+
+    return {
+        "monster": name,
+        "result": result,
+        "turns": turns,
+        "damage_dealt": total_damage_dealt,
+        "damage_taken": total_damage_taken,
+        "gold": gold,
+        "experience": experience,
+    }
+
+
+# ============================================================================
+# MANY FIGHTS
+# ============================================================================
+
+def new_monster_stats():
+    """
+    Create an empty statistics record for one monster type.
+    Teaches: Dictionaries holding counters and Counter objects
+
+    Returns:
+        dict: Empty statistics
+    """
+    return {
+        "fights": 0,
+        "wins": 0,
+        "losses": 0,
+        "fled": 0,
+        "total_turns": 0,
+        "total_damage_dealt": 0,
+        "total_damage_taken": 0,
+        "total_gold": 0,
+        "total_experience": 0,
+        "turns_to_kill": Counter(),    # turns -> number of wins
+        "damage_taken": Counter(),     # damage -> number of fights
+    }
+
+
+def record_outcome(stats, outcome):
+    """
+    Add one fight outcome to a monster's statistics.
+    Teaches: Updating dictionary values with +=
+
+    Args:
+        stats (dict): Statistics from new_monster_stats()
+        outcome (dict): Outcome from simulate_fight()
+    """
+    stats["fights"] += 1
+    stats["total_turns"] += outcome["turns"]
+    stats["total_damage_dealt"] += outcome["damage_dealt"]
+    stats["total_damage_taken"] += outcome["damage_taken"]
+    stats["total_gold"] += outcome["gold"]
+    stats["total_experience"] += outcome["experience"]
+    stats["damage_taken"][outcome["damage_taken"]] += 1
+
+    if outcome["result"] == "win":
+        stats["wins"] += 1
+        stats["turns_to_kill"][outcome["turns"]] += 1
+    elif outcome["result"] == "loss":
+        stats["losses"] += 1
+    else:
+        stats["fled"] += 1
+
+
+def run_simulation(fights, policy=always_attack, player=None,
+                   monster_factory=spawn_random, rng=random):
+    """
+    Run many fights and collect statistics for each monster type.
+    Every fight starts with a fresh copy of the player at full health.
+    Teaches: for loops, accumulating results, dictionary of dictionaries
+
+    Args:
+        fights (int): Number of fights to run
+        policy (function): Chooses the player's action each turn
+        player (dict, optional): Player to copy. Uses create_test_player()
+        monster_factory (function): Creates the monster for each fight,
+            called as monster_factory(rng). Works with dictionaries too,
+            e.g. create_random_monster
+        rng (optional): Random number generator for every roll
+
+    Returns:
+        dict: Monster name -> statistics (see new_monster_stats())
+    """
+    if player is None:
+        player = create_test_player()
+
+    results = {}
+
+    for _ in range(fights):
+        monster = monster_factory(rng)
+        outcome = simulate_fight(player, monster, policy, rng)
+
+        name = outcome["monster"]
+        if name not in results:
+            results[name] = new_monster_stats()
+        record_outcome(results[name], outcome)
+
+    return results
+
+
+def win_rate(stats):
+    """
+    Calculate the fraction of fights that were won.
+
+    Args:
+        stats (dict): Statistics for one monster type
+
+    Returns:
+        float: Win rate between 0.0 and 1.0
+    """
+    if stats["fights"] == 0:
+        return 0.0
+    return stats["wins"] / stats["fights"]
+
+
+def average_turns_to_kill(stats):
+    """
+    Calculate the average number of turns needed to win a fight.
+
+    Args:
+        stats (dict): Statistics for one monster type
+
+    Returns:
+        float: Average turns per win (0.0 if never won)
+    """
+    if stats["wins"] == 0:
+        return 0.0
+    total = sum(turns * count for turns, count in stats["turns_to_kill"].items())
+    return total / stats["wins"]
+
+
+def display_results(results, title="SIMULATION RESULTS"):
+    """
+    Print a table of results for each monster type.
+    Teaches: Formatted output with field widths
+
+    Args:
+        results (dict): Results from run_simulation()
+        title (str): Heading for the table
+    """
+    print("\n" + "=" * 60)
+    print(title)
+    print("=" * 60)
+    print(f"{'Monster':<10}{'Fights':>10}{'Win %':>9}{'Fled %':>9}"
+          f"{'Turns':>8}{'Dmg Taken':>12}")
+    print("-" * 60)
+
+    for name in sorted(results):
+        stats = results[name]
+        fights = stats["fights"]
+        print(f"{name:<10}{fights:>10}{win_rate(stats) * 100:>8.1f}%"
+              f"{stats['fled'] / fights * 100:>8.1f}%"
+              f"{average_turns_to_kill(stats):>8.2f}"
+              f"{stats['total_damage_taken'] / fights:>12.2f}")
+
+    print("=" * 60)
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    FIGHTS = 100_000
+
+    for policy in (always_attack, defend_below(0.3), potion_at(0.4)):
+        start = time.perf_counter()
+        results = run_simulation(FIGHTS, policy)
+        elapsed = time.perf_counter() - start
+
+        display_results(results, f"POLICY: {policy.__name__}")
+        print(f"{FIGHTS} fights in {elapsed:.2f}s "
+              f"({FIGHTS / elapsed:,.0f} fights/sec)")
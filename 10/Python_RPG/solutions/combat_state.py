@@ -0,0 +1,302 @@
+"""
+Combat State Machine: A Fight You Can Pause, Save and Resume
+Alberta CSE 1120: Structured Programming 2
+
+A fight is a STATE MACHINE: an object that holds the whole state of the
+fight, plus a step(action) method that plays one player action (and the
+monster's reply) and returns a list of EVENTS describing what happened.
+Nothing is printed and nothing waits for the keyboard, so:
+
+- Anything can drive the fight: the keyboard, a network server, a bot
+- Thousands of fights can be in progress at once - each is a small object
+- to_dict() turns a fight into plain data that json can save, and
+  from_dict() brings it back to carry on where it stopped
+
+The machine plays a turn with the rule functions of
+phase2_combat_system.py (resolve_attack() and friends), and
+display_events() prints their events with its message functions, so
+each rule and each message is written only once. combat_loop() is a
+keyboard driver for this machine.
+
+Learning Objectives:
+- State machines: a state plus a "step" that moves to the next state
+- Separating game rules (events) from display (rendering)
+- Saving and restoring objects as plain dictionaries
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import json
+import random
+
+from game_io import CONSOLE
+from phase2_combat_system import (
+    display_attack,
+    display_defend,
+    display_flee,
+    display_monster_attack,
+    display_potion,
+    resolve_attack,
+    resolve_defend,
+    resolve_flee,
+    resolve_monster_attack,
+    resolve_potion,
+)
+
+# Fight status values (the same words combat_simulator.py uses for results)
+ONGOING = "ongoing"
+WIN = "win"
+LOSS = "loss"
+FLED = "fled"
+
+
+# ============================================================================
+# THE STATE MACHINE
+# ============================================================================
+
+class CombatMachine:
+    """
+    One fight between a player and a monster.
+
+    The player and monster dictionaries are changed in place, so health,
+    potions, gold and experience end up on the caller's player.
+
+    Args:
+        player (dict): Player character data
+        monster (dict): Monster data (a Combatant works too)
+        turns (int): Turns played so far
+        damage_dealt (int): Damage the player has dealt so far
+        damage_taken (int): Damage the player has taken so far
+        status (str): ONGOING, WIN, LOSS or FLED
+    """
+
+    __slots__ = ("player", "monster", "turns", "damage_dealt",
+                 "damage_taken", "status")
+
+    def __init__(self, player, monster, turns=0, damage_dealt=0,
+                 damage_taken=0, status=ONGOING):
+        self.player = player
+        self.monster = monster
+        self.turns = turns
+        self.damage_dealt = damage_dealt
+        self.damage_taken = damage_taken
+        self.status = status
+
+    def __repr__(self):
+        return (f"CombatMachine({self.player['name']!r} vs "
+                f"{self.monster['name']!r}, turn {self.turns}, {self.status})")
+
+    @property
+    def finished(self):
+        """True once the fight has been won, lost or fled."""
+        return self.status != ONGOING
+
+    def step(self, action, rng=random):
+        """
+        Play one turn: the player's action, then the monster's attack.
+        Teaches: Selection (if/elif), returning a list of results
+
+        Args:
+            action (str): "1" attack, "2" defend, "3" potion, "4" flee
+                (anything else wastes the turn)
+            rng (optional): Random number generator
+
+        Returns:
+            list: Event dictionaries, each with an "event" key
+        """
+        if self.finished:
+            raise ValueError(f"The fight is already over ({self.status})")
+
+        player = self.player
+        monster = self.monster
+        defending = False
+        self.turns += 1
+
+        # ===== PLAYER TURN =====
+        if action == "1":
+            event = resolve_attack(monster, rng)
+            self.damage_dealt += event["damage"]
+        elif action == "2":
+            event = resolve_defend()
+            defending = True
+        elif action == "3":
+            event = resolve_potion(player)
+        elif action == "4":
+            event = resolve_flee(rng)
+        else:
+            event = {"event": "invalid"}
+        events = [event]
+
+        if event["event"] == "flee" and event["escaped"]:
+            self.status = FLED
+            return events
+        if monster["health"] <= 0:
+            return events + self.finish_victory(rng)
+
+        # ===== MONSTER TURN =====
+        event = resolve_monster_attack(player, monster, defending, rng)
+        self.damage_taken += event["damage"]
+        events.append(event)
+
+        if player["health"] <= 0:
+            self.status = LOSS
+            events.append({"event": "defeat"})
+        return events
+
+    def finish_victory(self, rng):
+        """
+        Award gold and experience for a defeated monster.
+
+        Args:
+            rng: Random number generator
+
+        Returns:
+            list: The victory event
+        """
+        monster = self.monster
+        gold = rng.randint(*monster["gold_reward"])
+        experience = monster["experience"]
+        self.player["gold"] = self.player.get("gold", 0) + gold
+        self.player["experience"] = (self.player.get("experience", 0)
+                                     + experience)
+        self.status = WIN
+        return [{"event": "victory", "gold": gold, "experience": experience}]
+
+    def to_dict(self):
+        """
+        Copy the whole fight into plain data (safe for json.dumps()).
+
+        The rng is not included: to replay the rest of the fight exactly,
+        save rng.getstate() alongside it.
+
+        Returns:
+            dict: The fight's state
+        """
+        monster = dict(self.monster)
+        monster["gold_reward"] = list(monster["gold_reward"])
+        return {
+            "player": dict(self.player),
+            "monster": monster,
+            "turns": self.turns,
+            "damage_dealt": self.damage_dealt,
+            "damage_taken": self.damage_taken,
+            "status": self.status,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Rebuild a fight saved with to_dict().
+
+        Args:
+            state (dict): Output of to_dict() (or json.loads() of it)
+
+        Returns:
+            CombatMachine: The restored fight
+        """
+        monster = dict(state["monster"])
+        monster["gold_reward"] = tuple(monster["gold_reward"])
+        return cls(dict(state["player"]), monster, state["turns"],
+                   state["damage_dealt"], state["damage_taken"],
+                   state["status"])
+
+
+# ============================================================================
+# SHOWING EVENTS
+# ============================================================================
+
+def display_events(machine, events, io=CONSOLE):
+    """
+    Print the messages for a list of events. The message for each
+    action comes from phase2_combat_system.py; only the messages that
+    belong to a whole fight (its turns and its ending) are here.
+    Teaches: Dictionary lookups, keeping display apart from rules
+
+    Args:
+        machine (CombatMachine): The fight the events came from
+        events (list): Output of machine.step()
+        io (optional): Input/output object (see game_io.py)
+    """
+    monster = machine.monster
+    name = monster["name"]
+    for event in events:
+        kind = event["event"]
+
+        if kind == "attack":
+            display_attack(monster, event, io)
+
+        elif kind == "defend":
+            display_defend(io)
+
+        elif kind in ("potion", "no_potion"):
+            display_potion(event, io)
+            if kind == "no_potion":
+                io.print("You fumble in your pack but find nothing!")
+
+        elif kind == "flee":
+            display_flee(monster, event, io)
+            if event["escaped"]:
+                io.print("\nYou escaped from combat!")
+
+        elif kind == "invalid":
+            io.print("\nInvalid action! You hesitate and lose your turn!")
+
+        elif kind == "monster_attack":
+            io.print(f"\n--- {name}'s Turn ---")
+            display_monster_attack(monster, event, io)
+
+        elif kind == "defeat":
+            io.print("\n" + "=" * 60)
+            io.print("💀 YOU HAVE BEEN DEFEATED! 💀")
+            io.print(f"\nThe {name} stands victorious over you.")
+            io.print("\n=== GAME OVER ===")
+
+        elif kind == "victory":
+            io.print("\n" + "=" * 60)
+            io.print("🎉 VICTORY! 🎉")
+            io.print(f"\nYou defeated the {name}!")
+            io.print(f"You earned {event['gold']} gold!")
+            io.print(f"You gained {event['experience']} experience!")
+            io.print(f"\n--- Combat Statistics ---")
+            io.print(f"Turns survived: {machine.turns}")
+            io.print(f"Total damage dealt: {machine.damage_dealt}")
+            io.print(f"Total damage taken: {machine.damage_taken}")
+            io.print(f"Damage per turn: "
+                     f"{machine.damage_dealt / machine.turns:.1f}")
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    from phase2_combat_system import create_orc, create_test_player
+
+    print("=" * 60)
+    print("COMBAT STATE MACHINE DEMO")
+    print("=" * 60)
+
+    # Play three turns, save the fight, then finish it from the saved copy
+    rng = random.Random(7)
+    fight = CombatMachine(create_test_player(), create_orc())
+    for _ in range(3):
+        display_events(fight, fight.step("1", rng))
+
+    saved = json.dumps(fight.to_dict())
+    saved_rng = rng.getstate()
+    print(f"\n[Saved {fight!r} as {len(saved)} bytes of JSON]")
+
+    restored = CombatMachine.from_dict(json.loads(saved))
+    while not restored.finished:
+        display_events(restored, restored.step("1", rng))
+
+    # Finishing the ORIGINAL fight with the same dice gives the same ending
+    rng.setstate(saved_rng)
+    while not fight.finished:
+        fight.step("1", rng)
+    print(f"\nRestored fight ended: {restored.status}, "
+          f"player HP {restored.player['health']}")
+    print(f"Original fight ended: {fight.status}, "
+          f"player HP {fight.player['health']}")
@@ -0,0 +1,440 @@
+"""
+Vectorized Combat Engine: Monte Carlo Balance Sweeps with NumPy
+Alberta CSE 1120: Structured Programming 2
+
+This module plays thousands of fights at the same time. Instead of one
+player_health variable, we keep an ARRAY of player healths (one per fight)
+and update every fight in a single NumPy operation each turn. Fights that
+are over are removed from the "active" list so no work is wasted on them.
+
+Requires NumPy (pip install numpy).
+
+Learning Objectives:
+- Arrays as "many variables at once"
+- Boolean masks instead of if statements
+- np.where() as a vectorized if/else
+- Checking a fast program against a simple, trusted one
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+from collections import Counter
+
+import numpy as np
+
+import combat_simulator
+from combat_simulator import (
+    display_results,
+    new_monster_stats,
+    run_simulation,
+)
+from phase2_combat_system import (
+    BASE_DAMAGE,
+    CRITICAL_CHANCE,
+    CRITICAL_MULTIPLIER,
+    DAMAGE_VARIANCE,
+    FLEE_CHANCE,
+    MONSTER_TYPES,
+    POTION_HEAL_AMOUNT,
+    create_test_player,
+    create_troll,
+    roll_monster_damage,
+    roll_player_damage,
+)
+
+
+# ============================================================================
+# ACTIONS AND VECTORIZED POLICIES
+# ============================================================================
+# Same menu numbers as combat_loop(), but stored as small integers so they
+# fit in a NumPy array. A vectorized policy receives ARRAYS and returns an
+# array of actions, one per fight:
+#
+#     policy(player_health, max_health, potions, monster_health)
+
+ATTACK = 1
+DEFEND = 2
+POTION = 3
+FLEE = 4
+
+# Result codes stored in the result array
+ONGOING = 0
+WIN = 1
+LOSS = 2
+FLED = 3
+
+RESULT_NAMES = {WIN: "win", LOSS: "loss", FLED: "fled"}
+
+
+def always_attack(player_health, max_health, potions, monster_health):
+    """
+    Vectorized policy that attacks in every fight.
+
+    Returns:
+        np.ndarray: ATTACK for every fight
+    """
+    return np.full(len(player_health), ATTACK, dtype=np.int8)
+
+
+def defend_below(threshold):
+    """
+    Build a vectorized policy that defends below a fraction of max health.
+    Teaches: np.where() as a vectorized if/else
+
+    Args:
+        threshold (float): Fraction of max health, e.g. 0.3 for 30%
+
+    Returns:
+        function: A vectorized policy
+    """
+    def policy(player_health, max_health, potions, monster_health):
+        low = player_health < max_health * threshold
+        return np.where(low, DEFEND, ATTACK).astype(np.int8)
+
+    policy.__name__ = f"defend_below_{int(threshold * 100)}"
+    return policy
+
+
+def potion_at(threshold):
+    """
+    Build a vectorized policy that drinks a potion below a fraction of max
+    health (while potions remain), otherwise attacks.
+    Teaches: Combining masks with &
+
+    Args:
+        threshold (float): Fraction of max health, e.g. 0.4 for 40%
+
+    Returns:
+        function: A vectorized policy
+    """
+    def policy(player_health, max_health, potions, monster_health):
+        drink = (potions > 0) & (player_health < max_health * threshold)
+        return np.where(drink, POTION, ATTACK).astype(np.int8)
+
+    policy.__name__ = f"potion_at_{int(threshold * 100)}"
+    return policy
+
+
+# ============================================================================
+# VECTORIZED DICE ROLLS
+# ============================================================================
+
+def roll_player_damage_batch(rng, count):
+    """
+    Roll many player attacks at once (same rules as roll_player_damage()).
+
+    Args:
+        rng (np.random.Generator): Random number generator
+        count (int): Number of attacks to roll
+
+    Returns:
+        tuple: (damage array, was_critical mask)
+    """
+    # integers() excludes the high value, so add 1 to match randint()
+    damage = rng.integers(BASE_DAMAGE - DAMAGE_VARIANCE,
+                          BASE_DAMAGE + DAMAGE_VARIANCE + 1, size=count)
+    was_critical = rng.random(count) < CRITICAL_CHANCE
+    damage = np.where(was_critical, damage * CRITICAL_MULTIPLIER, damage)
+    return damage, was_critical
+
+
+def roll_monster_damage_batch(rng, min_damage, max_damage, player_defending):
+    """
+    Roll many monster attacks at once (same rules as roll_monster_damage()).
+
+    Args:
+        rng (np.random.Generator): Random number generator
+        min_damage (int or np.ndarray): Smallest possible hit
+        max_damage (int or np.ndarray): Largest possible hit
+        player_defending (np.ndarray): Mask of fights where player defends
+
+    Returns:
+        np.ndarray: Damage for each attack
+    """
+    damage = rng.integers(min_damage, max_damage + 1,
+                          size=len(player_defending))
+    return np.where(player_defending, damage // 2, damage)
+
+
+# ============================================================================
+# MANY FIGHTS AT ONCE
+# ============================================================================
+
+def simulate_fights(count, monster, player=None, policy=always_attack,
+                    seed=None):
+    """
+    Play `count` independent fights against copies of one monster.
+    Every fight advances one turn per pass through the while loop, and
+    finished fights are dropped from the active index list.
+    Teaches: Arrays, boolean masks, indexing with an array of positions
+
+    Args:
+        count (int): Number of fights
+        monster (dict): Monster data (e.g. from create_goblin())
+        player (dict, optional): Player to copy. Uses create_test_player()
+        policy (function): Vectorized policy
+        seed (int, optional): Seed for a reproducible run
+
+    Returns:
+        dict: Arrays "result", "turns", "damage_dealt", "damage_taken",
+              "gold" and "experience", one entry per fight
+    """
+    if player is None:
+        player = create_test_player()
+    rng = np.random.default_rng(seed)
+
+    max_health = player["max_health"]
+    player_health = np.full(count, player["health"], dtype=np.int64)
+    potions = np.full(count, player.get("health_potions", 0), dtype=np.int64)
+    monster_health = np.full(count, monster["health"], dtype=np.int64)
+
+    result = np.zeros(count, dtype=np.int8)
+    turns = np.zeros(count, dtype=np.int64)
+    damage_dealt = np.zeros(count, dtype=np.int64)
+    damage_taken = np.zeros(count, dtype=np.int64)
+
+    # Positions of fights that are still going
+    active = np.arange(count)
+
+    while len(active) > 0:
+        k = len(active)
+        ph = player_health[active]
+        mh = monster_health[active]
+        pots = potions[active]
+        turns[active] += 1
+
+        # ===== PLAYER TURN =====
+        action = policy(ph, max_health, pots, mh)
+
+        attacking = action == ATTACK
+        damage, _ = roll_player_damage_batch(rng, k)
+        damage = np.where(attacking, damage, 0)
+        mh = mh - damage
+        damage_dealt[active] += damage
+
+        defending = action == DEFEND
+
+        drinking = (action == POTION) & (pots > 0)
+        heal = np.minimum(POTION_HEAL_AMOUNT, max_health - ph)
+        ph = ph + np.where(drinking, heal, 0)
+        pots = pots - drinking
+
+        fled = (action == FLEE) & (rng.random(k) < FLEE_CHANCE)
+        won = (mh <= 0) & ~fled
+
+        # ===== MONSTER TURN (only where the fight continues) =====
+        attacked = ~fled & ~won
+        hit = roll_monster_damage_batch(rng, monster["min_damage"],
+                                        monster["max_damage"], defending)
+        hit = np.where(attacked, hit, 0)
+        ph = ph - hit
+        damage_taken[active] += hit
+
+        lost = attacked & (ph <= 0)
+
+        # Write the updated values back into the full arrays
+        player_health[active] = ph
+        monster_health[active] = mh
+        potions[active] = pots
+
+        turn_result = np.zeros(k, dtype=np.int8)
+        turn_result[won] = WIN
+        turn_result[lost] = LOSS
+        turn_result[fled] = FLED
+        result[active] = turn_result
+
+        active = active[turn_result == ONGOING]
+
+    # ===== REWARDS =====
+    wins = result == WIN
+    low, high = monster["gold_reward"]
+    gold = np.where(wins, rng.integers(low, high + 1, size=count), 0)
+    experience = np.where(wins, monster["experience"], 0)
+
+    return {
+        "result": result,
+        "turns": turns,
+        "damage_dealt": damage_dealt,
+        "damage_taken": damage_taken,
+        "gold": gold,
+        "experience": experience,
+    }
+
+
+def summarize(outcomes):
+    """
+    Convert outcome arrays into the statistics record used by
+    combat_simulator, so both engines can share display_results().
+
+    Args:
+        outcomes (dict): Arrays from simulate_fights()
+
+    Returns:
+        dict: Statistics (see combat_simulator.new_monster_stats())
+    """
+    stats = new_monster_stats()
+    result = outcomes["result"]
+    wins = result == WIN
+
+    stats["fights"] = len(result)
+    stats["wins"] = int(wins.sum())
+    stats["losses"] = int((result == LOSS).sum())
+    stats["fled"] = int((result == FLED).sum())
+    stats["total_turns"] = int(outcomes["turns"].sum())
+    stats["total_damage_dealt"] = int(outcomes["damage_dealt"].sum())
+    stats["total_damage_taken"] = int(outcomes["damage_taken"].sum())
+    stats["total_gold"] = int(outcomes["gold"].sum())
+    stats["total_experience"] = int(outcomes["experience"].sum())
+
+    values, counts = np.unique(outcomes["turns"][wins], return_counts=True)
+    stats["turns_to_kill"] = Counter(dict(zip(values.tolist(), counts.tolist())))
+    values, counts = np.unique(outcomes["damage_taken"], return_counts=True)
+    stats["damage_taken"] = Counter(dict(zip(values.tolist(), counts.tolist())))
+
+    return stats
+
+
+def simulate_each_monster(count, player=None, policy=always_attack, seed=None):
+    """
+    Run `count` fights against each monster in MONSTER_TYPES.
+
+    Args:
+        count (int): Fights per monster type
+        player (dict, optional): Player to copy
+        policy (function): Vectorized policy
+        seed (int, optional): Seed for a reproducible run
+
+    Returns:
+        dict: Monster name -> statistics
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(MONSTER_TYPES))
+    results = {}
+    for creator, child in zip(MONSTER_TYPES, seeds):
+        monster = creator()
+        outcomes = simulate_fights(count, monster, player, policy, child)
+        results[monster["name"]] = summarize(outcomes)
+    return results
+
+
+# ============================================================================
+# VALIDATION AGAINST THE SCALAR ENGINE
+# ============================================================================
+
+def compare_roll_distributions(samples=200_000, seed=None):
+    """
+    Compare single dice rolls from both engines.
+    Returns the largest difference in probability for any damage value.
+
+    Args:
+        samples (int): Rolls to take from each engine
+        seed (int, optional): Seed for the NumPy generator
+
+    Returns:
+        dict: "player" and "monster" -> largest probability difference
+    """
+    rng = np.random.default_rng(seed)
+    troll = create_troll()
+
+    def largest_gap(scalar_rolls, vector_rolls):
+        scalar = Counter(scalar_rolls)
+        values, counts = np.unique(vector_rolls, return_counts=True)
+        vector = dict(zip(values.tolist(), counts.tolist()))
+        keys = set(scalar) | set(vector)
+        return max(abs(scalar.get(k, 0) - vector.get(k, 0)) / samples
+                   for k in keys)
+
+    player_scalar = [roll_player_damage()[0] for _ in range(samples)]
+    player_vector, _ = roll_player_damage_batch(rng, samples)
+
+    defending = np.arange(samples) % 2 == 0
+    monster_scalar = [roll_monster_damage(troll, bool(d)) for d in defending]
+    monster_vector = roll_monster_damage_batch(
+        rng, troll["min_damage"], troll["max_damage"], defending)
+
+    return {
+        "player": largest_gap(player_scalar, player_vector),
+        "monster": largest_gap(monster_scalar, monster_vector),
+    }
+
+
+def validate_against_scalar(fights=20_000, tolerance=4.0, seed=None):
+    """
+    Run both engines on the same matchups and check that win rate, average
+    turns and average damage taken agree within `tolerance` standard errors.
+    Teaches: Testing a fast version against a simple, trusted version
+
+    Args:
+        fights (int): Fights per monster per engine
+        tolerance (float): Allowed difference in standard errors
+        seed (int, optional): Seed for the NumPy generator
+
+    Returns:
+        list: One (monster, measure, scalar, vector, ok) tuple per check
+    """
+    pairs = [
+        (combat_simulator.always_attack, always_attack),
+        (combat_simulator.potion_at(0.4), potion_at(0.4)),
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(pairs)
+                                               * len(MONSTER_TYPES))
+    checks = []
+
+    for creator in MONSTER_TYPES:
+        for scalar_policy, vector_policy in pairs:
+            monster = creator()
+            scalar = [combat_simulator.simulate_fight(
+                          create_test_player(), monster, scalar_policy)
+                      for _ in range(fights)]
+            vector = simulate_fights(fights, monster, policy=vector_policy,
+                                     seed=seeds.pop())
+
+            measures = {
+                "win_rate": (
+                    np.array([o["result"] == "win" for o in scalar], float),
+                    (vector["result"] == WIN).astype(float)),
+                "turns": (
+                    np.array([o["turns"] for o in scalar], float),
+                    vector["turns"].astype(float)),
+                "damage_taken": (
+                    np.array([o["damage_taken"] for o in scalar], float),
+                    vector["damage_taken"].astype(float)),
+            }
+
+            for measure, (a, b) in measures.items():
+                error = np.sqrt(a.var() / len(a) + b.var() / len(b))
+                gap = abs(a.mean() - b.mean())
+                ok = gap <= tolerance * error if error > 0 else gap == 0
+                checks.append((f"{monster['name']}/{vector_policy.__name__}",
+                               measure, a.mean(), b.mean(), bool(ok)))
+
+    return checks
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    FIGHTS = 1_000_000
+
+    start = time.perf_counter()
+    results = simulate_each_monster(FIGHTS, policy=potion_at(0.4), seed=1)
+    elapsed = time.perf_counter() - start
+    display_results(results, "VECTORIZED: potion_at_40")
+    print(f"{3 * FIGHTS:,} fights in {elapsed:.2f}s "
+          f"({3 * FIGHTS / elapsed:,.0f} fights/sec)")
+
+    start = time.perf_counter()
+    scalar = run_simulation(30_000, combat_simulator.potion_at(0.4))
+    elapsed = time.perf_counter() - start
+    print(f"Scalar engine: {30_000 / elapsed:,.0f} fights/sec")
+
+    print("\nRoll distribution gaps:", compare_roll_distributions(seed=2))
+    print("\nValidation against scalar engine:")
+    for name, measure, a, b, ok in validate_against_scalar(seed=3):
+        print(f"  {name:<22}{measure:<14}{a:>9.3f}{b:>9.3f}  "
+              f"{'OK' if ok else 'MISMATCH'}")
@@ -0,0 +1,220 @@
+"""
+Combatants: Shared Monster Templates and Small Per-Fight State
+Alberta CSE 1120: Structured Programming 2
+
+create_goblin() builds a brand new seven-key dictionary (plus a tuple for
+gold_reward) for every encounter, even though only "health" ever changes.
+This module splits a monster into two parts:
+
+- MonsterTemplate: the stats that never change, made ONCE and shared by
+  every Goblin (or Orc, or Troll) in every fight
+- Combatant: the part that does change - just a link to the template and
+  the current health
+
+Both classes use __slots__, which stores attributes in fixed places
+instead of a per-object dictionary. A Combatant still answers
+monster["name"], monster["health"] -= 5, monster.get(...) and so on, so
+combat_loop() and the other Phase 2 functions work with it unchanged.
+
+Learning Objectives:
+- Classes, __init__ and attributes
+- __slots__ for small objects
+- Making objects behave like dictionaries (__getitem__, __setitem__)
+- Sharing data instead of copying it
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+from collections.abc import MutableMapping
+
+
+# ============================================================================
+# MONSTER TEMPLATE (SHARED, READ-ONLY)
+# ============================================================================
+
+class MonsterTemplate:
+    """
+    The unchanging stats of one kind of monster.
+    Setting an attribute after creation raises AttributeError.
+
+    Args:
+        name (str): Monster name
+        max_health (int): Starting and maximum health
+        min_damage (int): Smallest hit
+        max_damage (int): Largest hit
+        gold_reward (tuple): (lowest, highest) gold dropped
+        experience (int): Experience for defeating it
+    """
+
+    __slots__ = ("name", "max_health", "min_damage", "max_damage",
+                 "gold_reward", "experience")
+
+    # The dictionary keys a template provides
+    KEYS = __slots__
+
+    def __init__(self, name, max_health, min_damage, max_damage,
+                 gold_reward, experience):
+        set_field = object.__setattr__
+        set_field(self, "name", name)
+        set_field(self, "max_health", max_health)
+        set_field(self, "min_damage", min_damage)
+        set_field(self, "max_damage", max_damage)
+        set_field(self, "gold_reward", tuple(gold_reward))
+        set_field(self, "experience", experience)
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"MonsterTemplate '{self.name}' is read-only")
+
+    def __repr__(self):
+        return f"MonsterTemplate({self.name!r})"
+
+    @classmethod
+    def from_dict(cls, monster):
+        """
+        Build a template from a monster dictionary like create_goblin().
+
+        Args:
+            monster (dict): Monster data
+
+        Returns:
+            MonsterTemplate: The shared stats
+        """
+        return cls(monster["name"], monster["max_health"],
+                   monster["min_damage"], monster["max_damage"],
+                   monster["gold_reward"], monster["experience"])
+
+    def to_dict(self):
+        """
+        Make a fresh monster dictionary at full health.
+
+        Returns:
+            dict: Same layout as create_goblin()
+        """
+        monster = {key: getattr(self, key) for key in self.KEYS}
+        monster["health"] = self.max_health
+        return monster
+
+
+# ============================================================================
+# COMBATANT (PER-FIGHT STATE)
+# ============================================================================
+
+class Combatant(MutableMapping):
+    """
+    One monster in one fight: a shared template plus current health.
+    Works anywhere a monster dictionary is expected.
+
+    Args:
+        template (MonsterTemplate): Shared stats
+        health (int, optional): Starting health (default: max_health)
+    """
+
+    __slots__ = ("template", "health")
+
+    def __init__(self, template, health=None):
+        self.template = template
+        self.health = template.max_health if health is None else health
+
+    # ----- Attribute access for fast code -----
+
+    @property
+    def name(self):
+        return self.template.name
+
+    @property
+    def max_health(self):
+        return self.template.max_health
+
+    # ----- Dictionary access for existing code -----
+
+    def __getitem__(self, key):
+        if key == "health":
+            return self.health
+        if key in MonsterTemplate.KEYS:
+            return getattr(self.template, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key != "health":
+            raise TypeError(f"Only 'health' can change during a fight, "
+                            f"not '{key}'")
+        self.health = value
+
+    def __delitem__(self, key):
+        raise TypeError("Combatant keys cannot be deleted")
+
+    def __iter__(self):
+        yield from MonsterTemplate.KEYS[:2]
+        yield "health"
+        yield from MonsterTemplate.KEYS[2:]
+
+    def __len__(self):
+        return len(MonsterTemplate.KEYS) + 1
+
+    def __repr__(self):
+        return (f"Combatant({self.template.name!r}, "
+                f"health={self.health}/{self.template.max_health})")
+
+    def to_dict(self):
+        """
+        Copy this combatant into an ordinary monster dictionary.
+
+        Returns:
+            dict: Same layout as create_goblin()
+        """
+        monster = self.template.to_dict()
+        monster["health"] = self.health
+        return monster
+
+
+# ============================================================================
+# SPAWNING
+# ============================================================================
+# The shared templates themselves are loaded from monsters.json - see
+# monster_registry.TEMPLATES and monster_registry.spawn_random().
+
+def spawn(template):
+    """
+    Start a fight against a monster of the given kind.
+
+    Args:
+        template (MonsterTemplate): Which kind of monster
+
+    Returns:
+        Combatant: Monster at full health
+    """
+    return Combatant(template)
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import random
+    import time
+    import tracemalloc
+
+    from combat_simulator import run_simulation
+    from monster_registry import spawn_random
+    from phase2_combat_system import create_random_monster
+
+    COUNT = 100_000
+
+    for label, factory in (("dict", create_random_monster),
+                           ("Combatant", spawn_random)):
+        tracemalloc.start()
+        encounters = [factory() for _ in range(COUNT)]
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del encounters
+        print(f"{label:<10} {size / COUNT:6.0f} bytes per encounter")
+
+    for label, factory in (("dict", create_random_monster),
+                           ("Combatant", spawn_random)):
+        start = time.perf_counter()
+        run_simulation(COUNT, monster_factory=factory, rng=random.Random(1))
+        elapsed = time.perf_counter() - start
+        print(f"{label:<10} {COUNT / elapsed:8,.0f} fights/sec")
@@ -0,0 +1,219 @@
+"""
+Damage Tables: Every Damage Roll as One Table Lookup
+Alberta CSE 1120: Structured Programming 2
+
+For a given weapon (or a given monster, defending or not) the chance of
+each damage value never changes. This module works those chances out
+ONCE, using the exact distributions from combat_exact.py (crit doubling
+and defend halving included), and puts them in an alias table from
+game_random.py. After that, rolling damage is a single random number and
+a list lookup.
+
+The Phase 2 dice functions (roll_player_damage(), roll_monster_damage()
+and roll_damage_range() in phase2_combat_system.py) roll from these
+tables, so every fight in the game - and in every simulator built on
+those functions - uses them. Tables are shared: every fight against an
+Orc uses the same two tables (normal and defending), made the first time
+they are needed.
+
+Learning Objectives:
+- Precomputing work that would otherwise be repeated
+- Probability tables and sampling from them
+- Caching with functools.lru_cache
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import random
+from collections import defaultdict
+from functools import lru_cache
+
+from game_random import AliasTable
+
+# phase2_combat_system.py rolls its dice with this module, so the
+# modules that need Phase 2 (its constants, and combat_exact.py) are
+# imported inside the functions that build the tables. Each table is
+# built once, so each import runs once.
+
+
+# ============================================================================
+# DAMAGE TABLE
+# ============================================================================
+
+class DamageTable:
+    """
+    Outcomes of one kind of attack, their chances, and an alias table
+    for picking one.
+
+    Args:
+        distribution (dict): outcome -> probability
+    """
+
+    __slots__ = ("distribution", "outcomes", "table")
+
+    def __init__(self, distribution):
+        self.distribution = dict(sorted(distribution.items()))
+        self.outcomes = list(self.distribution)
+        self.table = AliasTable(self.outcomes,
+                                [float(p) for p in self.distribution.values()])
+
+    def __repr__(self):
+        return f"DamageTable({len(self.outcomes)} outcomes)"
+
+    def sample(self, rng=random):
+        """
+        Roll once with the alias table: one random number picks an
+        outcome.
+
+        Args:
+            rng (optional): Random number generator
+
+        Returns:
+            The chosen outcome
+        """
+        return self.outcomes[self.table.sample_index(rng)]
+
+    def sample_many(self, count, rng=random):
+        """
+        Roll many times (in one NumPy call when rng has randoms()).
+
+        Args:
+            count (int): Number of rolls
+            rng (optional): Random number generator
+
+        Returns:
+            list: Outcomes
+        """
+        outcomes = self.outcomes
+        return [outcomes[i] for i in self.table.sample_indices(count, rng)]
+
+    def mean(self):
+        """
+        Average outcome (outcomes must be numbers).
+
+        Returns:
+            float: Expected value
+        """
+        return sum(outcome * p for outcome, p in self.distribution.items())
+
+
+# ============================================================================
+# SHARED TABLES
+# ============================================================================
+
+@lru_cache(maxsize=None)
+def player_attack_table():
+    """
+    Table of (damage, was_critical) pairs for a player attack, as
+    roll_player_damage() returns them.
+
+    Returns:
+        DamageTable: Shared table
+    """
+    from phase2_combat_system import (
+        BASE_DAMAGE,
+        CRITICAL_CHANCE,
+        CRITICAL_MULTIPLIER,
+        DAMAGE_VARIANCE,
+    )
+
+    each = 1 / (2 * DAMAGE_VARIANCE + 1)
+    critical = CRITICAL_CHANCE
+
+    distribution = defaultdict(float)
+    for damage in range(BASE_DAMAGE - DAMAGE_VARIANCE,
+                        BASE_DAMAGE + DAMAGE_VARIANCE + 1):
+        distribution[(damage, False)] += each * (1 - critical)
+        distribution[(damage * CRITICAL_MULTIPLIER, True)] += each * critical
+    return DamageTable(distribution)
+
+
+@lru_cache(maxsize=None)
+def player_damage_table(exact=False):
+    """
+    Table of player attack damage (critical or not).
+
+    Args:
+        exact (bool): Keep the distribution as Fractions (for analysis;
+            sampling always uses floats)
+
+    Returns:
+        DamageTable: Shared table
+    """
+    from combat_exact import player_damage_distribution
+
+    return DamageTable(player_damage_distribution(exact))
+
+
+@lru_cache(maxsize=None)
+def monster_damage_table(min_damage, max_damage, player_defending=False,
+                         exact=False):
+    """
+    Table of monster attack damage for one damage range.
+
+    Args:
+        min_damage (int): Smallest possible hit
+        max_damage (int): Largest possible hit
+        player_defending (bool): Whether the player is defending
+        exact (bool): Keep the distribution as Fractions
+
+    Returns:
+        DamageTable: Shared table (one per range and defending flag)
+    """
+    from combat_exact import monster_damage_distribution
+
+    return DamageTable(monster_damage_distribution(min_damage, max_damage,
+                                                   player_defending, exact))
+
+
+def monster_tables(monster):
+    """
+    Both of a monster's tables, to look up once per fight instead of
+    once per roll.
+
+    Args:
+        monster (dict): Monster data
+
+    Returns:
+        tuple: (normal table, defending table)
+    """
+    return (monster_damage_table(monster["min_damage"],
+                                 monster["max_damage"], False),
+            monster_damage_table(monster["min_damage"],
+                                 monster["max_damage"], True))
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    from collections import Counter
+
+    from phase2_combat_system import create_troll, roll_player_damage
+
+    print("=" * 60)
+    print("DAMAGE TABLES")
+    print("=" * 60)
+
+    table = player_damage_table(exact=True)
+    print(f"\nPlayer damage: average {table.mean()} (exactly)")
+    for damage, chance in table.distribution.items():
+        print(f"  {damage:>3}: {str(chance):>6} = {float(chance):6.2%}")
+
+    troll = create_troll()
+    for defending, table in zip((False, True), monster_tables(troll)):
+        print(f"Troll damage{' (defending)' if defending else ''}: "
+              f"average {table.mean():.2f}")
+
+    # Do the game's rolls come out with the exact chances?
+    rolls = 200_000
+    rng = random.Random(1)
+    counts = Counter(roll_player_damage(rng)[0] for _ in range(rolls))
+    exact = player_damage_table().distribution
+    worst = max(abs(counts[damage] / rolls - chance)
+                for damage, chance in exact.items())
+    print(f"\nLargest gap between {rolls:,} rolls of roll_player_damage() "
+          f"and the exact chances: {worst:.3%}")
@@ -0,0 +1,150 @@
+"""
+Game I/O: Swappable Input and Output
+Alberta CSE 1110/1120: Structured Programming 1 and 2
+
+The phase modules never call print() or input() directly. They call
+io.print() and io.input() on an "I/O object" passed in as the `io`
+argument. Every I/O object has the same two methods, with the same
+arguments as the built-in functions, so the game code reads just like
+before - but where the text goes (and where answers come from) can be
+swapped:
+
+- ConsoleIO:  the terminal, exactly like print() and input() (the default)
+- BufferedIO: the terminal, but output is saved up and written in ONE go
+              just before the next question (or when flush() is called)
+- ScriptedIO: answers come from a list; output is thrown away or recorded
+- NullIO:     output is thrown away and there is nobody to answer
+
+Learning Objectives:
+- Classes that share the same methods (an "interface")
+- Passing objects into functions instead of using globals
+- Lists as buffers, str.join() to build text in one step
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import builtins
+import sys
+
+
+# ============================================================================
+# TERMINAL
+# ============================================================================
+
+class ConsoleIO:
+    """
+    Talk to the terminal with the built-in print() and input().
+    """
+
+    def print(self, *values, sep=" ", end="\n"):
+        """Show text, like print()."""
+        builtins.print(*values, sep=sep, end=end)
+
+    def input(self, prompt=""):
+        """Ask a question and return the typed answer, like input()."""
+        return builtins.input(prompt)
+
+    def flush(self):
+        """Nothing is saved up, so there is nothing to write."""
+
+
+class BufferedIO:
+    """
+    Terminal I/O that saves output in a list and writes it all at once,
+    right before the player is asked something. Many small writes become
+    one big one.
+
+    Args:
+        stream (optional): Where to write (default: sys.stdout)
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.pieces = []
+
+    def print(self, *values, sep=" ", end="\n"):
+        """Save text to be written later."""
+        self.pieces.append(sep.join(map(str, values)) + end)
+
+    def flush(self):
+        """Write everything saved so far in a single write."""
+        if self.pieces:
+            stream = self.stream or sys.stdout
+            stream.write("".join(self.pieces))
+            stream.flush()
+            self.pieces = []
+
+    def input(self, prompt=""):
+        """Write any saved text, then ask the question."""
+        self.pieces.append(prompt)
+        self.flush()
+        return builtins.input()
+
+
+# ============================================================================
+# NO TERMINAL
+# ============================================================================
+
+class NullIO:
+    """
+    Throw all output away. Asking a question is an error, because nobody
+    is there to answer - use ScriptedIO when answers are needed.
+    """
+
+    def print(self, *values, sep=" ", end="\n"):
+        """Ignore the text."""
+
+    def input(self, prompt=""):
+        """There is no one to answer."""
+        raise EOFError(f"NullIO cannot answer {prompt.strip()!r}")
+
+    def flush(self):
+        """Nothing to write."""
+
+
+class ScriptedIO(NullIO):
+    """
+    Answer questions from a prepared list. Output is thrown away, or kept
+    in `transcript` when record=True (handy for checking what was shown).
+
+    Args:
+        answers (iterable): Answers returned by input(), in order
+        record (bool): Keep a copy of all output
+    """
+
+    def __init__(self, answers, record=False):
+        self.answers = iter(answers)
+        self.record = record
+        self.transcript = []
+
+    def print(self, *values, sep=" ", end="\n"):
+        """Ignore the text, or record it."""
+        if self.record:
+            self.transcript.append(sep.join(map(str, values)) + end)
+
+    def input(self, prompt=""):
+        """Return the next prepared answer."""
+        if self.record:
+            self.transcript.append(prompt)
+        try:
+            answer = next(self.answers)
+        except StopIteration:
+            raise EOFError(f"No scripted answer left for {prompt.strip()!r}")
+        if self.record:
+            self.transcript.append(answer + "\n")
+        return answer
+
+    def text(self):
+        """
+        Everything recorded so far as one string.
+
+        Returns:
+            str: Recorded output
+        """
+        return "".join(self.transcript)
+
+
+# The default I/O object used when none is passed in
+CONSOLE = ConsoleIO()
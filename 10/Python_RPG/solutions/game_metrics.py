@@ -0,0 +1,404 @@
+"""
+Game Metrics: Counting and Timing What the Game Does
+Alberta CSE 1120: Structured Programming 2
+
+Where does the time go in a game session? To find out, the game code
+calls a METRICS object at interesting places, the same way it calls an
+I/O object (see game_io.py):
+
+    started = metrics.clock()
+    ...one phase of the turn...
+    started = metrics.observe("combat_render_seconds", started)
+    ...the next phase...
+    metrics.observe("combat_input_seconds", started)
+    metrics.count("combat_turns_total")
+
+Two kinds of metrics object have the same methods:
+
+- Metrics:     keeps COUNTERS (numbers that only go up) and latency
+               HISTOGRAMS (how many timings fell in each range)
+- NullMetrics: does nothing at all (the default). Its methods are
+               empty, so a game without metrics pays only for the calls.
+
+A Metrics object can be saved as JSON, or as the text format that the
+Prometheus monitoring system reads, to watch a running game server.
+
+Learning Objectives:
+- Measuring time with time.perf_counter()
+- Counters and histograms
+- Objects with the same methods that do different things
+- Writing a file safely (write to a temporary file, then rename)
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import os
+import time
+from bisect import bisect_left
+
+# Upper edges of the latency histogram bins, in seconds: from 10
+# microseconds (one turn of game logic) up to a minute (a player thinking)
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                   0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def label_text(labels):
+    """
+    Labels in Prometheus form, e.g. {"result": "win"} -> 'result="win"'.
+
+    Args:
+        labels (dict): Label name -> value
+
+    Returns:
+        str: The labels, sorted by name ("" when there are none)
+    """
+    return ",".join(f'{key}="{value}"'
+                    for key, value in sorted(labels.items()))
+
+
+def series_name(name, labels):
+    """
+    Full name of one series, e.g. 'combat_fights_total{result="win"}'.
+
+    Args:
+        name (str): Metric name
+        labels (str): Output of label_text()
+
+    Returns:
+        str: The name with its labels
+    """
+    return f"{name}{{{labels}}}" if labels else name
+
+
+# ============================================================================
+# HISTOGRAM
+# ============================================================================
+
+class LatencyHistogram:
+    """
+    Counts of timings in fixed bins, plus their total. The memory used
+    never grows, however many timings are added.
+
+    Args:
+        bounds (tuple): Upper edge of each bin, smallest first (a last
+            bin for anything larger is added automatically)
+    """
+
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, seconds):
+        """Count one timing."""
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def cumulative(self):
+        """
+        Timings at or below each bound (the way Prometheus counts them).
+
+        Returns:
+            list: (upper edge, count) pairs, ending with ("+Inf", count)
+        """
+        pairs = []
+        running = 0
+        for bound, count in zip(self.bounds + ("+Inf",), self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+    def quantile(self, q):
+        """
+        Estimate a quantile as the upper edge of the bin it falls in.
+
+        Args:
+            q (float): Quantile between 0 and 1, e.g. 0.99
+
+        Returns:
+            float: Estimated value (None if the histogram is empty, or
+                "+Inf" if it is above the last bound)
+        """
+        if self.count == 0:
+            return None
+        target = q * self.count
+        for bound, running in self.cumulative():
+            if running >= target:
+                return bound
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: count, sum, mean, p50, p99 and the cumulative buckets
+        """
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.quantile(0.50),
+            "p99": self.quantile(0.99),
+            "buckets": {str(bound): running
+                        for bound, running in self.cumulative()},
+        }
+
+
+# ============================================================================
+# METRICS OBJECTS
+# ============================================================================
+
+class Metrics:
+    """
+    Counters and latency histograms, with JSON and Prometheus export.
+
+    Args:
+        prefix (str): Put in front of every name when exporting
+        buckets (tuple): Histogram bounds in seconds
+    """
+
+    enabled = True
+
+    def __init__(self, prefix="rpg_", buckets=LATENCY_BUCKETS):
+        self.prefix = prefix
+        self.buckets = buckets
+        # Keyed by name, or by (name, labels) when there are labels - a
+        # plain string key is quicker to look up on every turn
+        self.counters = {}          # key -> number
+        self.histograms = {}        # key -> LatencyHistogram
+        self.started = time.perf_counter()
+
+    def clock(self):
+        """
+        The time now, to pass to observe() later.
+
+        Returns:
+            float: time.perf_counter()
+        """
+        return time.perf_counter()
+
+    def count(self, name, amount=1, **labels):
+        """
+        Add to a counter.
+
+        Args:
+            name (str): Counter name, e.g. "combat_turns_total"
+            amount (int): How much to add
+            **labels: Extra detail, e.g. result="win"
+        """
+        key = (name, label_text(labels)) if labels else name
+        counters = self.counters
+        counters[key] = counters.get(key, 0) + amount
+
+    def record(self, name, seconds, **labels):
+        """
+        Add one timing to a histogram.
+
+        Args:
+            name (str): Histogram name, e.g. "combat_render_seconds"
+            seconds (float): The timing
+            **labels: Extra detail, e.g. step="name"
+        """
+        key = (name, label_text(labels)) if labels else name
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram(self.buckets)
+        histogram.add(seconds)
+
+    def observe(self, name, started, **labels):
+        """
+        Record the time since `started` (a value from clock()).
+
+        Args:
+            name (str): Histogram name
+            started (float): Output of clock() or observe()
+            **labels: Extra detail
+
+        Returns:
+            float: The time now, so the next phase can be timed from it
+                without another clock() call
+        """
+        now = time.perf_counter()
+        histogram = None if labels else self.histograms.get(name)
+        if histogram is None:
+            self.record(name, now - started, **labels)
+        else:
+            # LatencyHistogram.add(), written out - this runs every phase
+            seconds = now - started
+            histogram.counts[bisect_left(histogram.bounds, seconds)] += 1
+            histogram.total += seconds
+            histogram.count += 1
+        return now
+
+    # ----- Export -----
+
+    @staticmethod
+    def series(table):
+        """
+        A counters or histograms table as sorted (name, labels, value).
+
+        Args:
+            table (dict): self.counters or self.histograms
+
+        Returns:
+            list: (name, labels text, value) tuples
+        """
+        rows = [(key, "", value) if isinstance(key, str)
+                else (key[0], key[1], value)
+                for key, value in table.items()]
+        rows.sort(key=lambda row: row[:2])
+        return rows
+
+    def snapshot(self):
+        """
+        Everything recorded so far, ready for json.dump().
+
+        Returns:
+            dict: timestamp, uptime_seconds, counters and histograms
+                (keyed by the full series name)
+        """
+        prefix = self.prefix
+        return {
+            "timestamp": time.time(),
+            "uptime_seconds": time.perf_counter() - self.started,
+            "counters": {prefix + series_name(name, labels): value
+                         for name, labels, value
+                         in self.series(self.counters)},
+            "histograms": {prefix + series_name(name, labels):
+                           histogram.to_dict()
+                           for name, labels, histogram
+                           in self.series(self.histograms)},
+        }
+
+    def to_prometheus(self):
+        """
+        Everything recorded so far in the Prometheus text format.
+        Teaches: Building a text file line by line
+
+        Returns:
+            str: The text
+        """
+        lines = []
+        typed = set()
+        for name, labels, value in self.series(self.counters):
+            name = self.prefix + name
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{series_name(name, labels)} {value}")
+
+        for name, labels, histogram in self.series(self.histograms):
+            name = self.prefix + name
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            for bound, running in histogram.cumulative():
+                le = f'le="{bound}"'
+                both = f"{labels},{le}" if labels else le
+                lines.append(f"{name}_bucket{{{both}}} {running}")
+            lines.append(f"{series_name(name + '_sum', labels)} "
+                         f"{histogram.total}")
+            lines.append(f"{series_name(name + '_count', labels)} "
+                         f"{histogram.count}")
+
+        name = self.prefix + "uptime_seconds"
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {time.perf_counter() - self.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Save the metrics: JSON if the path ends in .json, otherwise the
+        Prometheus text format. The file is written under another name
+        and then renamed, so a reader never sees half a file.
+
+        Args:
+            path (str): File to write
+        """
+        if path.endswith(".json"):
+            import json     # Only needed here; keeps game start-up quick
+            text = json.dumps(self.snapshot(), indent=2)
+        else:
+            text = self.to_prometheus()
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.replace(temporary, path)
+
+
+class NullMetrics:
+    """
+    Metrics that are switched off: every method does nothing.
+    """
+
+    enabled = False
+
+    def clock(self):
+        """No clock is read."""
+        return 0.0
+
+    def count(self, name, amount=1, **labels):
+        """Ignore the count."""
+
+    def record(self, name, seconds, **labels):
+        """Ignore the timing."""
+
+    def observe(self, name, started, **labels):
+        """Ignore the timing."""
+        return 0.0
+
+
+# The default metrics object used when none is passed in
+NO_METRICS = NullMetrics()
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import random
+
+    from game_io import NullIO
+    from phase2_combat_system import (
+        combat_loop,
+        create_orc,
+        create_test_player,
+    )
+
+    def attack(player, monster):
+        return "1"
+
+    def play(fights, metrics):
+        rng = random.Random(1)
+        start = time.perf_counter()
+        for _ in range(fights):
+            combat_loop(create_test_player(), create_orc(), attack, rng,
+                        NullIO(), metrics)
+        return time.perf_counter() - start
+
+    print("=" * 60)
+    print("GAME METRICS DEMO")
+    print("=" * 60)
+
+    fights = 20_000
+    metrics = Metrics()
+    off = play(fights, NO_METRICS)
+    on = play(fights, metrics)
+    print(f"{fights:,} fights: {off:.2f}s with metrics off, "
+          f"{on:.2f}s with metrics on")
+
+    snapshot = metrics.snapshot()
+    turns = snapshot["counters"]["rpg_combat_turns_total"]
+    print(f"Turns per second (metrics on): {turns / on:,.0f}")
+    for name, histogram in snapshot["histograms"].items():
+        print(f"  {name:<38} mean {histogram['mean'] * 1e6:6.1f} µs, "
+              f"p99 under {histogram['p99'] * 1e6:6.0f} µs")
+
+    print("\nPrometheus text (first lines):")
+    print("\n".join(metrics.to_prometheus().splitlines()[:8]))
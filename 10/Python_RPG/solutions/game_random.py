@@ -0,0 +1,352 @@
+"""
+Game Random Numbers: Seedable, Independent Dice
+Alberta CSE 1120: Structured Programming 2
+
+Every dice-rolling function in the phase modules takes an optional `rng`
+argument. Anything with these three methods can be passed in:
+
+    rng.randint(a, b)                  -> int from a to b (inclusive)
+    rng.random()                       -> float from 0.0 up to 1.0
+    rng.choices(population, weights)   -> list with one chosen item
+
+The random module itself works (that is the default), and so does a
+random.Random(seed) object. This module adds a COUNTER-BASED generator:
+roll number N of stream S is a fixed function of (seed, S, N), so streams
+never overlap, any roll can be reproduced, and whole batches of rolls can
+be made in one call.
+
+Learning Objectives:
+- Seeds and repeatable "random" numbers
+- Duck typing: any object with the right methods will do
+- Classes that keep a buffer and refill it when empty
+- Turning a float from 0-1 into a dice roll
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import bisect
+import itertools
+import random
+
+
+# ============================================================================
+# SIMPLE SEEDED GENERATORS
+# ============================================================================
+
+def seeded(seed):
+    """
+    Create a repeatable generator using Python's own Mersenne Twister.
+    Teaches: random.Random objects
+
+    Args:
+        seed (int or str): Same seed -> same rolls
+
+    Returns:
+        random.Random: Independent generator
+    """
+    return random.Random(seed)
+
+
+def spawn_streams(seed, count, counter_based=False):
+    """
+    Create `count` independent generators from one seed, e.g. one per
+    process or thread, so nobody has to share (and lock) the global one.
+
+    Args:
+        seed (int): Seed for the whole family of streams
+        count (int): Number of streams
+        counter_based (bool): Use PhiloxRandom instead of random.Random
+
+    Returns:
+        list: Generators
+    """
+    if counter_based:
+        return [PhiloxRandom(seed, stream) for stream in range(count)]
+    return [random.Random(f"{seed}:{stream}") for stream in range(count)]
+
+
+# ============================================================================
+# COUNTER-BASED GENERATOR
+# ============================================================================
+
+class PhiloxRandom:
+    """
+    Counter-based random numbers built on NumPy's Philox generator.
+
+    Single rolls (randint/random/choices) are served from a buffer of
+    pre-made floats, so they cost about as much as a list lookup. Batch
+    methods (randints/randoms) hand back whole NumPy arrays at once. Both
+    take their floats from the same place in the same order, so roll N
+    is the same whether it was made alone or as part of a batch.
+    Requires NumPy (pip install numpy).
+
+    Args:
+        seed (int): Seed shared by a family of streams
+        stream (int): Which stream of that family this is
+        buffer_size (int): Floats made per refill
+    """
+
+    def __init__(self, seed=0, stream=0, buffer_size=4096):
+        import numpy as np
+
+        self.seed = seed
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self._generator = np.random.Generator(
+            np.random.Philox(key=[seed & 0xFFFFFFFFFFFFFFFF, stream]))
+        self._buffer = []
+        self._position = 0
+        self.rolls = 0          # Rolls handed out so far (single or batch)
+
+    def _refill(self):
+        """Make the next buffer full of floats."""
+        self._buffer = self._generator.random(self.buffer_size).tolist()
+        self._position = 0
+
+    # ----- Same methods as the random module -----
+
+    def random(self):
+        """
+        Return the next float from 0.0 up to (not including) 1.0.
+
+        Returns:
+            float: Random number
+        """
+        if self._position == len(self._buffer):
+            self._refill()
+        value = self._buffer[self._position]
+        self._position += 1
+        self.rolls += 1
+        return value
+
+    def randint(self, a, b):
+        """
+        Return an integer from a to b, both included.
+
+        Args:
+            a (int): Smallest value
+            b (int): Largest value
+
+        Returns:
+            int: Random integer
+        """
+        return a + int(self.random() * (b - a + 1))
+
+    def choices(self, population, weights=None, *, cum_weights=None, k=1):
+        """
+        Pick k items with replacement, like random.choices().
+
+        Args:
+            population (list): Items to choose from
+            weights (list, optional): Relative chance of each item
+            cum_weights (list, optional): Running totals of the weights
+                (saves adding them up on every call)
+            k (int): How many picks
+
+        Returns:
+            list: Chosen items
+        """
+        if weights is None and cum_weights is None:
+            return [population[int(self.random() * len(population))]
+                    for _ in range(k)]
+        if cum_weights is None:
+            cum_weights = list(itertools.accumulate(weights))
+        cumulative = cum_weights
+        total = cumulative[-1]
+        last = len(population) - 1
+        return [population[min(bisect.bisect(cumulative, self.random() * total),
+                               last)]
+                for _ in range(k)]
+
+    def getstate(self):
+        """
+        Remember exactly where this generator is, for a later replay.
+
+        Returns:
+            tuple: State for setstate()
+        """
+        return (self._generator.bit_generator.state, list(self._buffer),
+                self._position, self.rolls)
+
+    def setstate(self, state):
+        """
+        Jump back to a state saved with getstate().
+
+        Args:
+            state (tuple): Result of getstate()
+        """
+        bit_state, buffer, position, rolls = state
+        self._generator.bit_generator.state = bit_state
+        self._buffer = list(buffer)
+        self._position = position
+        self.rolls = rolls
+
+    # ----- Batch methods -----
+
+    def randoms(self, count):
+        """
+        Make many floats at once: what is left in the buffer first, then
+        new floats straight from the generator. (Philox makes the same
+        floats whether they are asked for one batch or several.)
+
+        Args:
+            count (int): How many
+
+        Returns:
+            np.ndarray: Floats from 0.0 up to 1.0
+        """
+        import numpy as np
+
+        buffered = self._buffer[self._position:self._position + count]
+        self._position += len(buffered)
+        self.rolls += count
+        if len(buffered) == count:
+            return np.array(buffered)
+        fresh = self._generator.random(count - len(buffered))
+        return np.concatenate((buffered, fresh))
+
+    def randints(self, a, b, count):
+        """
+        Make many integers from a to b (both included) at once, rolled the
+        same way as randint().
+
+        Args:
+            a (int): Smallest value
+            b (int): Largest value
+            count (int): How many
+
+        Returns:
+            np.ndarray: Random integers
+        """
+        import numpy as np
+
+        return a + (self.randoms(count) * (b - a + 1)).astype(np.int64)
+
+
+# ============================================================================
+# ALIAS TABLE (WEIGHTED CHOICE IN CONSTANT TIME)
+# ============================================================================
+
+class AliasTable:
+    """
+    Weighted random choice in constant time using Vose's alias method.
+
+    The weights are rearranged ONCE into n columns of equal height. Every
+    column holds at most two items: its own, and an "alias" that fills the
+    rest of the column. A pick is then one random float: the whole part
+    chooses the column and the fraction chooses own item or alias.
+
+    Args:
+        items (list): Things to choose from
+        weights (list): Relative chance of each item
+    """
+
+    __slots__ = ("items", "probability", "alias")
+
+    def __init__(self, items, weights):
+        n = len(items)
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+
+        self.items = list(items)
+        self.probability = [1.0] * n
+        self.alias = list(range(n))
+
+        small = [i for i, w in enumerate(scaled) if w < 1.0]
+        large = [i for i, w in enumerate(scaled) if w >= 1.0]
+
+        # Pair each short column with a tall one until all are full
+        while small and large:
+            short = small.pop()
+            tall = large.pop()
+            self.probability[short] = scaled[short]
+            self.alias[short] = tall
+            scaled[tall] = scaled[tall] + scaled[short] - 1.0
+            if scaled[tall] < 1.0:
+                small.append(tall)
+            else:
+                large.append(tall)
+
+    def sample_index(self, rng=random):
+        """
+        Pick the position of one item.
+
+        Args:
+            rng (optional): Random number generator
+
+        Returns:
+            int: Position in items
+        """
+        u = rng.random() * len(self.probability)
+        column = int(u)
+        if u - column < self.probability[column]:
+            return column
+        return self.alias[column]
+
+    def sample(self, rng=random):
+        """
+        Pick one item.
+
+        Args:
+            rng (optional): Random number generator
+
+        Returns:
+            object: Chosen item
+        """
+        return self.items[self.sample_index(rng)]
+
+    def sample_indices(self, count, rng=random):
+        """
+        Pick the positions of many items. Uses the generator's batch
+        method (e.g. PhiloxRandom.randoms) when it has one.
+
+        Args:
+            count (int): How many picks
+            rng (optional): Random number generator
+
+        Returns:
+            list: Positions in items
+        """
+        if hasattr(rng, "randoms"):
+            import numpy as np
+
+            u = rng.randoms(count) * len(self.probability)
+            columns = u.astype(np.int64)
+            keep = (u - columns) < np.asarray(self.probability)[columns]
+            chosen = np.where(keep, columns, np.asarray(self.alias)[columns])
+            return chosen.tolist()
+        return [self.sample_index(rng) for _ in range(count)]
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    from combat_simulator import potion_at, run_simulation
+
+    for name, rng in (("random.Random", seeded(7)),
+                      ("PhiloxRandom", PhiloxRandom(7))):
+        start = time.perf_counter()
+        results = run_simulation(50_000, potion_at(0.4), rng=rng)
+        elapsed = time.perf_counter() - start
+        wins = sum(stats["wins"] for stats in results.values())
+        print(f"{name:<14} {50_000 / elapsed:>10,.0f} fights/sec  wins={wins}")
+
+    # The same seed always replays the same fights
+    first = run_simulation(1_000, rng=PhiloxRandom(3, stream=1))
+    again = run_simulation(1_000, rng=PhiloxRandom(3, stream=1))
+    print("Repeatable:", first == again)
+
+    # Roll N is the same whether it comes alone or in a batch
+    single = PhiloxRandom(5)
+    singles = [single.randint(1, 6) for _ in range(10_000)]
+    mixed = PhiloxRandom(5)
+    batches = [mixed.randint(1, 6)] + mixed.randints(1, 6, 5_000).tolist()
+    batches += [mixed.randint(1, 6) for _ in range(4_999)]
+    print("Single and batch rolls match:", singles == batches,
+          f"({mixed.rolls:,} rolls)")
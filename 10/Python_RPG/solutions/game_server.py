@@ -0,0 +1,558 @@
+"""
+Game Server: Many Adventurers at Once with asyncio
+Alberta CSE 1120: Structured Programming 2
+
+create_character() and combat_loop() stop and wait inside input(), so one
+program can only serve one player. This server runs the same Phase 1 and
+Phase 2 flows as COROUTINES - functions that can pause at `await` while
+they wait for a player to type, letting the program serve everyone else
+in the meantime. Each connected player costs one small Session object and
+one paused coroutine, not a whole thread.
+
+Protocol (plain text lines, try it with `nc localhost 8765`):
+- Game text is sent as ordinary lines
+- A question is one line that starts with ">> "
+- The player answers with one line; "quit" leaves at any time
+
+Run it from this folder:
+
+    python game_server.py serve --port 8765 --metrics metrics.prom
+    python game_server.py loadtest --clients 500 --idle 2000
+
+Learning Objectives:
+- async def, await and the asyncio event loop
+- Reading and writing network streams
+- Reusing display functions with a different I/O object
+- Measuring latency (how long each turn takes)
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import deque
+
+from combat_state import CombatMachine, display_events
+from game_metrics import NO_METRICS, Metrics
+from monster_registry import spawn_random
+from phase1_character_creation import (
+    TOTAL_POINTS,
+    calculate_attributes,
+    display_allocation_menu,
+    display_allocation_rules,
+    display_banner,
+    display_character_summary,
+    display_final_attributes,
+    generate_starting_gold,
+    is_yes,
+    parse_points,
+    validate_name,
+)
+from phase2_combat_system import (
+    display_action_menu,
+    display_combat_header,
+    display_combat_status,
+)
+
+PROMPT_MARK = ">> "
+BACKLOG = 4096      # Connections allowed to wait to be accepted
+
+
+class PlayerQuit(Exception):
+    """Raised when a player types "quit", disconnects or sends a broken line."""
+
+
+# ============================================================================
+# SESSION
+# ============================================================================
+
+class Session:
+    """
+    One connected player: the network streams, an output buffer and
+    latency counters. Works as the `io` object for the Phase 1 and
+    Phase 2 display functions - their io.print() calls are saved up and
+    sent together with the next question.
+
+    Args:
+        reader (asyncio.StreamReader): Incoming lines
+        writer (asyncio.StreamWriter): Outgoing text
+        rng (random.Random): This player's own dice
+        server (GameServer): Collects latency numbers
+    """
+
+    __slots__ = ("reader", "writer", "rng", "server", "pieces",
+                 "answered_at", "turns", "busy")
+
+    def __init__(self, reader, writer, rng, server):
+        self.reader = reader
+        self.writer = writer
+        self.rng = rng
+        self.server = server
+        self.pieces = []
+        self.answered_at = None     # When the last answer arrived
+        self.turns = 0
+        self.busy = 0.0             # Total server time spent on this player
+
+    def print(self, *values, sep=" ", end="\n"):
+        """Save text to send with the next question."""
+        self.pieces.append(sep.join(map(str, values)) + end)
+
+    def input(self, prompt=""):
+        """Blocking input would stall every player, so it is not allowed."""
+        raise RuntimeError("Use 'await session.ask(...)' on the server")
+
+    async def send(self):
+        """Send any saved text."""
+        if self.pieces:
+            self.writer.write("".join(self.pieces).encode())
+            self.pieces = []
+            await self.writer.drain()
+
+    async def ask(self, prompt):
+        """
+        Send saved text plus a question, then wait for the answer.
+        The time between the previous answer and this question is the
+        server's turn latency.
+
+        Args:
+            prompt (str): Question text
+
+        Returns:
+            str: The player's answer (without the newline)
+        """
+        # Keep blank lines that the game put in front of the question
+        stripped = prompt.lstrip("\n")
+        self.pieces.append("\n" * (len(prompt) - len(stripped)))
+        self.pieces.append(PROMPT_MARK + stripped.strip() + "\n")
+        await self.send()
+
+        if self.answered_at is not None:
+            latency = time.perf_counter() - self.answered_at
+            self.busy += latency
+            self.server.record_turn(latency)
+
+        metrics = self.server.metrics
+        waited = metrics.clock()
+        try:
+            line = await self.reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            # A line longer than the stream's limit: drop this client
+            raise PlayerQuit()
+        metrics.observe("input_wait_seconds", waited)
+        if not line:
+            raise PlayerQuit()
+        answer = line.decode(errors="replace").rstrip("\r\n")
+        if answer.strip().lower() == "quit":
+            raise PlayerQuit()
+
+        self.answered_at = time.perf_counter()
+        self.turns += 1
+        return answer
+
+
+# ============================================================================
+# PHASE 1 FLOW (CHARACTER CREATION)
+# ============================================================================
+# Same steps as get_character_name() and allocate_attribute_points(), with
+# `await session.ask()` in place of input(). The rules and messages are
+# the shared Phase 1 helpers.
+
+async def ask_character_name(session):
+    """
+    Get and validate the character's name.
+
+    Args:
+        session (Session): The player
+
+    Returns:
+        str: The validated name
+    """
+    while True:
+        name = (await session.ask("Enter your hero's name: ")).strip()
+
+        error = validate_name(name)
+        if error is not None:
+            session.print(error)
+            continue
+
+        session.print(f"\nYou have chosen the name: {name}")
+        if is_yes(await session.ask("Is this correct? (yes/no): ")):
+            return name
+        session.print("\nLet's try again.\n")
+
+
+async def ask_attribute_points(session):
+    """
+    Let the player spend TOTAL_POINTS on health and mana.
+
+    Args:
+        session (Session): The player
+
+    Returns:
+        tuple: (health, mana)
+    """
+    display_allocation_rules(session)
+
+    points_remaining = TOTAL_POINTS
+    health_points = 0
+    mana_points = 0
+
+    while points_remaining > 0:
+        display_allocation_menu(points_remaining, health_points, mana_points,
+                                session)
+        choice = (await session.ask("\nEnter choice (1-3): ")).strip()
+
+        if choice == "1" or choice == "2":
+            stat = "Health" if choice == "1" else "Mana"
+            session.print(f"\nYou can allocate up to {points_remaining} "
+                          f"points to {stat}.")
+            points, error = parse_points((await session.ask(
+                f"How many points? (0-{points_remaining}): ")).strip(),
+                points_remaining)
+            if error is not None:
+                session.print(error)
+                continue
+
+            if choice == "1":
+                health_points += points
+            else:
+                mana_points += points
+            points_remaining -= points
+            session.print(f"\nAllocated {points} points to {stat}!")
+
+        elif choice == "3":
+            if points_remaining > 0:
+                session.print(f"\nWarning: You still have {points_remaining} "
+                              f"unallocated points!")
+                if not is_yes(await session.ask("Finish anyway? (yes/no): ")):
+                    continue
+
+            health, mana = calculate_attributes(health_points, mana_points)
+            display_final_attributes(health, mana, points_remaining, session)
+            if is_yes(await session.ask("\nConfirm these stats? (yes/no): ")):
+                return (health, mana)
+            session.print("\nResetting allocation...\n")
+            points_remaining = TOTAL_POINTS
+            health_points = 0
+            mana_points = 0
+
+        else:
+            session.print("\nInvalid choice. Please enter 1, 2, or 3.")
+
+    return calculate_attributes(health_points, mana_points)
+
+
+async def create_character(session):
+    """
+    Coroutine version of create_character().
+
+    Args:
+        session (Session): The player
+
+    Returns:
+        dict: Character data dictionary
+    """
+    display_banner(session)
+    name = await ask_character_name(session)
+    health, mana = await ask_attribute_points(session)
+    gold = generate_starting_gold(session.rng, session)
+    display_character_summary(name, health, mana, gold, session)
+
+    return {
+        "name": name,
+        "health": health,
+        "max_health": health,
+        "mana": mana,
+        "max_mana": mana,
+        "gold": gold,
+    }
+
+
+# ============================================================================
+# PHASE 2 FLOW (COMBAT)
+# ============================================================================
+
+async def fight(session, player, monster):
+    """
+    Coroutine version of combat_loop(), driving a CombatMachine.
+
+    Args:
+        session (Session): The player
+        player (dict): Player character data
+        monster (dict): Monster to fight
+
+    Returns:
+        str: "win", "loss" or "fled"
+    """
+    machine = CombatMachine(player, monster)
+    display_combat_header(player, monster, session)
+    session.print(f"\nA wild {monster['name']} appears!")
+
+    while not machine.finished:
+        display_combat_status(player, monster, session)
+        display_action_menu(session)
+        action = (await session.ask("\nChoose action (1-4): ")).strip()
+        display_events(machine, machine.step(action, session.rng), session)
+
+    return machine.status
+
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+class GameServer:
+    """
+    Accepts connections and runs one session coroutine per player.
+
+    Args:
+        seed (int, optional): Base seed; each session gets its own stream
+        latency_samples (int): Most recent turn latencies kept for reports
+        metrics (optional): Counters and histograms (see game_metrics.py)
+    """
+
+    def __init__(self, seed=None, latency_samples=100_000,
+                 metrics=NO_METRICS):
+        self.seed = seed
+        self.metrics = metrics
+        self.latencies = deque(maxlen=latency_samples)
+        self.session_means = deque(maxlen=latency_samples)
+        self.active = 0
+        self.completed = 0
+        self.next_id = 0
+
+    def record_turn(self, seconds):
+        """Remember one turn's server-side latency."""
+        self.latencies.append(seconds)
+        self.metrics.record("server_turn_seconds", seconds)
+        self.metrics.count("server_turns_total")
+
+    async def handle(self, reader, writer):
+        """Run one player's whole visit (called by asyncio per connection)."""
+        self.next_id += 1
+        seed = None if self.seed is None else f"{self.seed}:{self.next_id}"
+        session = Session(reader, writer, random.Random(seed), self)
+        self.active += 1
+        self.metrics.count("sessions_total")
+        try:
+            player = await create_character(session)
+            while True:
+                result = await fight(session, player, spawn_random(session.rng))
+                self.metrics.count("combat_fights_total", result=result)
+                if result == "loss":
+                    break
+                again = await session.ask("\nFight again? (yes/no): ")
+                if not is_yes(again.strip()):
+                    break
+            session.print("\nFarewell, adventurer!")
+            await session.send()
+        except (PlayerQuit, ConnectionError):
+            pass
+        finally:
+            self.active -= 1
+            self.completed += 1
+            if session.turns > 1:
+                self.session_means.append(session.busy / (session.turns - 1))
+            writer.close()
+
+    def report(self):
+        """
+        Summarize turn latency.
+
+        Returns:
+            dict: turns, mean, p50, p99 and max latency in milliseconds,
+                  plus the worst finished session's mean turn latency
+        """
+        samples = sorted(self.latencies)
+        if not samples:
+            return {"turns": 0}
+        pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+        return {
+            "turns": len(samples),
+            "mean_ms": 1000 * sum(samples) / len(samples),
+            "p50_ms": 1000 * pick(0.50),
+            "p99_ms": 1000 * pick(0.99),
+            "max_ms": 1000 * samples[-1],
+            "worst_session_mean_ms": 1000 * max(self.session_means, default=0),
+        }
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """
+        Start listening.
+
+        Returns:
+            asyncio.Server: The listening server
+        """
+        return await asyncio.start_server(self.handle, host, port,
+                                          backlog=BACKLOG)
+
+
+# ============================================================================
+# LOCAL TEST CLIENTS
+# ============================================================================
+
+async def bot_client(host, port, name, fights):
+    """
+    A scripted player: names itself, puts every point into Health,
+    always attacks, and leaves after `fights` fights.
+
+    Returns:
+        int: Questions answered
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    fights_done = 0
+    answered = 0
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        text = line.decode()
+        if not text.startswith(PROMPT_MARK):
+            continue
+
+        question = text[len(PROMPT_MARK):]
+        if question.startswith("Enter your hero's name"):
+            answer = name
+        elif question.startswith("Enter choice"):
+            answer = "1"
+        elif question.startswith("How many points?"):
+            answer = question.split("-")[1].split(")")[0]   # The maximum
+        elif question.startswith("Fight again?"):
+            fights_done += 1
+            answer = "yes" if fights_done < fights else "no"
+        elif question.startswith("Choose action"):
+            answer = "1"
+        else:
+            answer = "yes"
+        writer.write((answer + "\n").encode())
+        answered += 1
+
+    writer.close()
+    return answered
+
+
+async def load_test(clients=200, fights=3, idle=0, port=0):
+    """
+    Start a server in this process, connect bot clients, and report.
+
+    Args:
+        clients (int): Bots that play through
+        fights (int): Fights per bot
+        idle (int): Extra connections that stay at the first question
+        port (int): Port to use (0 = any free port)
+
+    Returns:
+        dict: Timing, latency and memory results
+    """
+    import tracemalloc
+
+    server = GameServer(seed=1)
+    listener = await server.start("127.0.0.1", port)
+    port = listener.sockets[0].getsockname()[1]
+    results = {}
+
+    # Idle sessions: how much memory does a waiting player cost?
+    if idle:
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        idle_connections = []
+        for _ in range(idle):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            idle_connections.append((reader, writer))
+        while server.active < idle:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        # Both ends of each connection live in this process
+        results["idle_sessions"] = idle
+        results["kib_per_idle_session_both_ends"] = (after - before) / idle / 1024
+
+    start = time.perf_counter()
+    answered = await asyncio.gather(*(
+        bot_client("127.0.0.1", port, f"Bot{i}", fights)
+        for i in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    if idle:
+        for _, writer in idle_connections:
+            writer.close()
+    while server.active:
+        await asyncio.sleep(0.01)
+
+    listener.close()
+    await listener.wait_closed()
+
+    results.update({
+        "clients": clients,
+        "seconds": elapsed,
+        "turns_per_sec": sum(answered) / elapsed,
+        "latency": server.report(),
+    })
+    return results
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Python Adventure server")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the game server")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--seed", type=int, default=None)
+    serve.add_argument("--metrics", metavar="PATH",
+                       help="write metrics here (.json for JSON, otherwise "
+                            "Prometheus text)")
+    serve.add_argument("--metrics-every", type=float, default=10.0,
+                       metavar="SECONDS")
+
+    test = commands.add_parser("loadtest", help="run bots against a server")
+    test.add_argument("--clients", type=int, default=200)
+    test.add_argument("--fights", type=int, default=3)
+    test.add_argument("--idle", type=int, default=0)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        async def write_metrics(metrics):
+            while True:
+                await asyncio.sleep(args.metrics_every)
+                metrics.write(args.metrics)
+
+        async def serve_forever():
+            metrics = Metrics() if args.metrics else NO_METRICS
+            server = GameServer(args.seed, metrics=metrics)
+            listener = await server.start(args.host, args.port)
+            print(f"Serving on {args.host}:{args.port} (Ctrl+C to stop)")
+            if args.metrics:
+                writer = asyncio.create_task(write_metrics(metrics))
+            try:
+                async with listener:
+                    await listener.serve_forever()
+            finally:
+                print("\nLatency:", server.report())
+                if args.metrics:
+                    writer.cancel()
+                    metrics.write(args.metrics)
+
+        try:
+            asyncio.run(serve_forever())
+        except KeyboardInterrupt:
+            pass
+    else:
+        results = asyncio.run(load_test(args.clients, args.fights, args.idle))
+        for key, value in results.items():
+            print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
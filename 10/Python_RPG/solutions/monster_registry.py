@@ -0,0 +1,215 @@
+"""
+Monster Registry: Monsters Loaded from a Data File
+Alberta CSE 1120: Structured Programming 2
+
+Adding a monster used to mean writing a new create_* function and editing
+create_random_monster(). Here every monster is a record in monsters.json,
+and the registry turns those records into shared MonsterTemplates plus an
+alias table for picking encounters. The table is built once when the file
+is loaded, so each pick is a single random number and a list lookup, no
+matter how many kinds of monster there are.
+
+Learning Objectives:
+- Reading structured data from a JSON file
+- Keeping data separate from code
+- Validating input data and reporting clear errors
+- Preparing work ahead of time to make each call cheap
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import json
+import os
+import random
+
+from combatant import Combatant, MonsterTemplate
+from game_random import AliasTable
+
+
+# Default data file, next to this module
+MONSTER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "monsters.json")
+
+# Every monster record must have these keys
+REQUIRED_KEYS = ("name", "max_health", "min_damage", "max_damage",
+                 "gold_reward", "experience", "weight")
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+class MonsterRegistry:
+    """
+    All known monsters and the odds of meeting each one.
+
+    Args:
+        records (list): Monster dictionaries, each with REQUIRED_KEYS
+    """
+
+    def __init__(self, records):
+        self.templates = []
+        self.weights = []
+        self.by_name = {}
+
+        for record in records:
+            missing = [key for key in REQUIRED_KEYS if key not in record]
+            if missing:
+                raise ValueError(f"Monster {record.get('name', '?')!r} is "
+                                 f"missing {', '.join(missing)}")
+            if record["min_damage"] > record["max_damage"]:
+                raise ValueError(f"Monster {record['name']!r} has "
+                                 f"min_damage above max_damage")
+            if record["name"] in self.by_name:
+                raise ValueError(f"Monster {record['name']!r} is listed twice")
+
+            template = MonsterTemplate.from_dict(record)
+            self.templates.append(template)
+            self.weights.append(record["weight"])
+            self.by_name[template.name] = template
+
+        if not self.templates:
+            raise ValueError("The registry needs at least one monster")
+
+        self.table = AliasTable(self.templates, self.weights)
+
+    def __len__(self):
+        return len(self.templates)
+
+    def template(self, name):
+        """
+        Look up a monster kind by name.
+
+        Args:
+            name (str): e.g. "Goblin"
+
+        Returns:
+            MonsterTemplate: Shared stats
+        """
+        return self.by_name[name]
+
+    def create(self, name):
+        """
+        Create a fresh monster dictionary, like create_goblin() does.
+
+        Args:
+            name (str): e.g. "Goblin"
+
+        Returns:
+            dict: Monster data at full health
+        """
+        return self.by_name[name].to_dict()
+
+    def spawn(self, rng=random):
+        """
+        Pick a random encounter using the weights from the data file.
+
+        Args:
+            rng (optional): Random number generator
+
+        Returns:
+            Combatant: Monster at full health
+        """
+        return Combatant(self.table.sample(rng))
+
+    def spawn_batch(self, count, rng=random):
+        """
+        Pick many random encounters at once.
+
+        Args:
+            count (int): Number of monsters
+            rng (optional): Random number generator
+
+        Returns:
+            list: Combatants at full health
+        """
+        templates = self.templates
+        return [Combatant(templates[i])
+                for i in self.table.sample_indices(count, rng)]
+
+
+def load_registry(path=MONSTER_FILE):
+    """
+    Read a registry from a JSON file shaped like monsters.json.
+
+    Args:
+        path (str): File to read
+
+    Returns:
+        MonsterRegistry: The loaded monsters
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    return MonsterRegistry(data["monsters"])
+
+
+# ============================================================================
+# DEFAULT REGISTRY
+# ============================================================================
+
+DEFAULT_REGISTRY = load_registry()
+
+# The shared templates, in file order (the order of MONSTER_TYPES in
+# phase2_combat_system.py)
+TEMPLATES = DEFAULT_REGISTRY.templates
+
+
+def spawn_random(rng=random):
+    """
+    Pick a random encounter from the default registry. This is the one
+    random-encounter rule of the game: create_random_monster() makes the
+    same pick with the same generator, as a dictionary.
+
+    Args:
+        rng (optional): Random number generator
+
+    Returns:
+        Combatant: Monster at full health
+    """
+    return DEFAULT_REGISTRY.spawn(rng)
+
+
+def spawn_batch(count, rng=random):
+    """
+    Pick many random encounters from the default registry.
+
+    Args:
+        count (int): Number of monsters
+        rng (optional): Random number generator
+
+    Returns:
+        list: Combatants at full health
+    """
+    return DEFAULT_REGISTRY.spawn_batch(count, rng)
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+    from collections import Counter
+
+    from game_random import PhiloxRandom
+    from phase2_combat_system import create_random_monster
+
+    COUNT = 200_000
+
+    for label, make in (
+            ("create_random_monster", lambda: [create_random_monster()
+                                               for _ in range(COUNT)]),
+            ("registry.spawn", lambda: [spawn_random()
+                                        for _ in range(COUNT)]),
+            ("registry.spawn_batch", lambda: spawn_batch(COUNT)),
+            ("spawn_batch (Philox)", lambda: spawn_batch(COUNT,
+                                                         PhiloxRandom(1)))):
+        start = time.perf_counter()
+        monsters = make()
+        elapsed = time.perf_counter() - start
+        counts = Counter(monster["name"] for monster in monsters)
+        mix = ", ".join(f"{name} {counts[name] / COUNT:.3f}"
+                        for name in sorted(counts))
+        print(f"{label:<22} {COUNT / elapsed:>12,.0f} per sec   {mix}")
@@ -0,0 +1,428 @@
+"""
+Monster Tuner: Searching for Stats That Hit a Target
+Alberta CSE 1120: Structured Programming 2
+
+Balancing a monster by hand means guessing new numbers for max_health,
+min_damage and max_damage, playing some fights, and guessing again. This
+module does the guessing automatically. The designer gives a TARGET for
+each monster - the win rate and the average fight length the reference
+player (create_test_player()) should get - and the tuner searches for
+stats that come as close as possible.
+
+The search is a COMPASS SEARCH (a kind of coordinate descent):
+
+1. Start from the monster's current stats, with a step size per stat.
+2. Try one step up and one step down in every stat.
+3. If the best of those is closer to the target, move there and repeat.
+4. If none is closer, halve the step sizes. Stop when every step is 0.
+
+Step 4 has one exception. A monster that the player always beats is on a
+PLATEAU: a little more damage still loses 0% of fights, so the loss does
+not change at all and there is no direction to move in. While a stat's
+tries come out exactly level, its step is doubled instead (up to
+MAX_STEP), until a step is big enough to reach past the plateau.
+
+Two rules keep the stats believable: is_valid() allows a biggest hit of
+at most MAX_DAMAGE_RATIO times the smallest, and a small DRIFT_WEIGHT
+penalty prefers stats near the ones the monster started with.
+
+Two things keep it quick:
+
+- Each try plays thousands of fights at once with combat_vectorized.py
+  (or solves them exactly with combat_exact.py - slower, but exact).
+  Every try uses the same seed, so two stat vectors are compared on the
+  same dice rolls and the result for a stat vector never changes.
+- That is why results can be MEMOIZED: every result is saved under its
+  stat vector in an EvaluationCache (see build_optimizer.py). The search
+  often comes back to a stat vector it has already tried (a step up
+  followed by a step down), and those cost nothing.
+
+Learning Objectives:
+- Searching for the best value instead of guessing
+- Measuring "how close" with a single number (the loss)
+- Memoization: saving results so repeated work is free
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import json
+
+import combat_exact
+import combat_vectorized
+from build_optimizer import EvaluationCache, rules_fingerprint
+from phase2_combat_system import MONSTER_TYPES, create_test_player
+from tournament import make_vectorized_policy
+
+# The stats the tuner changes, their first step sizes and smallest values
+STATS = ("max_health", "min_damage", "max_damage")
+START_STEPS = (16, 4, 4)
+LOWEST = (1, 1, 1)
+MAX_STEP = 128
+
+# A monster's biggest hit may be at most this many times its smallest,
+# so the tuner cannot reach a target with a wild 3-40 damage spread
+MAX_DAMAGE_RATIO = 3
+
+# A stat that doubles (or drops to zero) adds DRIFT_WEIGHT to the score
+# (see drift()). It is small, so it only breaks ties: of the stats that
+# hit the target about equally well, the search keeps the ones closest
+# to the monster's original stats
+DRIFT_WEIGHT = 0.1
+
+BACKENDS = ("vectorized", "exact")
+
+# One percentage point of win rate counts as much as one turn of fight
+# length in the loss
+WIN_RATE_WEIGHT = 100
+
+# Player stats that combat reads - part of the cache key
+PLAYER_KEYS = ("health", "max_health", "health_potions")
+
+# What the designer wants: win rate and average turns per monster
+TARGETS = {
+    "Goblin": {"win_rate": 0.98, "turns": 3.0},
+    "Orc": {"win_rate": 0.90, "turns": 5.0},
+    "Troll": {"win_rate": 0.70, "turns": 8.0},
+}
+
+
+# ============================================================================
+# STAT VECTORS
+# ============================================================================
+
+def stats_of(monster):
+    """
+    A monster's tunable stats as a tuple.
+
+    Args:
+        monster (dict): Monster data
+
+    Returns:
+        tuple: (max_health, min_damage, max_damage)
+    """
+    return tuple(monster[name] for name in STATS)
+
+
+def with_stats(monster, stats):
+    """
+    A copy of a monster with new stats, at full health.
+
+    Args:
+        monster (dict): Monster data
+        stats (tuple): (max_health, min_damage, max_damage)
+
+    Returns:
+        dict: The new monster
+    """
+    changed = dict(monster, **dict(zip(STATS, stats)))
+    changed["health"] = changed["max_health"]
+    return changed
+
+
+def is_valid(stats):
+    """
+    Whether a stat vector makes a monster a designer would ship.
+
+    Args:
+        stats (tuple): (max_health, min_damage, max_damage)
+
+    Returns:
+        bool: True if every stat is at least its LOWEST value and the
+            largest hit is between the smallest and MAX_DAMAGE_RATIO
+            times the smallest
+    """
+    _, min_damage, max_damage = stats
+    return (all(value >= lowest for value, lowest in zip(stats, LOWEST))
+            and min_damage <= max_damage
+            <= MAX_DAMAGE_RATIO * min_damage)
+
+
+def keep_in_shape(stats, moved):
+    """
+    After one damage stat has moved, pull the other one along just far
+    enough for the damage range to stay valid: raising max_damage past
+    MAX_DAMAGE_RATIO times min_damage raises min_damage too, and so on.
+    Without this the search could never widen a narrow range.
+
+    Args:
+        stats (list): (max_health, min_damage, max_damage), changed in
+            place
+        moved (int): Position in STATS of the stat that moved
+    """
+    _, min_damage, max_damage = stats
+    if STATS[moved] == "min_damage":
+        stats[2] = min(max(max_damage, min_damage),
+                       MAX_DAMAGE_RATIO * min_damage)
+    elif STATS[moved] == "max_damage":
+        stats[1] = min(max(min_damage, -(-max_damage // MAX_DAMAGE_RATIO)),
+                       max_damage)
+
+
+def drift(stats, original):
+    """
+    How far a stat vector has moved from the monster's original stats.
+    Teaches: Measuring change as a fraction, so big and small stats count
+    the same
+
+    Args:
+        stats (tuple): (max_health, min_damage, max_damage)
+        original (tuple): The stats the search started from
+
+    Returns:
+        float: Sum of the squared fractional changes
+    """
+    return sum(((value - start) / start) ** 2
+               for value, start in zip(stats, original) if start)
+
+
+# ============================================================================
+# EVALUATING ONE STAT VECTOR
+# ============================================================================
+
+def measure(monster, player, policy_spec, backend, fights, seed):
+    """
+    Win rate and average fight length of the player against a monster.
+
+    Args:
+        monster (dict): Monster data
+        player (dict): Player character data
+        policy_spec (tuple): Policy, as in tournament.py
+        backend (str): "vectorized" or "exact"
+        fights (int): Fights to play (vectorized only)
+        seed (int): Seed (vectorized only)
+
+    Returns:
+        dict: "win_rate" and "turns"
+    """
+    if backend == "exact":
+        odds = combat_exact.matchup_odds(player, monster, policy_spec)
+        return {"win_rate": odds["win"], "turns": odds["expected_turns"]}
+
+    outcomes = combat_vectorized.simulate_fights(
+        fights, monster, player, make_vectorized_policy(policy_spec), seed)
+    return {"win_rate": float((outcomes["result"]
+                               == combat_vectorized.WIN).mean()),
+            "turns": float(outcomes["turns"].mean())}
+
+
+def loss(result, target):
+    """
+    How far a result is from the target (0 means exactly on it).
+    Teaches: Combining two errors into one number
+
+    Args:
+        result (dict): Output of measure()
+        target (dict): "win_rate" and "turns" wanted
+
+    Returns:
+        float: Squared win rate error (in percentage points) plus
+            squared turns error
+    """
+    win_error = (result["win_rate"] - target["win_rate"]) * WIN_RATE_WEIGHT
+    turns_error = result["turns"] - target["turns"]
+    return win_error ** 2 + turns_error ** 2
+
+
+# ============================================================================
+# THE SEARCH
+# ============================================================================
+
+def tune_monster(monster, target, player=None,
+                 policy_spec=("always_attack",), backend="vectorized",
+                 fights=20_000, seed=0, cache=None, max_evaluations=500):
+    """
+    Search for the stats that bring a monster closest to a target,
+    without straying far from its original stats: the search minimizes
+    loss() plus DRIFT_WEIGHT * drift().
+    Teaches: Compass search, memoization
+
+    Args:
+        monster (dict): Monster to start from (e.g. create_troll())
+        target (dict): "win_rate" and "turns" wanted
+        player (dict, optional): Reference player. Uses
+            create_test_player()
+        policy_spec (tuple): How the player fights, as in tournament.py
+        backend (str): "vectorized" or "exact" (see BACKENDS)
+        fights (int): Fights per try (vectorized only)
+        seed (int): Seed for every try (vectorized only)
+        cache (EvaluationCache, optional): Results to reuse and add to
+        max_evaluations (int): Stop after this many new tries
+
+    Returns:
+        dict: "monster" (the tuned copy), "stats", "result" (from
+            measure()), "loss", "drift", "played" (new tries), "cached" (tries
+            that were already in the cache) and "path" (the stat vectors
+            moved through, first to last)
+
+    Raises:
+        ValueError: If the backend is unknown or the monster's own stats
+            are not valid (see is_valid())
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}; choose from "
+                         f"{', '.join(BACKENDS)}")
+    if player is None:
+        player = create_test_player()
+    if cache is None:
+        cache = EvaluationCache()
+
+    # Everything except the stat vector is the same for every try
+    fixed = [{key: player.get(key, 0) for key in PLAYER_KEYS},
+             list(policy_spec), backend, rules_fingerprint()]
+    if backend == "vectorized":
+        fixed += [fights, seed]
+    hits, misses = cache.hits, cache.misses
+
+    original = stats_of(monster)
+    if not is_valid(original):
+        raise ValueError(f"{monster['name']} starts with invalid stats "
+                         f"{original}")
+
+    def evaluate(stats):
+        """(score to minimize, loss from the target, measured result)"""
+        key = json.dumps(fixed + [list(stats)])
+        result = cache.get(key)
+        if result is None:
+            result = measure(with_stats(monster, stats), player, policy_spec,
+                             backend, fights, seed)
+            cache.put(key, result)
+        target_loss = loss(result, target)
+        return (target_loss + DRIFT_WEIGHT * drift(stats, original),
+                target_loss, result)
+
+    best = original
+    best_score, best_loss, best_result = evaluate(best)
+    path = [best]
+    steps = list(START_STEPS)
+    # A stat stops growing its step once the step has been halved, so the
+    # search cannot go back and forth between doubling and halving
+    expanding = [True] * len(STATS)
+
+    while any(steps) and cache.misses - misses < max_evaluations:
+        # Every stat one step up and one step down
+        candidates = []
+        for position, step in enumerate(steps):
+            if step == 0:
+                continue
+            for change in (step, -step):
+                stats = list(best)
+                stats[position] += change
+                keep_in_shape(stats, position)
+                if is_valid(stats):
+                    candidates.append((position, tuple(stats)))
+
+        # A plateau is judged on the target loss alone: the drift term
+        # always changes a little, even where the results do not
+        centre_score, centre_loss = best_score, best_loss
+        level = [False] * len(STATS)
+        for position, stats in candidates:
+            score, candidate_loss, result = evaluate(stats)
+            if candidate_loss == centre_loss:
+                level[position] = True
+            if score < best_score:
+                best, best_score = stats, score
+                best_loss, best_result = candidate_loss, result
+
+        if best_score < centre_score:
+            path.append(best)
+            continue
+        for position, step in enumerate(steps):
+            if expanding[position] and level[position] and step < MAX_STEP:
+                steps[position] = step * 2
+            else:
+                expanding[position] = False
+                steps[position] = step // 2
+    cache.save()
+
+    return {
+        "monster": with_stats(monster, best),
+        "stats": dict(zip(STATS, best)),
+        "result": best_result,
+        "loss": best_loss,
+        "drift": drift(best, original),
+        "played": cache.misses - misses,
+        "cached": cache.hits - hits,
+        "path": path,
+    }
+
+
+def tune_monsters(targets=TARGETS, **options):
+    """
+    Tune every monster in MONSTER_TYPES that has a target.
+
+    Args:
+        targets (dict): Monster name -> target (see TARGETS)
+        **options: Passed on to tune_monster()
+
+    Returns:
+        dict: Monster name -> (original monster, output of tune_monster())
+    """
+    tuned = {}
+    for create in MONSTER_TYPES:
+        monster = create()
+        target = targets.get(monster["name"])
+        if target is not None:
+            tuned[monster["name"]] = (monster,
+                                      tune_monster(monster, target,
+                                                   **options))
+    return tuned
+
+
+def display_tuning(tuned, targets=TARGETS, title="TUNED MONSTERS"):
+    """
+    Print the old and new stats of each tuned monster.
+
+    Args:
+        tuned (dict): Output of tune_monsters()
+        targets (dict): The targets that were used
+        title (str): Heading
+    """
+    print("\n" + "=" * 72)
+    print(title)
+    print("=" * 72)
+    print(f"{'Monster':<8}{'Old stats':>12}{'New stats':>12}"
+          f"{'Win %':>14}{'Turns':>14}{'Tries':>12}")
+    print(f"{'':<8}{'HP/min/max':>12}{'HP/min/max':>12}"
+          f"{'got (want)':>14}{'got (want)':>14}{'new/cached':>12}")
+    print("-" * 72)
+    for name, (monster, found) in tuned.items():
+        target = targets[name]
+        result = found["result"]
+        old = "/".join(str(value) for value in stats_of(monster))
+        new = "/".join(str(value) for value in found["stats"].values())
+        win = f"{result['win_rate']:.1%} ({target['win_rate']:.0%})"
+        turns = f"{result['turns']:.2f} ({target['turns']:g})"
+        tries = f"{found['played']}/{found['cached']}"
+        print(f"{name:<8}{old:>12}{new:>12}{win:>14}{turns:>14}{tries:>12}")
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    cache = EvaluationCache()
+
+    start = time.perf_counter()
+    tuned = tune_monsters(cache=cache)
+    elapsed = time.perf_counter() - start
+    display_tuning(tuned, title=f"TUNED MONSTERS in {elapsed:.2f}s")
+
+    # The same search again: every try is already in the cache
+    start = time.perf_counter()
+    tuned = tune_monsters(cache=cache)
+    elapsed = time.perf_counter() - start
+    display_tuning(tuned, title=f"SAME SEARCH AGAIN in {elapsed:.3f}s")
+
+    # Check the tuned monsters with the exact odds (no dice involved)
+    print("\nExact odds for the tuned stats:")
+    player = create_test_player()
+    for name, (_, found) in tuned.items():
+        exact = measure(found["monster"], player, ("always_attack",),
+                        "exact", 0, 0)
+        print(f"  {name:<8} win {exact['win_rate']:.1%}, "
+              f"{exact['turns']:.2f} turns")
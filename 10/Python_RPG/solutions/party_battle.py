@@ -0,0 +1,407 @@
+"""
+Party Battles: Many Players Against Many Monsters
+Alberta CSE 1120: Structured Programming 2
+
+combat_loop() is always one player against one monster, taking turns.
+A party battle can have hundreds of fighters on each side, so two new
+questions come up:
+
+1. WHO ACTS NEXT? Every fighter has a speed. A fighter with speed 10 acts
+   every 10 "ticks" of time (TURN_LENGTH / speed); a faster one acts more
+   often. The turn order is kept in a PRIORITY QUEUE (the heapq module),
+   keyed by the time of each fighter's next action, so finding the next
+   fighter takes O(log n) steps instead of checking everybody.
+
+2. WHO GETS HIT? Everyone attacks the weakest enemy still standing. Each
+   side keeps a heap ordered by health. When a fighter's health changes a
+   new entry is pushed and the old one is simply skipped when it comes
+   out ("lazy deletion"), so picking a target is also O(log n).
+
+The actual attacks, defending and potions are the Phase 2 functions
+(player_attack(), monster_attack(), use_health_potion(), try_to_flee()),
+so a party battle follows exactly the same rules as a normal fight.
+
+Players are controlled by a policy (headless, like combat_simulator.py)
+or by the keyboard when no policy is given.
+
+Learning Objectives:
+- Priority queues with heapq
+- Lazy deletion from a heap
+- Simulating events in time order
+- Reusing functions in a bigger program
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import heapq
+import random
+from collections import Counter
+
+from game_io import CONSOLE
+from phase2_combat_system import (
+    display_action_menu,
+    monster_attack,
+    player_attack,
+    player_defend,
+    try_to_flee,
+    use_health_potion,
+)
+
+TURN_LENGTH = 100       # A fighter acts every TURN_LENGTH / speed ticks
+PLAYER_SPEED = 10       # Used when a player has no "speed" key
+MONSTER_SPEED = 10      # Used when a monster has no "speed" key
+
+PLAYERS = 0
+MONSTERS = 1
+
+
+# ============================================================================
+# TARGETING
+# ============================================================================
+
+class WeakestFirst:
+    """
+    Finds the fighter with the least health on one side in O(log n).
+
+    Args:
+        fighters (list): Player or monster dictionaries
+        active (list): active[i] is False once fighter i is out
+    """
+
+    def __init__(self, fighters, active):
+        self.fighters = fighters
+        self.active = active
+        self.heap = [(fighter["health"], i)
+                     for i, fighter in enumerate(fighters)]
+        heapq.heapify(self.heap)
+
+    def changed(self, index):
+        """Note that fighter `index` has new health."""
+        if self.active[index]:
+            heapq.heappush(self.heap,
+                           (self.fighters[index]["health"], index))
+
+    def weakest(self):
+        """
+        The active fighter with the least health.
+
+        Returns:
+            int: Fighter index, or None if nobody is left
+        """
+        heap = self.heap
+        while heap:
+            health, index = heap[0]
+            if (self.active[index]
+                    and self.fighters[index]["health"] == health):
+                return index
+            heapq.heappop(heap)     # Out of date - throw it away
+        return None
+
+
+# ============================================================================
+# THE BATTLE
+# ============================================================================
+
+def label_monsters(monsters):
+    """
+    Copy the monsters, numbering any repeated names ("Goblin 2") so the
+    battle messages make sense.
+
+    Args:
+        monsters (list): Monster dictionaries (or Combatants)
+
+    Returns:
+        list: New monster dictionaries
+    """
+    totals = Counter(monster["name"] for monster in monsters)
+    seen = Counter()
+    labelled = []
+    for monster in monsters:
+        monster = dict(monster)
+        name = monster["name"]
+        if totals[name] > 1:
+            seen[name] += 1
+            monster["name"] = f"{name} {seen[name]}"
+        labelled.append(monster)
+    return labelled
+
+
+class PartyBattle:
+    """
+    A battle between a party of players and a group of monsters.
+
+    Players are changed in place (health, potions, gold, experience).
+    Monsters are copied first, see label_monsters().
+
+    Args:
+        players (list): Player dictionaries
+        monsters (list): Monster dictionaries
+        policy (function, optional): Headless play. Called as
+            policy(player_health, max_health, potions, monster_health)
+            with the player's target, like combat_simulator.py's policies.
+            Without a policy every player's action is asked with io.input().
+        rng (optional): Random number generator
+        io (optional): Input/output object (see game_io.py)
+    """
+
+    def __init__(self, players, monsters, policy=None, rng=random,
+                 io=CONSOLE):
+        if not players or not monsters:
+            raise ValueError("A battle needs at least one player and one "
+                             "monster")
+        self.players = players
+        self.monsters = label_monsters(monsters)
+        self.policy = policy
+        self.rng = rng
+        self.io = io
+
+        self.active = ([player["health"] > 0 for player in players],
+                       [monster["health"] > 0 for monster in self.monsters])
+        self.defending = [False] * len(players)
+        self.fled = 0
+        self.actions = 0
+        self.targets = (WeakestFirst(self.players, self.active[PLAYERS]),
+                        WeakestFirst(self.monsters, self.active[MONSTERS]))
+        self.standing = [sum(self.active[PLAYERS]),
+                         sum(self.active[MONSTERS])]
+
+        # Turn order: (time of next action, tie-breaker, side, index)
+        self.schedule = []
+        for side, fighters, speed in ((PLAYERS, self.players, PLAYER_SPEED),
+                                      (MONSTERS, self.monsters,
+                                       MONSTER_SPEED)):
+            for index, fighter in enumerate(fighters):
+                delay = TURN_LENGTH / fighter.get("speed", speed)
+                self.schedule.append((delay, len(self.schedule), side, index))
+        heapq.heapify(self.schedule)
+
+    def remove(self, side, index):
+        """Take a fighter out of the battle (defeated or fled)."""
+        self.active[side][index] = False
+        self.standing[side] -= 1
+
+    # ----- Turns -----
+
+    def choose(self, player, target):
+        """
+        Get a player's action from the policy or the keyboard.
+
+        Returns:
+            str: "1"-"4"
+        """
+        if self.policy is not None:
+            self.io.print(f"\n--- {player['name']}'s Turn ---")
+            return self.policy(player["health"], player["max_health"],
+                               player.get("health_potions", 0),
+                               target["health"])
+        self.display_battle()
+        display_action_menu(self.io)
+        return self.io.input(f"\n{player['name']}, choose action "
+                             f"(1-4): ").strip()
+
+    def player_turn(self, index):
+        """One player's turn against the weakest monster."""
+        player = self.players[index]
+        io = self.io
+        self.defending[index] = False       # Defending lasts one round
+
+        target_index = self.targets[MONSTERS].weakest()
+        target = self.monsters[target_index]
+        action = self.choose(player, target)
+
+        if action == "1":
+            player_attack(player, target, self.rng, io)
+            if target["health"] <= 0:
+                io.print(f"{target['name']} is defeated!")
+                self.remove(MONSTERS, target_index)
+            else:
+                self.targets[MONSTERS].changed(target_index)
+
+        elif action == "2":
+            self.defending[index] = player_defend(player, io)
+
+        elif action == "3":
+            if use_health_potion(player, io):
+                self.targets[PLAYERS].changed(index)
+            else:
+                io.print("You fumble in your pack but find nothing!")
+
+        elif action == "4":
+            if try_to_flee(player, target, self.rng, io):
+                io.print(f"\n{player['name']} escaped from combat!")
+                self.remove(PLAYERS, index)
+                self.fled += 1
+
+        else:
+            io.print("\nInvalid action! You hesitate and lose your turn!")
+
+    def monster_turn(self, index):
+        """One monster's turn against the weakest player."""
+        monster = self.monsters[index]
+        target_index = self.targets[PLAYERS].weakest()
+        player = self.players[target_index]
+
+        self.io.print(f"\n--- {monster['name']} attacks {player['name']} ---")
+        monster_attack(player, monster, self.defending[target_index],
+                       self.rng, self.io)
+        if player["health"] <= 0:
+            self.io.print(f"{player['name']} has fallen!")
+            self.remove(PLAYERS, target_index)
+        else:
+            self.targets[PLAYERS].changed(target_index)
+
+    # ----- Running -----
+
+    def run(self):
+        """
+        Play until one side is gone.
+        Teaches: A loop driven by a priority queue
+
+        Returns:
+            dict: result ("win", "loss" or "fled"), actions, players
+                standing, monsters defeated, and the gold and experience
+                shared by the surviving players
+        """
+        schedule = self.schedule
+        active = self.active
+        standing = self.standing
+
+        while standing[PLAYERS] and standing[MONSTERS]:
+            time, order, side, index = heapq.heappop(schedule)
+            if not active[side][index]:
+                continue        # Out of the battle - never rescheduled
+
+            self.actions += 1
+            if side == PLAYERS:
+                self.player_turn(index)
+                speed = self.players[index].get("speed", PLAYER_SPEED)
+            else:
+                self.monster_turn(index)
+                speed = self.monsters[index].get("speed", MONSTER_SPEED)
+            heapq.heappush(schedule,
+                           (time + TURN_LENGTH / speed, order, side, index))
+
+        return self.finish()
+
+    def finish(self):
+        """
+        Decide the result and share out the rewards.
+
+        Returns:
+            dict: See run()
+        """
+        survivors = [player for player, present
+                     in zip(self.players, self.active[PLAYERS]) if present]
+        defeated = len(self.monsters) - self.standing[MONSTERS]
+        gold = 0
+        experience = 0
+
+        self.io.print("\n" + "=" * 60)
+        if self.standing[MONSTERS] == 0:
+            result = "win"
+            for monster in self.monsters:
+                gold += self.rng.randint(*monster["gold_reward"])
+                experience += monster["experience"]
+            for player in survivors:
+                player["gold"] = (player.get("gold", 0)
+                                  + gold // len(survivors))
+                player["experience"] = (player.get("experience", 0)
+                                        + experience // len(survivors))
+            self.io.print("🎉 VICTORY! 🎉")
+            self.io.print(f"The party shares {gold} gold and "
+                          f"{experience} experience!")
+        elif self.fled:
+            result = "fled"
+            self.io.print("The party retreats from the battle.")
+        else:
+            result = "loss"
+            self.io.print("💀 THE PARTY HAS BEEN DEFEATED! 💀")
+
+        return {
+            "result": result,
+            "actions": self.actions,
+            "players_standing": len(survivors),
+            "monsters_defeated": defeated,
+            "gold": gold,
+            "experience": experience,
+        }
+
+    def display_battle(self):
+        """Show both sides before asking a player what to do."""
+        io = self.io
+        io.print("\n" + "-" * 60)
+        for side, fighters in ((PLAYERS, self.players),
+                               (MONSTERS, self.monsters)):
+            line = [f"{fighter['name']} {fighter['health']}/"
+                    f"{fighter['max_health']}"
+                    for fighter, present in zip(fighters, self.active[side])
+                    if present]
+            io.print(("Party:    " if side == PLAYERS else "Monsters: ")
+                     + ", ".join(line))
+
+
+def run_battle(players, monsters, policy=None, rng=random, io=CONSOLE):
+    """
+    Play one party battle.
+
+    Args:
+        players (list): Player dictionaries (changed in place)
+        monsters (list): Monster dictionaries (copied)
+        policy (function, optional): Headless play (see PartyBattle)
+        rng (optional): Random number generator
+        io (optional): Input/output object (see game_io.py)
+
+    Returns:
+        dict: See PartyBattle.run()
+    """
+    return PartyBattle(players, monsters, policy, rng, io).run()
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    from combat_simulator import potion_at
+    from game_io import NullIO
+    from phase2_combat_system import (
+        create_goblin,
+        create_orc,
+        create_test_player,
+        create_troll,
+    )
+
+    print("=" * 60)
+    print("PARTY BATTLES")
+    print("=" * 60)
+
+    def make_party(size):
+        party = []
+        for number in range(1, size + 1):
+            player = create_test_player()
+            player["name"] = f"Hero {number}"
+            party.append(player)
+        return party
+
+    # A small battle, shown in full
+    goblin = create_goblin()
+    goblin["speed"] = 14            # Goblins are quick
+    run_battle(make_party(2), [goblin, create_orc()], potion_at(0.4),
+               random.Random(1))
+
+    # Large headless battles
+    for size in (10, 100, 300):
+        monsters = ([create_goblin() for _ in range(size)]
+                    + [create_orc() for _ in range(size // 2)]
+                    + [create_troll() for _ in range(size // 5)])
+        start = time.perf_counter()
+        outcome = run_battle(make_party(size), monsters, potion_at(0.4),
+                             random.Random(2), NullIO())
+        elapsed = time.perf_counter() - start
+        print(f"\n{size} heroes vs {len(monsters)} monsters: "
+              f"{outcome['result']}, {outcome['actions']:,} actions in "
+              f"{elapsed:.2f}s, {outcome['players_standing']} standing")
@@ -20,72 +20,229 @@ CSE 1110 Outcomes Addressed:
 
 import random
 
+from game_io import CONSOLE
+from game_metrics import NO_METRICS
 
-def display_banner():
+
+# Attribute allocation rules (shared with anything that builds characters)
+TOTAL_POINTS = 20
+BASE_HEALTH = 80
+BASE_MANA = 30
+POINTS_TO_HEALTH_RATIO = 5  # Each point gives 5 health
+POINTS_TO_MANA_RATIO = 3    # Each point gives 3 mana
+
+MAX_NAME_LENGTH = 20        # Longest character name allowed
+
+MIN_GOLD = 50               # Starting gold range (inclusive)
+MAX_GOLD = 100
+
+# Class shown on the character sheet
+WARRIOR_HEALTH = 120        # More health than this -> Warrior
+MAGE_MANA = 45              # Otherwise, more mana than this -> Mage
+
+
+def display_banner(io=CONSOLE):
     """
     Display the game title banner.
     Teaches: Functions, print statements, string formatting
+    
+    Args:
+        io (optional): Input/output object (see game_io.py)
     """
-    print("\n" + "=" * 60)
-    print("     WELCOME TO THE REALM OF PYTHON ADVENTURE!")
-    print("=" * 60)
-    print("\n  Your journey begins with character creation...\n")
+    io.print("\n" + "=" * 60)
+    io.print("     WELCOME TO THE REALM OF PYTHON ADVENTURE!")
+    io.print("=" * 60)
+    io.print("\n  Your journey begins with character creation...\n")
+
+
+# ----------------------------------------------------------------------------
+# Shared rules and messages. The functions below only check answers and show
+# text - they never ask anything - so any program that asks its questions in
+# a different way (e.g. game_server.py over the network) can use them too.
+# ----------------------------------------------------------------------------
+
+def validate_name(name):
+    """
+    Check a character name.
+    Teaches: Returning an error message, or None when there is no error
+    
+    Args:
+        name (str): The name the player typed (already stripped)
+    
+    Returns:
+        str: Error message to show, or None if the name is fine
+    """
+    # Validation: Check if name is not empty
+    if len(name) == 0:
+        return "Error: Name cannot be empty. Please try again.\n"
+    
+    # Validation: Check if name is not too long
+    if len(name) > MAX_NAME_LENGTH:
+        return (f"Error: Name is too long (max {MAX_NAME_LENGTH} characters). "
+                f"Please try again.\n")
+    
+    return None
+
+
+def is_yes(answer):
+    """
+    Check whether an answer means yes.
+    
+    Args:
+        answer (str): The player's answer
+    
+    Returns:
+        bool: True for "yes" or "y" (any capitals)
+    """
+    answer = answer.lower()
+    return answer == "yes" or answer == "y"
+
+
+def parse_points(points_str, max_points):
+    """
+    Check an answer to "How many points?".
+    Teaches: Validating input before converting it
+    
+    Args:
+        points_str (str): The player's answer (already stripped)
+        max_points (int): Most points that can be spent
+    
+    Returns:
+        tuple: (points, None) if the answer is good, or (None, error message)
+    """
+    # Validate input is a number
+    if not points_str.isdigit():
+        return None, "Error: Please enter a valid number."
+    
+    points = int(points_str)
+    
+    # Validate range
+    if points < 0 or points > max_points:
+        return None, f"Error: Must be between 0 and {max_points}."
+    
+    return points, None
+
+
+def calculate_attributes(health_points, mana_points):
+    """
+    Turn allocated points into final health and mana.
+    Teaches: Arithmetic operators
+    
+    Args:
+        health_points (int): Points spent on health
+        mana_points (int): Points spent on mana
+    
+    Returns:
+        tuple: (health, mana)
+    """
+    return (BASE_HEALTH + (health_points * POINTS_TO_HEALTH_RATIO),
+            BASE_MANA + (mana_points * POINTS_TO_MANA_RATIO))
+
+
+def display_allocation_rules(io=CONSOLE):
+    """
+    Explain how attribute points work.
+    
+    Args:
+        io (optional): Input/output object (see game_io.py)
+    """
+    io.print("\n" + "-" * 60)
+    io.print("ATTRIBUTE ALLOCATION")
+    io.print("-" * 60)
+    io.print(f"\nYou have {TOTAL_POINTS} points to allocate.")
+    io.print(f"Starting Stats - Health: {BASE_HEALTH}, Mana: {BASE_MANA}")
+    io.print(f"\nEach point in Health adds {POINTS_TO_HEALTH_RATIO} HP")
+    io.print(f"Each point in Mana adds {POINTS_TO_MANA_RATIO} MP")
+    io.print("\nChoose wisely! Warriors need health, mages need mana.\n")
+
+
+def display_allocation_menu(points_remaining, health_points, mana_points,
+                            io=CONSOLE):
+    """
+    Show the points left, the stats so far and the allocation menu.
+    
+    Args:
+        points_remaining (int): Points not spent yet
+        health_points (int): Points spent on health
+        mana_points (int): Points spent on mana
+        io (optional): Input/output object (see game_io.py)
+    """
+    health, mana = calculate_attributes(health_points, mana_points)
+    io.print(f"\nPoints Remaining: {points_remaining}")
+    io.print(f"Current Health: {health}")
+    io.print(f"Current Mana: {mana}")
+    
+    io.print("\nAllocate points to:")
+    io.print(f"1. Health (+{POINTS_TO_HEALTH_RATIO} HP per point)")
+    io.print(f"2. Mana (+{POINTS_TO_MANA_RATIO} MP per point)")
+    io.print("3. Review and Confirm")
+
+
+def display_final_attributes(health, mana, points_remaining, io=CONSOLE):
+    """
+    Show the stats the player is about to confirm.
+    
+    Args:
+        health (int): Final health
+        mana (int): Final mana
+        points_remaining (int): Points left unspent
+        io (optional): Input/output object (see game_io.py)
+    """
+    io.print("\n" + "=" * 40)
+    io.print("FINAL ATTRIBUTES")
+    io.print("=" * 40)
+    io.print(f"Health: {health} HP")
+    io.print(f"Mana: {mana} MP")
+    io.print(f"Unallocated Points: {points_remaining}")
+
 
+# ----------------------------------------------------------------------------
+# Asking the player
+# ----------------------------------------------------------------------------
 
-def get_character_name():
+def get_character_name(io=CONSOLE):
     """
     Get and validate the character's name from the player.
     Teaches: Input, string variables, while loops, conditionals
     
+    Args:
+        io (optional): Input/output object (see game_io.py)
+    
     Returns:
         str: The validated character name
     """
     while True:  # Loop until valid input
-        name = input("Enter your hero's name: ").strip()
-        
-        # Validation: Check if name is not empty
-        if len(name) == 0:
-            print("Error: Name cannot be empty. Please try again.\n")
-            continue
+        name = io.input("Enter your hero's name: ").strip()
         
-        # Validation: Check if name is not too long
-        if len(name) > 20:
-            print("Error: Name is too long (max 20 characters). Please try again.\n")
+        error = validate_name(name)
+        if error is not None:
+            io.print(error)
             continue
         
         # Confirm name with player
-        print(f"\nYou have chosen the name: {name}")
-        confirm = input("Is this correct? (yes/no): ").lower()
+        io.print(f"\nYou have chosen the name: {name}")
+        confirm = io.input("Is this correct? (yes/no): ")
         
-        if confirm == "yes" or confirm == "y":
+        if is_yes(confirm):
             return name
         else:
-            print("\nLet's try again.\n")
+            io.print("\nLet's try again.\n")
 
 
-def allocate_attribute_points():
+def allocate_attribute_points(io=CONSOLE):
     """
     Allow player to allocate points to health and mana.
     Teaches: Variables, arithmetic operators, while loops, conditionals
     
+    Args:
+        io (optional): Input/output object (see game_io.py)
+    
     Returns:
         tuple: (health, mana) values chosen by player
     """
-    # Constants
-    TOTAL_POINTS = 20
-    BASE_HEALTH = 80
-    BASE_MANA = 30
-    POINTS_TO_HEALTH_RATIO = 5  # Each point gives 5 health
-    POINTS_TO_MANA_RATIO = 3    # Each point gives 3 mana
-    
-    print("\n" + "-" * 60)
-    print("ATTRIBUTE ALLOCATION")
-    print("-" * 60)
-    print(f"\nYou have {TOTAL_POINTS} points to allocate.")
-    print(f"Starting Stats - Health: {BASE_HEALTH}, Mana: {BASE_MANA}")
-    print(f"\nEach point in Health adds {POINTS_TO_HEALTH_RATIO} HP")
-    print(f"Each point in Mana adds {POINTS_TO_MANA_RATIO} MP")
-    print("\nChoose wisely! Warriors need health, mages need mana.\n")
+    # The constants (TOTAL_POINTS, BASE_HEALTH, ...) are defined at the
+    # top of this module
+    display_allocation_rules(io)
     
     # Initialize variables
     points_remaining = TOTAL_POINTS
@@ -94,129 +251,109 @@ def allocate_attribute_points():
     
     # Allocation loop
     while points_remaining > 0:
-        # Display current status
-        print(f"\nPoints Remaining: {points_remaining}")
-        print(f"Current Health: {BASE_HEALTH + (health_points * POINTS_TO_HEALTH_RATIO)}")
-        print(f"Current Mana: {BASE_MANA + (mana_points * POINTS_TO_MANA_RATIO)}")
-        
-        # Get player choice
-        print("\nAllocate points to:")
-        print("1. Health (+5 HP per point)")
-        print("2. Mana (+3 MP per point)")
-        print("3. Review and Confirm")
+        # Display current status and get player choice
+        display_allocation_menu(points_remaining, health_points, mana_points,
+                                io)
+        choice = io.input("\nEnter choice (1-3): ").strip()
         
-        choice = input("\nEnter choice (1-3): ").strip()
-        
-        if choice == "1":
-            # Allocate to health
+        if choice == "1" or choice == "2":
+            # Allocate to health or mana
+            stat = "Health" if choice == "1" else "Mana"
             max_points = points_remaining
-            print(f"\nYou can allocate up to {max_points} points to Health.")
+            io.print(f"\nYou can allocate up to {max_points} points to {stat}.")
             
             # Get number of points to allocate
-            points_str = input(f"How many points? (0-{max_points}): ").strip()
-            
-            # Validate input is a number
-            if not points_str.isdigit():
-                print("Error: Please enter a valid number.")
-                continue
-            
-            points = int(points_str)
-            
-            # Validate range
-            if points < 0 or points > max_points:
-                print(f"Error: Must be between 0 and {max_points}.")
+            points_str = io.input(f"How many points? (0-{max_points}): ").strip()
+            points, error = parse_points(points_str, max_points)
+            if error is not None:
+                io.print(error)
                 continue
             
             # Allocate points
-            health_points += points
-            points_remaining -= points
-            print(f"\nAllocated {points} points to Health!")
-        
-        elif choice == "2":
-            # Allocate to mana
-            max_points = points_remaining
-            print(f"\nYou can allocate up to {max_points} points to Mana.")
-            
-            # Get number of points to allocate
-            points_str = input(f"How many points? (0-{max_points}): ").strip()
-            
-            # Validate input is a number
-            if not points_str.isdigit():
-                print("Error: Please enter a valid number.")
-                continue
-            
-            points = int(points_str)
-            
-            # Validate range
-            if points < 0 or points > max_points:
-                print(f"Error: Must be between 0 and {max_points}.")
-                continue
-            
-            # Allocate points
-            mana_points += points
+            if choice == "1":
+                health_points += points
+            else:
+                mana_points += points
             points_remaining -= points
-            print(f"\nAllocated {points} points to Mana!")
+            io.print(f"\nAllocated {points} points to {stat}!")
         
         elif choice == "3":
             # Review and confirm
             if points_remaining > 0:
-                print(f"\nWarning: You still have {points_remaining} unallocated points!")
-                confirm = input("Finish anyway? (yes/no): ").lower()
-                if confirm != "yes" and confirm != "y":
+                io.print(f"\nWarning: You still have {points_remaining} unallocated points!")
+                confirm = io.input("Finish anyway? (yes/no): ")
+                if not is_yes(confirm):
                     continue
             
-            # Calculate final stats
-            final_health = BASE_HEALTH + (health_points * POINTS_TO_HEALTH_RATIO)
-            final_mana = BASE_MANA + (mana_points * POINTS_TO_MANA_RATIO)
-            
-            # Display final stats
-            print("\n" + "=" * 40)
-            print("FINAL ATTRIBUTES")
-            print("=" * 40)
-            print(f"Health: {final_health} HP")
-            print(f"Mana: {final_mana} MP")
-            print(f"Unallocated Points: {points_remaining}")
+            # Calculate and display final stats
+            final_health, final_mana = calculate_attributes(health_points,
+                                                            mana_points)
+            display_final_attributes(final_health, final_mana,
+                                     points_remaining, io)
             
-            confirm = input("\nConfirm these stats? (yes/no): ").lower()
-            if confirm == "yes" or confirm == "y":
+            confirm = io.input("\nConfirm these stats? (yes/no): ")
+            if is_yes(confirm):
                 return (final_health, final_mana)
             else:
                 # Reset and start over
-                print("\nResetting allocation...\n")
+                io.print("\nResetting allocation...\n")
                 points_remaining = TOTAL_POINTS
                 health_points = 0
                 mana_points = 0
         
         else:
-            print("\nInvalid choice. Please enter 1, 2, or 3.")
+            io.print("\nInvalid choice. Please enter 1, 2, or 3.")
     
     # If loop exits naturally (all points allocated)
-    final_health = BASE_HEALTH + (health_points * POINTS_TO_HEALTH_RATIO)
-    final_mana = BASE_MANA + (mana_points * POINTS_TO_MANA_RATIO)
-    return (final_health, final_mana)
+    return calculate_attributes(health_points, mana_points)
 
 
-def generate_starting_gold():
+def generate_starting_gold(rng=random, io=CONSOLE):
     """
     Generate a random amount of starting gold.
     Teaches: Random module, random number generation
     
+    Args:
+        rng (optional): Random number generator. Defaults to the random
+            module; pass random.Random(seed) for a repeatable result.
+        io (optional): Input/output object (see game_io.py)
+    
     Returns:
-        int: Random gold amount between 50 and 100
+        int: Random gold amount between MIN_GOLD and MAX_GOLD
     """
     # Generate random gold between 50 and 100 (inclusive)
-    gold = random.randint(50, 100)
+    gold = rng.randint(MIN_GOLD, MAX_GOLD)
     
-    print("\n" + "-" * 60)
-    print("STARTING WEALTH")
-    print("-" * 60)
-    print("\nYou search your pockets and count your gold...")
-    print(f"You start your adventure with {gold} gold pieces!")
+    io.print("\n" + "-" * 60)
+    io.print("STARTING WEALTH")
+    io.print("-" * 60)
+    io.print("\nYou search your pockets and count your gold...")
+    io.print(f"You start your adventure with {gold} gold pieces!")
     
     return gold
 
 
-def display_character_summary(name, health, mana, gold):
+def get_character_class(health, mana):
+    """
+    Work out the class shown on the character sheet.
+    Teaches: Chained conditionals
+    
+    Args:
+        health (int): Character's health points
+        mana (int): Character's mana points
+    
+    Returns:
+        str: "Warrior", "Mage" or "Balanced"
+    """
+    if health > WARRIOR_HEALTH:
+        return "Warrior"
+    elif mana > MAGE_MANA:
+        return "Mage"
+    else:
+        return "Balanced"
+
+
+def display_character_summary(name, health, mana, gold, io=CONSOLE):
     """
     Display the complete character sheet.
     Teaches: Function parameters, string formatting, print statements
@@ -226,45 +363,58 @@ def display_character_summary(name, health, mana, gold):
         health (int): Character's health points
         mana (int): Character's mana points
         gold (int): Character's gold amount
+        io (optional): Input/output object (see game_io.py)
     """
-    print("\n" + "=" * 60)
-    print("CHARACTER CREATION COMPLETE!")
-    print("=" * 60)
-    print(f"""
+    io.print("\n" + "=" * 60)
+    io.print("CHARACTER CREATION COMPLETE!")
+    io.print("=" * 60)
+    io.print(f"""
     Name:   {name}
     Health: {health} HP
     Mana:   {mana} MP
     Gold:   {gold} gold
     
-    Class:  {"Warrior" if health > 120 else "Mage" if mana > 45 else "Balanced"}
+    Class:  {get_character_class(health, mana)}
     """)
-    print("=" * 60)
-    print("\nYour adventure is about to begin...")
-    print("=" * 60)
+    io.print("=" * 60)
+    io.print("\nYour adventure is about to begin...")
+    io.print("=" * 60)
 
 
-def create_character():
+def create_character(rng=random, io=CONSOLE, metrics=NO_METRICS):
     """
     Main function to orchestrate the character creation process.
     Teaches: Function calls, return values, variable assignment
     
+    Args:
+        rng (optional): Random number generator for starting gold
+        io (optional): Input/output object (see game_io.py)
+        metrics (optional): Times each step (see game_metrics.py)
+    
     Returns:
         dict: Character data dictionary
     """
     # Display welcome banner
-    display_banner()
+    display_banner(io)
     
     # Step 1: Get character name
-    name = get_character_name()
+    started = metrics.clock()
+    name = get_character_name(io)
+    started = metrics.observe("creation_step_seconds", started, step="name")
     
     # Step 2: Allocate attribute points
-    health, mana = allocate_attribute_points()
+    health, mana = allocate_attribute_points(io)
+    started = metrics.observe("creation_step_seconds", started,
+                              step="attributes")
     
     # Step 3: Generate starting gold
-    gold = generate_starting_gold()
+    gold = generate_starting_gold(rng, io)
+    started = metrics.observe("creation_step_seconds", started, step="gold")
     
     # Step 4: Display character summary
-    display_character_summary(name, health, mana, gold)
+    display_character_summary(name, health, mana, gold, io)
+    metrics.observe("creation_step_seconds", started, step="summary")
+    metrics.count("characters_created_total")
     
     # Create and return character dictionary
     character = {
@@ -276,6 +426,9 @@ def create_character():
         "gold": gold
     }
     
+    # Write out the summary now: a BufferedIO would otherwise keep it
+    # until the next question, or lose it if there is none
+    io.flush()
     return character
 
 
@@ -326,8 +479,11 @@ Exercise: Create their own banner with different symbols and text
 Week 2: Input and String Operations
 ------------------------------------
 Concepts: input(), string methods, string concatenation
-Activity: Walk through get_character_name() line by line
-Exercise: Add additional name validation (e.g., no numbers in name)
+Activity: Walk through get_character_name() line by line: it asks, then
+          hands the answer to validate_name()
+Exercise: Add additional name validation to validate_name() (e.g., no
+          numbers in name) - game_server.py uses it too, so the rule
+          works over the network without changing the server
 
 Week 3: Functions and Return Values
 ------------------------------------
@@ -338,13 +494,15 @@ Exercise: Create a function that generates a random character age (18-30)
 Week 4: Conditionals and Comparison
 ------------------------------------
 Concepts: if/elif/else, comparison operators, boolean logic
-Activity: Examine validation logic in get_character_name()
+Activity: Examine the validation logic in validate_name() and
+          parse_points(), which return an error message or None
 Exercise: Add a class suggestion based on name length (short=Warrior, long=Mage)
 
 Week 5: While Loops and Iteration
 ----------------------------------
 Concepts: while loops, loop control, break/continue
 Activity: Step through allocate_attribute_points() loop iteration by iteration
+          (parse_points() checks each answer, is_yes() each yes/no)
 Exercise: Add a "help" option that explains the allocation system
 
 Week 6: Arithmetic and Variables
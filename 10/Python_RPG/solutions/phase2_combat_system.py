@@ -19,12 +19,38 @@ CSE 1120 Outcomes Addressed:
 2.1-2.9: Translation to code with control structures
 """
 
+import itertools
 import random
 
+import damage_tables
+from game_io import CONSOLE
+from game_metrics import NO_METRICS
+from monster_registry import DEFAULT_REGISTRY
+
+
+# ============================================================================
+# COMBAT CONSTANTS
+# ============================================================================
+
+# Player weapon damage is BASE_DAMAGE plus or minus DAMAGE_VARIANCE
+BASE_DAMAGE = 10
+DAMAGE_VARIANCE = 3
+
+# Critical hits multiply damage
+CRITICAL_CHANCE = 0.20      # 20% chance
+CRITICAL_MULTIPLIER = 2     # Double damage
+
+# Other action constants
+FLEE_CHANCE = 0.30          # 30% base chance to flee
+POTION_HEAL_AMOUNT = 30     # HP restored by one health potion
+
 
 # ============================================================================
 # MONSTER CREATION FUNCTIONS
 # ============================================================================
+# Monster stats and encounter odds live in ONE place: monsters.json (see
+# monster_registry.py). The functions and lists below are built from it,
+# so a monster added to the file shows up in every part of the game.
 
 def create_goblin():
     """
@@ -34,15 +60,7 @@ def create_goblin():
     Returns:
         dict: Monster data with stats
     """
-    return {
-        "name": "Goblin",
-        "max_health": 30,
-        "health": 30,
-        "min_damage": 3,
-        "max_damage": 8,
-        "gold_reward": (10, 25),
-        "experience": 15
-    }
+    return DEFAULT_REGISTRY.create("Goblin")
 
 
 def create_orc():
@@ -53,15 +71,7 @@ def create_orc():
     Returns:
         dict: Monster data with stats
     """
-    return {
-        "name": "Orc",
-        "max_health": 50,
-        "health": 50,
-        "min_damage": 5,
-        "max_damage": 12,
-        "gold_reward": (20, 40),
-        "experience": 30
-    }
+    return DEFAULT_REGISTRY.create("Orc")
 
 
 def create_troll():
@@ -72,41 +82,63 @@ def create_troll():
     Returns:
         dict: Monster data with stats
     """
-    return {
-        "name": "Troll",
-        "max_health": 80,
-        "health": 80,
-        "min_damage": 8,
-        "max_damage": 15,
-        "gold_reward": (40, 60),
-        "experience": 50
-    }
+    return DEFAULT_REGISTRY.create("Troll")
+
 
+def monster_creator(name):
+    """
+    Build a create_* function for any monster in the registry.
+    Teaches: Functions that return functions
+
+    Args:
+        name (str): Monster name from monsters.json
 
-def create_random_monster():
+    Returns:
+        function: Called with no arguments, returns a fresh monster
+    """
+    def create():
+        return DEFAULT_REGISTRY.create(name)
+
+    create.__name__ = create.__qualname__ = f"create_{name.lower()}"
+    return create
+
+
+# Monster types and their encounter odds, in monsters.json order. These
+# lists are built once when the module loads, not again for every
+# encounter.
+MONSTER_TYPES = [monster_creator(template.name)
+                 for template in DEFAULT_REGISTRY.templates]
+
+# Weighted probability - Goblins more common than Trolls
+MONSTER_WEIGHTS = list(DEFAULT_REGISTRY.weights)
+
+# Running totals of the weights, so random.choices() doesn't have to add
+# them up on every call
+MONSTER_CUM_WEIGHTS = list(itertools.accumulate(MONSTER_WEIGHTS))
+
+
+def create_random_monster(rng=random):
     """
     Create a random monster encounter.
     Teaches: Random selection, function calls
     
+    Args:
+        rng (optional): Random number generator (see game_random.py).
+            Defaults to the random module.
+    
     Returns:
         dict: Randomly selected monster
     """
-    monster_types = [create_goblin, create_orc, create_troll]
-    
-    # Weighted probability - Goblins more common than Trolls
-    weights = [0.5, 0.35, 0.15]  # 50% Goblin, 35% Orc, 15% Troll
-    
-    # Choose random monster based on weights
-    monster_creator = random.choices(monster_types, weights=weights)[0]
-    
-    return monster_creator()
+    # Choose random monster based on weights (the same pick as
+    # monster_registry.spawn_random())
+    return DEFAULT_REGISTRY.spawn(rng).to_dict()
 
 
 # ============================================================================
 # COMBAT DISPLAY FUNCTIONS
 # ============================================================================
 
-def display_combat_header(player, monster):
+def display_combat_header(player, monster, io=CONSOLE):
     """
     Display the combat header with combatant names.
     Teaches: String formatting, visual presentation
@@ -114,13 +146,14 @@ def display_combat_header(player, monster):
     Args:
         player (dict): Player character data
         monster (dict): Monster data
+        io (optional): Input/output object (see game_io.py)
     """
-    print("\n" + "=" * 60)
-    print(f"COMBAT: {player['name']} vs {monster['name']}")
-    print("=" * 60)
+    io.print("\n" + "=" * 60)
+    io.print(f"COMBAT: {player['name']} vs {monster['name']}")
+    io.print("=" * 60)
 
 
-def display_combat_status(player, monster):
+def display_combat_status(player, monster, io=CONSOLE):
     """
     Display current health status for both combatants.
     Teaches: Multiple variable display, formatting
@@ -128,288 +161,489 @@ def display_combat_status(player, monster):
     Args:
         player (dict): Player character data
         monster (dict): Monster data
+        io (optional): Input/output object (see game_io.py)
     """
-    print(f"\n{player['name']} HP: {player['health']}/{player['max_health']} " +
-          f"| MP: {player['mana']}/{player['max_mana']}")
-    print(f"{monster['name']} HP: {monster['health']}/{monster['max_health']}")
+    io.print(f"\n{player['name']} HP: {player['health']}/{player['max_health']} " +
+             f"| MP: {player['mana']}/{player['max_mana']}")
+    io.print(f"{monster['name']} HP: {monster['health']}/{monster['max_health']}")
 
 
-def display_action_menu():
+def display_action_menu(io=CONSOLE):
     """
     Display the combat action menu.
     Teaches: Menu creation, user interface design
+    
+    Args:
+        io (optional): Input/output object (see game_io.py)
     """
-    print("\n--- Your Turn ---")
-    print("1. Attack")
-    print("2. Defend")
-    print("3. Use Potion")
-    print("4. Try to Flee")
+    io.print("\n--- Your Turn ---")
+    io.print("1. Attack")
+    io.print("2. Defend")
+    io.print("3. Use Potion")
+    io.print("4. Try to Flee")
 
 
 # ============================================================================
-# COMBAT ACTION FUNCTIONS
+# DICE ROLL FUNCTIONS
 # ============================================================================
+# These functions only roll the dice - they never print and never change
+# the player or monster. The action functions below use them, and so does
+# the headless simulator in combat_simulator.py.
+#
+# Each roll is one lookup in a table of every possible result and its
+# chance (see damage_tables.py). The tables are worked out once from the
+# constants above, so a roll follows exactly the rules described in each
+# function.
+#
+# Every function that rolls dice takes an optional `rng` argument. Anything
+# with randint(), random() and choices() methods works: the random module
+# itself (the default), a random.Random(seed) for a repeatable game, or a
+# generator from game_random.py.
+
+def roll_player_damage(rng=random):
+    """
+    Roll the damage for one player attack.
+    Teaches: Returning a tuple, separating calculation from display
+    
+    Args:
+        rng (optional): Random number generator
+        
+    Returns:
+        tuple: (damage, was_critical)
+    """
+    # Damage is BASE_DAMAGE ±DAMAGE_VARIANCE (every value equally
+    # likely), and a CRITICAL_CHANCE (20%) critical hit doubles it
+    return damage_tables.player_attack_table().sample(rng)
+
 
-def player_attack(player, monster):
+def roll_monster_damage(monster, player_defending=False, rng=random):
     """
-    Execute player's attack action.
-    Teaches: Damage calculation, random ranges, variable updates
+    Roll the damage for one monster attack.
+    Teaches: Random ranges, integer division
     
     Args:
-        player (dict): Player character data
         monster (dict): Monster data
+        player_defending (bool): Whether player is defending
+        rng (optional): Random number generator
         
     Returns:
-        int: Damage dealt
+        int: Damage the attack will deal
     """
-    # Base damage from weapon (would come from equipped weapon)
-    base_damage = 10
-    
-    # Add randomness to damage (±3 damage variance)
-    damage = random.randint(base_damage - 3, base_damage + 3)
-    
-    # Critical hit chance (20% for double damage)
-    if random.random() < 0.20:  # 20% chance
-        damage *= 2
-        print(f"\n💥 CRITICAL HIT! 💥")
-    
-    # Apply damage to monster
-    monster["health"] -= damage
+    return roll_damage_range(monster["min_damage"], monster["max_damage"],
+                             player_defending, rng)
+
+
+def roll_damage_range(min_damage, max_damage, player_defending=False,
+                      rng=random):
+    """
+    Roll a hit between min_damage and max_damage (halved when defending).
+    roll_monster_damage() uses this; fast loops that already have the two
+    numbers in variables can call it directly.
     
-    print(f"You attack {monster['name']} for {damage} damage!")
+    Args:
+        min_damage (int): Smallest possible hit
+        max_damage (int): Largest possible hit
+        player_defending (bool): Whether player is defending
+        rng (optional): Random number generator
+        
+    Returns:
+        int: Damage the attack will deal
+    """
+    # Any damage from min_damage to max_damage is equally likely, and
+    # defending halves it (rounding down)
+    table = damage_tables.monster_damage_table(min_damage, max_damage,
+                                               bool(player_defending))
+    return table.sample(rng)
+
+
+def roll_flee(rng=random):
+    """
+    Roll to see if a flee attempt succeeds.
+    Teaches: Probability with random.random()
     
-    return damage
+    Args:
+        rng (optional): Random number generator
+        
+    Returns:
+        bool: True if the flee attempt succeeds
+    """
+    return rng.random() < FLEE_CHANCE
 
 
-def player_defend(player):
+def potion_heal_amount(player):
     """
-    Execute player's defend action.
-    Teaches: State modification, temporary effects
+    Work out how much HP a potion would restore right now.
+    Teaches: min() to cap a value
     
     Args:
         player (dict): Player character data
         
     Returns:
-        bool: True if defending this turn
+        int: HP restored (never above max health)
     """
-    print("\nYou brace yourself for the next attack!")
-    print("Incoming damage will be reduced by 50%.")
+    return min(POTION_HEAL_AMOUNT, player["max_health"] - player["health"])
+
+
+# ============================================================================
+# COMBAT RULES
+# ============================================================================
+# One function per action. Each one rolls the dice, changes the player or
+# monster, and returns an EVENT: a dictionary saying what happened. They
+# never print - the message functions below do that - so every way of
+# running a fight (combat_loop(), combat_state.py, party_battle.py) uses
+# the same rules.
+
+def resolve_attack(monster, rng=random):
+    """
+    The player attacks the monster.
+    Teaches: Returning a dictionary that describes a result
     
-    return True  # Player is now defending
+    Args:
+        monster (dict): Monster data
+        rng (optional): Random number generator
+        
+    Returns:
+        dict: {"event": "attack", "damage": ..., "critical": ...}
+    """
+    # Roll weapon damage (base damage ±3, 20% chance of a critical hit)
+    damage, was_critical = roll_player_damage(rng)
+    
+    # Apply damage to monster
+    monster["health"] -= damage
+    
+    return {"event": "attack", "damage": damage, "critical": was_critical}
 
 
-def use_health_potion(player):
+def resolve_defend():
     """
-    Use a health potion to restore HP.
+    The player defends: the next monster attack is halved.
+    
+    Returns:
+        dict: {"event": "defend"}
+    """
+    return {"event": "defend"}
+
+
+def resolve_potion(player):
+    """
+    The player drinks a health potion, if there is one.
     Teaches: Inventory management, min/max calculations
     
     Args:
         player (dict): Player character data
         
     Returns:
-        bool: True if potion was used successfully
+        dict: {"event": "potion", "healing": ..., "remaining": ...}, or
+            {"event": "no_potion"} if the pack is empty
     """
     # Check if player has potions
     if player.get("health_potions", 0) <= 0:
-        print("\nYou don't have any health potions!")
-        return False
+        return {"event": "no_potion"}
     
     # Calculate healing amount (don't exceed max health)
-    heal_amount = 30
-    actual_healing = min(heal_amount, player["max_health"] - player["health"])
+    healing = potion_heal_amount(player)
     
     # Apply healing
-    player["health"] += actual_healing
+    player["health"] += healing
     player["health_potions"] -= 1
     
-    print(f"\nYou drink a health potion and restore {actual_healing} HP!")
-    print(f"Health potions remaining: {player['health_potions']}")
+    return {"event": "potion", "healing": healing,
+            "remaining": player["health_potions"]}
+
+
+def resolve_flee(rng=random):
+    """
+    The player tries to run away.
+    Teaches: Probability, boolean results
     
-    return True
+    Args:
+        rng (optional): Random number generator
+        
+    Returns:
+        dict: {"event": "flee", "escaped": True or False}
+    """
+    # Higher level monsters are harder to flee from
+    # (This could be enhanced with monster "level" attribute)
+    return {"event": "flee", "escaped": roll_flee(rng)}
 
 
-def try_to_flee(player, monster):
+def resolve_monster_attack(player, monster, player_defending=False,
+                           rng=random):
     """
-    Attempt to flee from combat.
-    Teaches: Probability, boolean returns, risk/reward
+    The monster attacks the player.
+    Teaches: Similar to player attack, conditional damage reduction
     
     Args:
         player (dict): Player character data
         monster (dict): Monster data
+        player_defending (bool): Whether player is defending
+        rng (optional): Random number generator
         
     Returns:
-        bool: True if successfully fled, False otherwise
+        dict: {"event": "monster_attack", "damage": ..., "defended": ...}
     """
-    flee_chance = 0.30  # 30% base chance to flee
+    # Calculate damage in monster's range (halved if player is defending)
+    damage = roll_monster_damage(monster, player_defending, rng)
     
-    # Higher level monsters are harder to flee from
-    # (This could be enhanced with monster "level" attribute)
+    # Apply damage to player
+    player["health"] -= damage
     
-    if random.random() < flee_chance:
-        print(f"\nYou successfully escaped from the {monster['name']}!")
-        return True
+    return {"event": "monster_attack", "damage": damage,
+            "defended": player_defending}
+
+
+# ============================================================================
+# COMBAT MESSAGES
+# ============================================================================
+# Each function prints the message for one event from the rules above.
+
+def display_attack(monster, event, io=CONSOLE):
+    """
+    Show a player attack.
+    
+    Args:
+        monster (dict): Monster data
+        event (dict): Event from resolve_attack()
+        io (optional): Input/output object (see game_io.py)
+    """
+    if event["critical"]:
+        io.print(f"\n💥 CRITICAL HIT! 💥")
+    io.print(f"You attack {monster['name']} for {event['damage']} damage!")
+
+
+def display_defend(io=CONSOLE):
+    """
+    Show the player defending.
+    
+    Args:
+        io (optional): Input/output object (see game_io.py)
+    """
+    io.print("\nYou brace yourself for the next attack!")
+    io.print("Incoming damage will be reduced by 50%.")
+
+
+def display_potion(event, io=CONSOLE):
+    """
+    Show a potion being drunk (or the pack being empty).
+    
+    Args:
+        event (dict): Event from resolve_potion()
+        io (optional): Input/output object (see game_io.py)
+    """
+    if event["event"] == "no_potion":
+        io.print("\nYou don't have any health potions!")
+        return
+    io.print(f"\nYou drink a health potion and restore {event['healing']} HP!")
+    io.print(f"Health potions remaining: {event['remaining']}")
+
+
+def display_flee(monster, event, io=CONSOLE):
+    """
+    Show a flee attempt.
+    
+    Args:
+        monster (dict): Monster data
+        event (dict): Event from resolve_flee()
+        io (optional): Input/output object (see game_io.py)
+    """
+    if event["escaped"]:
+        io.print(f"\nYou successfully escaped from the {monster['name']}!")
     else:
-        print(f"\nYou couldn't escape! The {monster['name']} blocks your path!")
-        return False
+        io.print(f"\nYou couldn't escape! The {monster['name']} blocks your path!")
 
 
-def monster_attack(player, monster, player_defending=False):
+def display_monster_attack(monster, event, io=CONSOLE):
     """
-    Execute monster's attack action.
-    Teaches: Similar to player attack, conditional damage reduction
+    Show a monster attack.
+    
+    Args:
+        monster (dict): Monster data
+        event (dict): Event from resolve_monster_attack()
+        io (optional): Input/output object (see game_io.py)
+    """
+    if event["defended"]:
+        io.print(f"\nYour defense absorbs some of the attack!")
+    io.print(f"{monster['name']} attacks for {event['damage']} damage!")
+
+
+# ============================================================================
+# COMBAT ACTION FUNCTIONS
+# ============================================================================
+# A rule followed by its message, for code that plays one action at a
+# time (party_battle.py).
+
+def player_attack(player, monster, rng=random, io=CONSOLE):
+    """
+    Execute player's attack action.
+    Teaches: Damage calculation, random ranges, variable updates
     
     Args:
         player (dict): Player character data
         monster (dict): Monster data
-        player_defending (bool): Whether player is defending
+        rng (optional): Random number generator
+        io (optional): Input/output object (see game_io.py)
         
     Returns:
-        int: Damage dealt to player
+        int: Damage dealt
     """
-    # Calculate damage in monster's range
-    damage = random.randint(monster["min_damage"], monster["max_damage"])
+    event = resolve_attack(monster, rng)
+    display_attack(monster, event, io)
+    return event["damage"]
+
+
+def player_defend(player, io=CONSOLE):
+    """
+    Execute player's defend action.
+    Teaches: State modification, temporary effects
     
-    # Apply defense reduction if player is defending
-    if player_defending:
-        damage = damage // 2  # Reduce damage by 50%
-        print(f"\nYour defense absorbs some of the attack!")
+    Args:
+        player (dict): Player character data
+        io (optional): Input/output object (see game_io.py)
+        
+    Returns:
+        bool: True if defending this turn
+    """
+    resolve_defend()
+    display_defend(io)
+    return True  # Player is now defending
+
+
+def use_health_potion(player, io=CONSOLE):
+    """
+    Use a health potion to restore HP.
     
-    # Apply damage to player
-    player["health"] -= damage
+    Args:
+        player (dict): Player character data
+        io (optional): Input/output object (see game_io.py)
+        
+    Returns:
+        bool: True if potion was used successfully
+    """
+    event = resolve_potion(player)
+    display_potion(event, io)
+    return event["event"] == "potion"
+
+
+def try_to_flee(player, monster, rng=random, io=CONSOLE):
+    """
+    Attempt to flee from combat.
+    Teaches: Probability, boolean returns, risk/reward
     
-    print(f"{monster['name']} attacks for {damage} damage!")
+    Args:
+        player (dict): Player character data
+        monster (dict): Monster data
+        rng (optional): Random number generator
+        io (optional): Input/output object (see game_io.py)
+        
+    Returns:
+        bool: True if successfully fled, False otherwise
+    """
+    event = resolve_flee(rng)
+    display_flee(monster, event, io)
+    return event["escaped"]
+
+
+def monster_attack(player, monster, player_defending=False, rng=random,
+                   io=CONSOLE):
+    """
+    Execute monster's attack action.
     
-    return damage
+    Args:
+        player (dict): Player character data
+        monster (dict): Monster data
+        player_defending (bool): Whether player is defending
+        rng (optional): Random number generator
+        io (optional): Input/output object (see game_io.py)
+        
+    Returns:
+        int: Damage dealt to player
+    """
+    event = resolve_monster_attack(player, monster, player_defending, rng)
+    display_monster_attack(monster, event, io)
+    return event["damage"]
 
 
 # ============================================================================
 # MAIN COMBAT LOOP
 # ============================================================================
 
-def combat_loop(player, monster=None):
+def combat_loop(player, monster=None, choose_action=None, rng=random,
+                io=CONSOLE, metrics=NO_METRICS):
     """
     Main combat loop - handles turn-based combat until victory or defeat.
     Teaches: While loops, complex conditionals, state management, game loop
     
+    A turn is played by CombatMachine.step() (see combat_state.py) with
+    the rule functions above, and shown by display_events() with the
+    message functions. This loop only shows the status, asks for an
+    action and passes it on.
+    
     Args:
         player (dict): Player character data
         monster (dict, optional): Monster to fight. Creates random if None.
+        choose_action (function, optional): Auto-play. Called as
+            choose_action(player, monster) and returns "1"-"4" instead of
+            asking the player with input().
+        rng (optional): Random number generator for every roll in the fight
+        io (optional): Input/output object (see game_io.py)
+        metrics (optional): Times each phase of a turn (see game_metrics.py)
         
     Returns:
         bool: True if player won, False if player lost or fled
     """
+    # combat_state.py imports the dice functions from this module, so it
+    # is imported here (when the first fight starts) rather than at the top
+    from combat_state import WIN, CombatMachine, display_events
+    
     # Create random monster if none provided
     if monster is None:
-        monster = create_random_monster()
+        monster = create_random_monster(rng)
     
     # Display combat start
-    display_combat_header(player, monster)
-    print(f"\nA wild {monster['name']} appears!")
-    
-    # Initialize combat variables
-    total_damage_dealt = 0
-    total_damage_taken = 0
-    turns = 0
-    player_defending = False
-    
-    # Main combat loop - continues until someone reaches 0 HP or player flees
-    while monster["health"] > 0 and player["health"] > 0:
-        turns += 1
-        
-        # Display current status
-        display_combat_status(player, monster)
-        
-        # Reset defending status at start of turn
-        defending_this_turn = False
-        
-        # ===== PLAYER TURN =====
-        display_action_menu()
-        
-        # Get player action
-        action = input("\nChoose action (1-4): ").strip()
-        
-        # Process player action
-        if action == "1":
-            # Attack
-            damage = player_attack(player, monster)
-            total_damage_dealt += damage
-            
-        elif action == "2":
-            # Defend
-            defending_this_turn = player_defend(player)
-            
-        elif action == "3":
-            # Use potion
-            potion_used = use_health_potion(player)
-            if not potion_used:
-                # If no potion available, turn is wasted
-                print("You fumble in your pack but find nothing!")
-            
-        elif action == "4":
-            # Try to flee
-            if try_to_flee(player, monster):
-                print("\nYou escaped from combat!")
-                return False  # Combat ended, player fled
-            # If flee fails, monster gets a free attack (handled below)
-            
-        else:
-            print("\nInvalid action! You hesitate and lose your turn!")
-        
-        # Check if monster is defeated
-        if monster["health"] <= 0:
-            break  # Exit loop, player won
-        
-        # ===== MONSTER TURN =====
-        print(f"\n--- {monster['name']}'s Turn ---")
-        
-        # Monster attacks
-        damage_taken = monster_attack(player, monster, defending_this_turn)
-        total_damage_taken += damage_taken
-        
-        # Check if player is defeated
-        if player["health"] <= 0:
-            break  # Exit loop, player lost
-        
-        # Small pause for readability
-        input("\nPress Enter to continue...")
+    display_combat_header(player, monster, io)
+    io.print(f"\nA wild {monster['name']} appears!")
     
-    # ===== COMBAT ENDED =====
-    print("\n" + "=" * 60)
+    # The machine keeps the turn count, damage totals and the result
+    machine = CombatMachine(player, monster)
     
-    # Determine outcome
-    if player["health"] <= 0:
-        # Player defeated
-        print("💀 YOU HAVE BEEN DEFEATED! 💀")
-        print(f"\nThe {monster['name']} stands victorious over you.")
-        print("\n=== GAME OVER ===")
-        return False
-        
-    elif monster["health"] <= 0:
-        # Player victory
-        print("🎉 VICTORY! 🎉")
-        print(f"\nYou defeated the {monster['name']}!")
+    # Main combat loop - continues until someone wins or the player flees
+    while not machine.finished:
+        metrics.count("combat_turns_total")
         
-        # Award gold
-        gold_earned = random.randint(*monster["gold_reward"])
-        player["gold"] = player.get("gold", 0) + gold_earned
-        print(f"You earned {gold_earned} gold!")
+        # Display current status and the menu
+        started = metrics.clock()       # Each phase is timed from here on
+        display_combat_status(player, monster, io)
+        display_action_menu(io)
+        started = metrics.observe("combat_render_seconds", started)
         
-        # Award experience
-        exp_earned = monster["experience"]
-        player["experience"] = player.get("experience", 0) + exp_earned
-        print(f"You gained {exp_earned} experience!")
+        # Get player action (from the keyboard, or from auto-play). Time
+        # spent choosing is kept apart from time spent waiting for a person.
+        if choose_action is None:
+            action = io.input("\nChoose action (1-4): ").strip()
+            started = metrics.observe("combat_input_seconds", started)
+        else:
+            action = choose_action(player, monster)
+            io.print(f"\nChoose action (1-4): {action}")
+            started = metrics.observe("combat_policy_seconds", started)
         
-        # Display combat statistics
-        print(f"\n--- Combat Statistics ---")
-        print(f"Turns survived: {turns}")
-        print(f"Total damage dealt: {total_damage_dealt}")
-        print(f"Total damage taken: {total_damage_taken}")
-        print(f"Damage per turn: {total_damage_dealt / turns:.1f}")
+        # Play the player's action and the monster's reply, then show them
+        events = machine.step(action, rng)
+        started = metrics.observe("combat_step_seconds", started)
+        display_events(machine, events, io)
+        metrics.observe("combat_render_seconds", started)
         
-        return True
+        # Small pause for readability (skipped during auto-play)
+        if choose_action is None and not machine.finished:
+            started = metrics.clock()
+            io.input("\nPress Enter to continue...")
+            metrics.observe("combat_pause_seconds", started)
     
-    # This shouldn't be reached, but just in case
-    return False
+    # ===== COMBAT ENDED =====
+    metrics.count("combat_fights_total", result=machine.status)
+    # Write out the ending now: a BufferedIO would otherwise keep it until
+    # the next question, or lose it if there is none
+    io.flush()
+    return machine.status == WIN
 
 
 # ============================================================================
@@ -435,37 +669,41 @@ def create_test_player():
     }
 
 
-def test_combat_system():
+def test_combat_system(io=CONSOLE):
     """
     Test the combat system with a demo battle.
+    
+    Args:
+        io (optional): Input/output object (see game_io.py)
     """
-    print("=" * 60)
-    print("COMBAT SYSTEM TEST")
-    print("=" * 60)
+    io.print("=" * 60)
+    io.print("COMBAT SYSTEM TEST")
+    io.print("=" * 60)
     
     # Create test player
     player = create_test_player()
     
-    print("\nStarting combat test...")
-    print("You'll fight a random monster.")
-    input("Press Enter to begin...")
+    io.print("\nStarting combat test...")
+    io.print("You'll fight a random monster.")
+    io.input("Press Enter to begin...")
     
     # Run combat
-    victory = combat_loop(player)
+    victory = combat_loop(player, io=io)
     
     # Display result
-    print("\n" + "=" * 60)
+    io.print("\n" + "=" * 60)
     if victory:
-        print("Test completed successfully - Player won!")
+        io.print("Test completed successfully - Player won!")
     else:
-        print("Test completed - Player was defeated or fled.")
-    print("=" * 60)
+        io.print("Test completed - Player was defeated or fled.")
+    io.print("=" * 60)
     
     # Display final player status
-    print(f"\nFinal Player Status:")
-    print(f"Health: {player['health']}/{player['max_health']}")
-    print(f"Gold: {player['gold']}")
-    print(f"Experience: {player['experience']}")
+    io.print(f"\nFinal Player Status:")
+    io.print(f"Health: {player['health']}/{player['max_health']}")
+    io.print(f"Gold: {player['gold']}")
+    io.print(f"Experience: {player['experience']}")
+    io.flush()
 
 
 # ============================================================================
@@ -498,14 +736,15 @@ INSTRUCTOR GUIDE - Phase 2 Teaching Progression
 Week 1: Introduction to Game Loops
 -----------------------------------
 Concepts: While loops, loop conditions, infinite loops
-Activity: Analyze the main combat_loop() while condition
+Activity: Analyze combat_loop()'s "while not machine.finished" condition
 Exercise: Modify the loop to add a turn limit (e.g., max 20 turns)
 
 Key Teaching Points:
-- The loop continues WHILE both combatants have health > 0
-- Using 'and' to combine multiple conditions
-- How to break out of loops with 'break' statement
-- Why we check monster["health"] <= 0 after player turn
+- The loop continues WHILE the fight's status is still "ongoing"
+- CombatMachine.step() (combat_state.py) plays one turn and changes the
+  status to win, loss or fled - that is what ends the loop
+- How step() stops a turn early with 'return' instead of 'break'
+- Why step() checks monster["health"] <= 0 after the player's action
 
 Student Exercise:
 Create a simple loop that counts turns and displays a message every 5 turns
@@ -568,8 +807,9 @@ Exercise: Add a "combo" counter that increases damage on consecutive attacks
 Key Teaching Points:
 - How dictionaries store related data together
 - Updating values with += and -=
-- Why we need total_damage_dealt and total_damage_taken
-- Resetting state at appropriate times (defending_this_turn)
+- Why the machine keeps damage_dealt and damage_taken
+- Resetting state at appropriate times (step()'s defending variable
+  starts every turn as False)
 
 Student Exercise:
 Add a "dodge" stat that has 10% chance to avoid all damage
@@ -593,14 +833,16 @@ Create a "berserker" mode when health < 25% (double damage, can't defend)
 
 Week 7: Nested Loops and Control Flow
 --------------------------------------
-Concepts: break, continue, nested conditionals
-Activity: Map out the flow of combat from start to finish
+Concepts: break, continue, return, nested conditionals
+Activity: Map out the flow of combat from start to finish: combat_loop()
+          asks, CombatMachine.step() plays the turn, display_events()
+          prints it
 Exercise: Add an "inner loop" for multi-hit attacks
 
 Key Teaching Points:
-- break exits the nearest loop
+- break exits the nearest loop; return leaves the whole function
 - continue skips to next iteration
-- Why we break after monster is defeated
+- Why step() returns as soon as the monster is defeated
 - Nesting if statements inside while loops
 
 Student Exercise:
@@ -672,10 +914,12 @@ COMMON STUDENT ERRORS & SOLUTIONS
 ----------------------------------
 
 Error: Infinite loop in combat
-Solution: Check while condition includes health > 0 for BOTH combatants
+Solution: Make sure every way a fight ends sets the status, so
+"while not machine.finished" stops
 
 Error: Monster still attacks after dying
-Solution: Add "if monster['health'] <= 0: break" after player attack
+Solution: Return from step() when monster['health'] <= 0 after the
+player's action
 
 Error: Can use infinite potions
 Solution: Check potion count before use, decrement after
@@ -684,7 +928,7 @@ Error: Negative health values
 Solution: Use max(0, health - damage) or check after damage
 
 Error: Defend lasts multiple turns
-Solution: Reset defending_this_turn = False at start of each turn
+Solution: Set defending = False at the start of each turn
 
 Error: Input validation missing
 Solution: Add while loop around input until valid choice
@@ -770,10 +1014,10 @@ ASSESSMENT QUESTIONS
 --------------------
 
 1. Why do we use a while loop instead of a for loop for combat?
-2. What would happen if we removed the "break" statements?
+2. What would happen if step() did not return after the monster died?
 3. How does the random.random() < 0.20 check work for critical hits?
 4. Why do we need both min_damage and max_damage for monsters?
-5. What is the purpose of the defending_this_turn variable?
+5. What is the purpose of the defending variable in step()?
 6. How could you make combat more interesting?
 
 
@@ -0,0 +1,393 @@
+"""
+Roster: Millions of Characters Stored as Columns
+Alberta CSE 1120: Structured Programming 2
+
+A character dictionary costs a few hundred bytes: the dictionary itself,
+plus a separate Python object for every number and for the name. A
+roster of a million characters stored as a list of dictionaries needs
+hundreds of megabytes.
+
+A Roster stores the same data COLUMN BY COLUMN instead of row by row:
+one NumPy array of health values, one of gold values, and so on, with 4
+bytes per number. Names are INTERNED - every distinct name is stored
+once in a name table, and each character just keeps the name's number.
+
+Columns make questions about the whole roster fast ("which characters
+are Warriors?" is one comparison over an array), and roster[i] still
+gives a dictionary-like RosterRow that works with combat_loop() and the
+other Phase 2 functions - reading and writing it reads and writes the
+columns.
+
+Learning Objectives:
+- Row-oriented vs column-oriented data
+- NumPy arrays, boolean masks and fancy indexing
+- Interning repeated strings
+- Making objects behave like dictionaries (MutableMapping)
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+from collections.abc import MutableMapping
+
+import numpy as np
+
+from character_batch import COLUMNS
+from phase1_character_creation import MAGE_MANA, WARRIOR_HEALTH
+
+# Every character's keys, in the order create_character() uses
+KEYS = ("name",) + COLUMNS
+
+# Class codes for the "class" query
+CLASS_NAMES = ("Balanced", "Warrior", "Mage")
+BALANCED, WARRIOR, MAGE = range(3)
+
+
+# ============================================================================
+# ROW VIEW
+# ============================================================================
+
+class RosterRow(MutableMapping):
+    """
+    One character of a roster, used like a character dictionary.
+    Nothing is copied: reading a key reads the roster's column and
+    setting a key writes it.
+
+    Args:
+        roster (Roster): The roster
+        index (int): Character's row number
+    """
+
+    __slots__ = ("roster", "index")
+
+    def __init__(self, roster, index):
+        self.roster = roster
+        self.index = index
+
+    def __getitem__(self, key):
+        roster = self.roster
+        if key == "name":
+            return roster.names[roster.storage["name_id"][self.index]]
+        if key in COLUMNS:
+            return int(roster.storage[key][self.index])
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        roster = self.roster
+        if key == "name":
+            roster.storage["name_id"][self.index] = roster.intern(value)
+        elif key in COLUMNS:
+            roster.storage[key][self.index] = value
+        else:
+            raise KeyError(f"A roster has no '{key}' column")
+
+    def __delitem__(self, key):
+        raise TypeError("Roster columns cannot be deleted")
+
+    def __iter__(self):
+        return iter(KEYS)
+
+    def __len__(self):
+        return len(KEYS)
+
+    def __repr__(self):
+        return f"RosterRow({self.index}, {dict(self)})"
+
+
+# ============================================================================
+# ROSTER
+# ============================================================================
+
+class Roster:
+    """
+    Characters stored as one NumPy column per stat, plus a name table.
+    The columns grow (doubling their size) as characters are added.
+
+    Args:
+        capacity (int): Rows to make room for up front
+    """
+
+    def __init__(self, capacity=1024):
+        capacity = max(capacity, 1)
+        self.size = 0
+        self.names = []             # name_id -> name
+        self.name_ids = {}          # name -> name_id
+        self.storage = {key: np.zeros(capacity, dtype=np.int32)
+                        for key in ("name_id",) + COLUMNS}
+
+    # ----- Building -----
+
+    @classmethod
+    def from_columns(cls, columns):
+        """
+        Build a roster from generate_columns() output (see
+        character_batch.py) without a loop over the characters.
+
+        Args:
+            columns (dict): "names", "name_id" and one array per COLUMNS
+
+        Returns:
+            Roster: The new roster
+        """
+        count = len(columns["name_id"])
+        roster = cls(count)
+        ids = np.array([roster.intern(name) for name in columns["names"]],
+                       dtype=np.int32)
+        roster.storage["name_id"][:count] = ids[columns["name_id"]]
+        for key in COLUMNS:
+            roster.storage[key][:count] = columns[key]
+        roster.size = count
+        return roster
+
+    @classmethod
+    def from_dicts(cls, characters):
+        """
+        Build a roster from character dictionaries.
+
+        Args:
+            characters (iterable): Dictionaries like create_character()'s
+
+        Returns:
+            Roster: The new roster
+        """
+        characters = list(characters)
+        roster = cls(len(characters))
+        for character in characters:
+            roster.append(character)
+        return roster
+
+    def intern(self, name):
+        """
+        Number for a name, adding it to the name table if it is new.
+
+        Args:
+            name (str): Character name
+
+        Returns:
+            int: Name ID
+        """
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = self.name_ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def append(self, character):
+        """
+        Add one character (missing stats count as 0).
+
+        Args:
+            character (dict): Character data
+
+        Returns:
+            int: The new character's row number
+        """
+        if self.size == len(self.storage["name_id"]):
+            for key, column in self.storage.items():
+                grown = np.zeros(2 * len(column), dtype=column.dtype)
+                grown[:self.size] = column
+                self.storage[key] = grown
+
+        index = self.size
+        self.storage["name_id"][index] = self.intern(character["name"])
+        for key in COLUMNS:
+            self.storage[key][index] = character.get(key, 0)
+        self.size += 1
+        return index
+
+    # ----- Reading -----
+
+    @property
+    def columns(self):
+        """
+        The stat columns, trimmed to the characters actually stored.
+
+        Returns:
+            dict: Column name -> NumPy array (views, not copies)
+        """
+        return {key: self.storage[key][:self.size] for key in COLUMNS}
+
+    @property
+    def name_id(self):
+        """Name ID of every character (a view of the column)."""
+        return self.storage["name_id"][:self.size]
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(f"Roster has no row {index}")
+        return RosterRow(self, index)
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield RosterRow(self, index)
+
+    def to_dicts(self, rows=None):
+        """
+        Copy characters out as ordinary dictionaries.
+
+        Args:
+            rows (array, optional): Row numbers (default: every character)
+
+        Returns:
+            list: Character dictionaries
+        """
+        if rows is None:
+            rows = slice(None)
+        names = self.names
+        name_list = [names[i] for i in self.name_id[rows].tolist()]
+        values = [self.columns[key][rows].tolist() for key in COLUMNS]
+        return [dict(zip(KEYS, row)) for row in zip(name_list, *values)]
+
+    def nbytes(self):
+        """
+        Memory used by the stored rows (columns plus name table).
+
+        Returns:
+            int: Bytes
+        """
+        columns = self.size * sum(column.itemsize
+                                  for column in self.storage.values())
+        return columns + sum(len(name.encode("utf-8")) for name in self.names)
+
+    # ----- Queries -----
+
+    def classes(self):
+        """
+        Class code of every character, with display_character_summary()'s
+        rule (see get_character_class()).
+        Teaches: np.select - an if/elif/else over whole arrays
+
+        Returns:
+            numpy.ndarray: WARRIOR, MAGE or BALANCED for each row
+        """
+        columns = self.columns
+        return np.select([columns["health"] > WARRIOR_HEALTH,
+                          columns["mana"] > MAGE_MANA],
+                         [WARRIOR, MAGE], BALANCED).astype(np.int8)
+
+    def where(self, mask):
+        """
+        Row numbers where a condition holds.
+
+        Args:
+            mask (numpy.ndarray): One True/False per character, e.g.
+                roster.columns["gold"] > 75
+
+        Returns:
+            numpy.ndarray: Matching row numbers
+        """
+        return np.flatnonzero(mask)
+
+    def with_class(self, class_name):
+        """
+        Row numbers of every character of one class.
+
+        Args:
+            class_name (str): "Warrior", "Mage" or "Balanced"
+
+        Returns:
+            numpy.ndarray: Matching row numbers
+        """
+        return self.where(self.classes() == CLASS_NAMES.index(class_name))
+
+    def with_name(self, name):
+        """
+        Row numbers of every character with a given name.
+
+        Args:
+            name (str): Name to look for
+
+        Returns:
+            numpy.ndarray: Matching row numbers (empty if nobody has it)
+        """
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            return np.empty(0, dtype=np.intp)
+        return self.where(self.name_id == name_id)
+
+    # ----- Bulk updates -----
+
+    def add(self, key, rows, amounts):
+        """
+        Add amounts to one column for many rows at once (a row listed
+        twice gets both amounts).
+
+        Args:
+            key (str): Column name, e.g. "gold"
+            rows (array): Row numbers
+            amounts (int or array): Amount for each row
+        """
+        np.add.at(self.columns[key], rows, amounts)
+
+    def update_after_fights(self, rows, health, gold=0, experience=0,
+                            potions_used=0):
+        """
+        Record the results of a batch of fights.
+
+        Args:
+            rows (array): Row numbers of the characters who fought
+            health (array): Each character's health after the fight
+            gold (int or array): Gold earned
+            experience (int or array): Experience earned
+            potions_used (int or array): Potions drunk
+        """
+        columns = self.columns
+        columns["health"][rows] = health
+        self.add("gold", rows, gold)
+        self.add("experience", rows, experience)
+        self.add("health_potions", rows, np.negative(potions_used))
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import random
+    import time
+    import tracemalloc
+
+    from character_batch import generate_characters, generate_columns
+    from game_io import NullIO
+    from phase2_combat_system import combat_loop, create_goblin
+
+    print("=" * 60)
+    print("COLUMNAR ROSTER DEMO")
+    print("=" * 60)
+
+    count = 1_000_000
+    start = time.perf_counter()
+    roster = Roster.from_columns(generate_columns(count, "balanced", seed=1,
+                                                  health_potions=3))
+    print(f"Built a roster of {count:,} in {time.perf_counter() - start:.2f}s"
+          f" using {roster.nbytes() / 1e6:.1f} MB")
+
+    # Compare with dictionaries (measured on a sample to save time)
+    tracemalloc.start()
+    sample = generate_characters(100_000, "balanced", seed=1)
+    per_dict = tracemalloc.get_traced_memory()[0] / len(sample)
+    tracemalloc.stop()
+    del sample
+    print(f"The same as dictionaries: about {per_dict * count / 1e6:.0f} MB")
+
+    start = time.perf_counter()
+    warriors = roster.with_class("Warrior")
+    print(f"\n{len(warriors):,} Warriors found in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # A row works with the Phase 2 combat code
+    hero = roster[int(warriors[0])]
+    combat_loop(hero, create_goblin(), choose_action=lambda p, m: "1",
+                rng=random.Random(1), io=NullIO())
+    print(f"After one fight: {hero}")
+
+    # Bulk update: every Warrior earns 10 gold
+    roster.add("gold", warriors, 10)
+    print(f"Average Warrior gold now: "
+          f"{roster.columns['gold'][warriors].mean():.1f}")
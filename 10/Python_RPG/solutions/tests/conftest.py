@@ -0,0 +1,10 @@
+"""
+Shared setup for the solution tests: the solutions are plain scripts, so
+their folder goes on sys.path for the tests to import them.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
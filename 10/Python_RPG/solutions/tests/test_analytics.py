@@ -0,0 +1,84 @@
+"""Tests for combat_analytics.py: streaming statistics and merging."""
+
+import random
+import statistics
+
+import pytest
+
+from combat_analytics import (
+    CombatAnalytics,
+    Histogram,
+    RunningStats,
+    play_fights,
+)
+from combat_simulator import potion_at
+
+
+def test_running_stats_match_statistics_module():
+    rng = random.Random(1)
+    values = [rng.gauss(10, 3) for _ in range(1_000)]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(statistics.mean(values))
+    assert stats.stdev == pytest.approx(statistics.stdev(values))
+    assert (stats.min, stats.max) == (min(values), max(values))
+
+
+def test_merged_running_stats_equal_one_stream():
+    rng = random.Random(2)
+    values = [rng.randint(0, 50) for _ in range(500)]
+    whole, first, second = RunningStats(), RunningStats(), RunningStats()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (first if i < 123 else second).add(value)
+
+    first.merge(second)
+    first.merge(RunningStats())
+    assert first.to_dict() == pytest.approx(whole.to_dict())
+
+
+def test_histogram_merge_and_quantile():
+    histogram, other = Histogram(0, 10, 10), Histogram(0, 10, 10)
+    for value in range(5):
+        histogram.add(value)
+    for value in range(5, 10):
+        other.add(value)
+    other.add(-1)
+    other.add(12)
+
+    histogram.merge(other)
+    assert histogram.counts == [1] * 10
+    assert (histogram.under, histogram.over) == (1, 1)
+    assert histogram.quantile(0.5) == pytest.approx(5)
+
+    with pytest.raises(ValueError):
+        histogram.merge(Histogram(0, 20, 10))
+
+
+def test_merged_analytics_equal_one_stream():
+    outcomes = list(play_fights(2_000, potion_at(0.4),
+                                rng=random.Random(3)))
+    whole, first, second = (CombatAnalytics(), CombatAnalytics(),
+                            CombatAnalytics())
+    for i, outcome in enumerate(outcomes):
+        whole.add(outcome)
+        (first if i % 3 else second).add(outcome)
+    first.merge(second)
+
+    merged, single = first.snapshot(), whole.snapshot()
+    assert merged["fights"] == single["fights"] == 2_000
+    assert merged["groups"].keys() == single["groups"].keys()
+    for name, group in single["groups"].items():
+        other = merged["groups"][name]
+        assert other["fights"] == group["fights"]
+        assert other["win_rate"] == group["win_rate"]
+        for measure in ("turns", "damage_dealt", "damage_taken"):
+            assert other[measure]["histogram"] == group[measure]["histogram"]
+            assert other[measure]["mean"] == pytest.approx(
+                group[measure]["mean"])
+            assert other[measure]["stdev"] == pytest.approx(
+                group[measure]["stdev"])
+            assert other[measure]["p50"] is not None
@@ -0,0 +1,69 @@
+"""Tests for combat_state.py: stepping, saving and resuming a fight."""
+
+import json
+import random
+
+import pytest
+
+from combat_state import FLED, LOSS, ONGOING, WIN, CombatMachine
+from phase2_combat_system import create_test_player, create_troll
+
+
+def play(machine, rng, turns=None):
+    """Attack until the fight ends (or `turns` turns); return the events."""
+    events = []
+    while not machine.finished and turns != 0:
+        events.append(machine.step("1", rng))
+        if turns is not None:
+            turns -= 1
+    return events
+
+
+def test_round_trip_through_json():
+    machine = CombatMachine(create_test_player(), create_troll())
+    play(machine, random.Random(1), turns=3)
+
+    restored = CombatMachine.from_dict(json.loads(json.dumps(
+        machine.to_dict())))
+
+    assert restored.to_dict() == machine.to_dict()
+    assert restored.monster["gold_reward"] == machine.monster["gold_reward"]
+
+
+def test_resumed_fight_matches_uninterrupted_fight():
+    rng = random.Random(7)
+    machine = CombatMachine(create_test_player(), create_troll())
+    play(machine, rng, turns=2)
+    saved = json.dumps(machine.to_dict())
+    state = rng.getstate()
+
+    rest = play(machine, rng)
+
+    resumed = CombatMachine.from_dict(json.loads(saved))
+    rng = random.Random()
+    rng.setstate(state)
+    assert play(resumed, rng) == rest
+    assert resumed.to_dict() == machine.to_dict()
+
+
+def test_statuses_and_totals():
+    for seed in range(50):
+        machine = CombatMachine(create_test_player(), create_troll())
+        rng = random.Random(seed)
+        while not machine.finished:
+            machine.step(rng.choice("1234"), rng)
+        if machine.status == WIN:
+            assert machine.monster["health"] <= 0
+            assert machine.damage_dealt >= 80
+        elif machine.status == LOSS:
+            assert machine.player["health"] <= 0
+        else:
+            assert machine.status == FLED
+
+
+def test_step_after_the_end_is_an_error():
+    machine = CombatMachine(create_test_player(), create_troll())
+    play(machine, random.Random(3))
+    assert machine.status != ONGOING
+    with pytest.raises(ValueError):
+        machine.step("1")
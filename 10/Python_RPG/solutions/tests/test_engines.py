@@ -0,0 +1,103 @@
+"""
+Tests that the three fight engines agree: the scalar simulator
+(combat_simulator.py), the NumPy simulator (combat_vectorized.py) and the
+exact solver (combat_exact.py).
+"""
+
+import math
+import random
+from collections import Counter
+
+import pytest
+
+import combat_exact
+import damage_tables
+from combat_simulator import simulate_fight
+from phase2_combat_system import (
+    create_goblin,
+    create_orc,
+    create_test_player,
+    create_troll,
+    roll_damage_range,
+    roll_player_damage,
+)
+from tournament import make_policy
+
+np = pytest.importorskip("numpy")
+import combat_vectorized  # noqa: E402  (needs NumPy)
+from tournament import make_vectorized_policy  # noqa: E402
+
+FIGHTS = 5_000
+TOLERANCE = 4       # standard errors
+POLICIES = [("always_attack",), ("potion_at", 0.4), ("defend_below", 0.3)]
+MONSTERS = [create_goblin, create_orc, create_troll]
+
+
+def close(sample, expected):
+    """
+    True if the sample's mean is within TOLERANCE standard errors (plus
+    one fight's worth, for odds so close to 1 that every fight is a win).
+    """
+    sample = np.asarray(sample, dtype=float)
+    error = sample.std() / math.sqrt(len(sample))
+    return (abs(sample.mean() - expected)
+            <= TOLERANCE * error + 1 / len(sample))
+
+
+@pytest.mark.parametrize("creator", MONSTERS)
+@pytest.mark.parametrize("spec", POLICIES)
+def test_engines_agree_with_exact_odds(creator, spec):
+    player = create_test_player()
+    monster = creator()
+    odds = combat_exact.matchup_odds(player, monster, spec)
+    assert odds["unresolved"] < 1e-9
+
+    rng = random.Random(1)
+    policy = make_policy(spec)
+    scalar = [simulate_fight(player, monster, policy, rng)
+              for _ in range(FIGHTS)]
+    vector = combat_vectorized.simulate_fights(
+        FIGHTS, monster, player, make_vectorized_policy(spec), seed=1)
+
+    assert close([o["result"] == "win" for o in scalar], odds["win"])
+    assert close([o["turns"] for o in scalar], odds["expected_turns"])
+    assert close(vector["result"] == combat_vectorized.WIN, odds["win"])
+    assert close(vector["turns"], odds["expected_turns"])
+
+
+def test_vectorized_matches_scalar():
+    random.seed(1)
+    checks = combat_vectorized.validate_against_scalar(fights=3_000, seed=1)
+    assert all(ok for *_, ok in checks)
+
+
+def test_tables_match_exact_distributions():
+    player = damage_tables.player_damage_table(exact=True)
+    assert player.distribution == combat_exact.player_damage_distribution(
+        exact=True)
+
+    attack = damage_tables.player_attack_table()
+    damage = Counter()
+    for (amount, _), chance in attack.distribution.items():
+        damage[amount] += chance
+    for amount, chance in player.distribution.items():
+        assert damage[amount] == pytest.approx(float(chance))
+
+    for defending in (False, True):
+        table = damage_tables.monster_damage_table(8, 15, defending)
+        assert table.distribution == pytest.approx(
+            combat_exact.monster_damage_distribution(8, 15, defending))
+
+
+def test_game_rolls_follow_the_tables():
+    rolls = 50_000
+    rng = random.Random(1)
+    counts = Counter(roll_player_damage(rng)[0] for _ in range(rolls))
+    for damage, chance in combat_exact.player_damage_distribution().items():
+        assert counts[damage] / rolls == pytest.approx(chance, abs=0.01)
+
+    counts = Counter(roll_damage_range(8, 15, True, rng)
+                     for _ in range(rolls))
+    for damage, chance in combat_exact.monster_damage_distribution(
+            8, 15, True).items():
+        assert counts[damage] / rolls == pytest.approx(chance, abs=0.01)
@@ -0,0 +1,44 @@
+"""Tests for game_io.py and playing a whole fight without a keyboard."""
+
+import io
+import random
+
+from game_io import BufferedIO, ScriptedIO
+from phase2_combat_system import (
+    combat_loop,
+    create_goblin,
+    create_test_player,
+)
+
+
+def test_buffered_io_writes_only_when_flushed():
+    stream = io.StringIO()
+    buffered = BufferedIO(stream)
+    buffered.print("You hit the", "Goblin", end="!\n")
+    buffered.print("Victory", sep="")
+    assert stream.getvalue() == ""
+
+    buffered.flush()
+    assert stream.getvalue() == "You hit the Goblin!\nVictory\n"
+    buffered.flush()
+    assert stream.getvalue() == "You hit the Goblin!\nVictory\n"
+
+
+def test_scripted_fight_is_repeatable():
+    def fight(seed):
+        player = create_test_player()
+        player["health_potions"] = 1
+        # Defend, drink the potion, then attack; "" answers each
+        # "Press Enter to continue..."
+        screen = ScriptedIO(["2", "", "3", ""] + ["1", ""] * 20, record=True)
+        won = combat_loop(player, create_goblin(), rng=random.Random(seed),
+                          io=screen)
+        return won, player, screen.text()
+
+    won, player, text = fight(5)
+    assert fight(5) == (won, player, text)
+    assert won
+    assert player["health_potions"] == 0
+    assert player["gold"] > create_test_player()["gold"]
+    assert "You brace yourself" in text
+    assert "VICTORY" in text
@@ -0,0 +1,88 @@
+"""Tests for character_store.py and combat_log.py: files round-trip."""
+
+import random
+
+import pytest
+
+import character_store
+import combat_log
+from character_batch import generate_characters
+from combat_state import CombatMachine
+from phase2_combat_system import create_goblin, create_test_player
+
+
+@pytest.fixture
+def characters():
+    batch = generate_characters(300, seed=1)
+    batch[0]["name"] = "Zoë"          # a name that is not plain ASCII
+    return batch
+
+
+@pytest.mark.parametrize("filename", ["heroes.json", "heroes.bin"])
+def test_save_and_load(tmp_path, characters, filename):
+    path = tmp_path / filename
+    assert character_store.save_characters(path, characters) == 300
+    assert character_store.load_characters(path) == characters
+
+
+def test_character_file_random_access(tmp_path, characters):
+    path = tmp_path / "heroes.bin"
+    character_store.save_characters(path, characters)
+
+    with character_store.CharacterFile(path) as heroes:
+        assert len(heroes) == len(characters)
+        assert heroes[0] == characters[0]
+        assert heroes[-1] == characters[-1]
+        assert list(heroes) == characters
+        with pytest.raises(IndexError):
+            heroes[len(characters)]
+
+        columns = heroes.columns()
+        assert columns["health"].tolist() == [c["health"]
+                                              for c in characters]
+        del columns
+
+
+def test_not_a_character_file(tmp_path):
+    path = tmp_path / "junk.bin"
+    path.write_bytes(b"not a character file at all")
+    with pytest.raises(ValueError):
+        character_store.CharacterFile(path)
+
+
+def test_log_replays_every_fight(tmp_path):
+    path = tmp_path / "fights.log"
+    rng = random.Random(1)
+    played = []
+    with combat_log.CombatLogWriter(path) as log:
+        for _ in range(30):
+            machine = CombatMachine(create_test_player(), create_goblin())
+            fight_id = log.start(machine)
+            while not machine.finished:
+                log.step(fight_id, machine, rng.choice("1234"), rng)
+            played.append(machine.to_dict())
+
+    replayed = [machine.to_dict()
+                for _, machine, _ in combat_log.replay_fights(path)]
+    assert replayed == played
+
+    machine, turns = combat_log.replay_fight(path, 12)
+    assert machine.to_dict() == played[12]
+    assert len(turns) == machine.turns
+
+
+def test_log_survives_a_crash(tmp_path):
+    assert combat_log.check_crash_recovery(tmp_path / "crash.log")
+
+
+def test_log_holds_more_names_than_16_bits(tmp_path):
+    path = tmp_path / "names.log"
+    with combat_log.CombatLogWriter(path) as log:
+        for number in range(70_000):
+            log.name_id(f"Hero {number}")
+        with pytest.raises(ValueError):
+            log.name_id("x" * (combat_log.MAX_NAME_BYTES + 1))
+
+    names = [record[2] for record in combat_log.read_log(path)
+             if record[0] == combat_log.NAME]
+    assert names == [f"Hero {number}" for number in range(70_000)]
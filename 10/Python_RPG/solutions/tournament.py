@@ -0,0 +1,286 @@
+"""
+Combat Tournament: Parallel Balance Sweeps
+Alberta CSE 1120: Structured Programming 2
+
+A balance sweep tries every policy against every monster and every stat
+variant. That is a lot of fights, so this module splits the work into
+fixed-size SHARDS and hands them to a pool of worker processes (one per
+CPU core). Each shard seeds its own random stream from its name, and the
+partial results are merged by adding them up - so the final numbers are
+the same whether 1 or 16 workers did the work.
+
+Learning Objectives:
+- Splitting a big job into independent pieces
+- Running work in parallel with multiprocessing
+- Seeding random numbers for repeatable results
+- Merging partial results with addition
+
+CSE 1120 Outcomes Addressed:
+1.1-1.9: Algorithms using selection and iteration
+2.1-2.9: Translation to code with control structures
+"""
+
+import multiprocessing
+import random
+
+from combat_simulator import (
+    always_attack,
+    defend_below,
+    display_results,
+    new_monster_stats,
+    potion_at,
+    record_outcome,
+    simulate_fight,
+)
+from monster_registry import DEFAULT_REGISTRY
+from phase2_combat_system import create_test_player
+
+
+# ============================================================================
+# GRID DESCRIPTION
+# ============================================================================
+# Worker processes receive their jobs through pickling, and closures such
+# as defend_below(0.3) cannot be pickled. So policies are described by a
+# tuple (name, *arguments) and rebuilt inside the worker.
+
+POLICY_BUILDERS = {
+    "always_attack": lambda: always_attack,
+    "defend_below": defend_below,
+    "potion_at": potion_at,
+}
+
+SHARD_SIZE = 10_000     # Fights per shard
+
+
+def make_policy(spec):
+    """
+    Build a policy function from its description.
+
+    Args:
+        spec (tuple): ("always_attack",), ("defend_below", 0.3), ...
+
+    Returns:
+        function: A combat_simulator policy
+    """
+    name, *arguments = spec
+    return POLICY_BUILDERS[name](*arguments)
+
+
+def make_vectorized_policy(spec):
+    """
+    Build the combat_vectorized.py version of a policy from the same
+    description (needs NumPy).
+
+    Args:
+        spec (tuple): ("always_attack",), ("potion_at", 0.4), ...
+
+    Returns:
+        function: A combat_vectorized policy
+    """
+    # Imported here so that programs using only make_policy() never load
+    # NumPy
+    import combat_vectorized
+
+    name, *arguments = spec
+    if name not in POLICY_BUILDERS:
+        raise KeyError(name)
+    policy = getattr(combat_vectorized, name)
+    return policy(*arguments) if arguments else policy
+
+
+def make_monster(monster_name, overrides):
+    """
+    Create a monster from the registry and apply stat overrides for a
+    balance variant.
+
+    Args:
+        monster_name (str): Any name in monsters.json, e.g. "Troll"
+        overrides (dict): Stats to replace, e.g. {"max_damage": 17}
+
+    Returns:
+        dict: Monster data
+    """
+    monster = DEFAULT_REGISTRY.create(monster_name)
+    monster.update(overrides)
+    if "max_health" in overrides and "health" not in overrides:
+        monster["health"] = monster["max_health"]
+    return monster
+
+
+def build_grid(policies, monsters, variants):
+    """
+    List every (policy, monster, variant) cell of the sweep.
+    Teaches: Nested loops to build combinations
+
+    Args:
+        policies (list): Policy specs, e.g. [("always_attack",)]
+        monsters (list): Monster names
+        variants (dict): Variant name -> stat overrides
+
+    Returns:
+        list: Cells as (policy_spec, monster_name, variant_name, overrides)
+    """
+    grid = []
+    for policy in policies:
+        for monster_name in monsters:
+            for variant_name, overrides in variants.items():
+                grid.append((tuple(policy), monster_name, variant_name,
+                             overrides))
+    return grid
+
+
+# ============================================================================
+# WORKER
+# ============================================================================
+
+def shard_seed(base_seed, cell, shard_index):
+    """
+    Name a shard's random stream. The name depends only on WHAT the shard
+    computes, never on which worker runs it.
+
+    Args:
+        base_seed (int): Seed for the whole tournament
+        cell (tuple): Grid cell from build_grid()
+        shard_index (int): Position of the shard inside the cell
+
+    Returns:
+        str: Seed string for random.Random
+    """
+    policy, monster_name, variant_name, _ = cell
+    return f"{base_seed}:{policy}:{monster_name}:{variant_name}:{shard_index}"
+
+
+def run_shard(task):
+    """
+    Run one shard of fights. Called inside a worker process.
+
+    Args:
+        task (tuple): (cell, shard_index, fights, base_seed)
+
+    Returns:
+        tuple: (cell key, shard_index, statistics)
+    """
+    cell, shard_index, fights, base_seed = task
+    policy_spec, monster_name, variant_name, overrides = cell
+
+    # Each shard gets its own independent, repeatable stream
+    rng = random.Random(shard_seed(base_seed, cell, shard_index))
+
+    policy = make_policy(policy_spec)
+    player = create_test_player()
+    monster = make_monster(monster_name, overrides)
+
+    stats = new_monster_stats()
+    for _ in range(fights):
+        record_outcome(stats, simulate_fight(player, monster, policy, rng))
+
+    return (policy_spec, monster_name, variant_name), shard_index, stats
+
+
+# ============================================================================
+# MERGING
+# ============================================================================
+
+def merge_stats(total, part):
+    """
+    Add one shard's statistics into a running total.
+    Addition does not care about order, so results never depend on which
+    shard finishes first.
+
+    Args:
+        total (dict): Statistics being built up (changed in place)
+        part (dict): Statistics from one shard
+    """
+    for key, value in part.items():
+        if isinstance(value, dict):
+            total[key].update(value)    # Counter.update() adds counts
+        else:
+            total[key] += value
+
+
+def plan_shards(grid, fights, base_seed):
+    """
+    Cut each cell's fights into shards of SHARD_SIZE.
+
+    Args:
+        grid (list): Cells from build_grid()
+        fights (int): Fights per cell
+        base_seed (int): Seed for the whole tournament
+
+    Returns:
+        list: Tasks for run_shard()
+    """
+    tasks = []
+    for cell in grid:
+        shard_index = 0
+        for start in range(0, fights, SHARD_SIZE):
+            count = min(SHARD_SIZE, fights - start)
+            tasks.append((cell, shard_index, count, base_seed))
+            shard_index += 1
+    return tasks
+
+
+def run_tournament(grid, fights, workers=None, base_seed=0, on_progress=None):
+    """
+    Run every cell of the grid in parallel and merge the results.
+    Teaches: multiprocessing.Pool, imap_unordered
+
+    Args:
+        grid (list): Cells from build_grid()
+        fights (int): Fights per cell
+        workers (int, optional): Worker processes (default: all CPU cores).
+            Use 1 to run everything in this process.
+        base_seed (int): Seed for the whole tournament
+        on_progress (function, optional): Called as on_progress(done, total,
+            key, statistics-so-far) after each shard is merged
+
+    Returns:
+        dict: (policy_spec, monster_name, variant_name) -> statistics
+    """
+    tasks = plan_shards(grid, fights, base_seed)
+    results = {(c[0], c[1], c[2]): new_monster_stats() for c in grid}
+
+    def collect(finished):
+        done = 0
+        for key, shard_index, stats in finished:
+            merge_stats(results[key], stats)
+            done += 1
+            if on_progress is not None:
+                on_progress(done, len(tasks), key, results[key])
+
+    if workers == 1:
+        collect(map(run_shard, tasks))
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            collect(pool.imap_unordered(run_shard, tasks))
+
+    return results
+
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    grid = build_grid(
+        policies=[("always_attack",), ("defend_below", 0.3), ("potion_at", 0.4)],
+        monsters=["Goblin", "Orc", "Troll"],
+        variants={"base": {}, "tough": {"max_health": 100}},
+    )
+    FIGHTS = 20_000
+
+    for workers in (1, None):
+        start = time.perf_counter()
+        results = run_tournament(grid, FIGHTS, workers=workers, base_seed=42)
+        elapsed = time.perf_counter() - start
+        total = len(grid) * FIGHTS
+        print(f"\nworkers={workers or multiprocessing.cpu_count()}: "
+              f"{total:,} fights in {elapsed:.2f}s "
+              f"({total / elapsed:,.0f} fights/sec)")
+
+    for policy in grid[0][0], ("potion_at", 0.4):
+        table = {f"{m}/{v}": s for (p, m, v), s in results.items()
+                 if p == tuple(policy)}
+        display_results(table, f"TOURNAMENT: {policy}")